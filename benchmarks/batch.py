@@ -0,0 +1,57 @@
+import argparse
+import time
+
+from chess.batch import Batch, analyse_board, mismatches
+from chess.board import Board
+from fen import make_corpus
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog='python benchmarks/batch.py',
+        description='compare batch analysis with one board at a time',
+    )
+    parser.add_argument('-n', '--size', type=int, default=10000)
+    parser.add_argument(
+        '--corpus',
+        help='file with one fen per line instead of random positions',
+    )
+    parser.add_argument(
+        '--check',
+        action='store_true',
+        help='check every batch result against Board',
+    )
+    args = parser.parse_args(argv)
+
+    if args.corpus:
+        with open(args.corpus) as f:
+            corpus = [line.strip() for line in f if line.strip()]
+    else:
+        corpus = make_corpus(args.size)
+
+    start = time.perf_counter()
+    batch = Batch.from_fens(corpus)
+    load = time.perf_counter() - start
+
+    start = time.perf_counter()
+    analysis = batch.analyse()
+    analyse = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for fen in corpus:
+        analyse_board(Board(fen))
+    board = time.perf_counter() - start
+
+    for name, elapsed in (
+        ('batch load', load),
+        ('batch analyse', analyse),
+        ('board parse and analyse', board),
+    ):
+        print(f'{name}: {len(corpus) / elapsed:.0f} positions/s')
+    if args.check:
+        wrong = mismatches(corpus, analysis)
+        print(f'mismatches: {len(wrong)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+import argparse
+import random
+import time
+
+from chess.bitboard import BitBoard
+from chess.board import Board
+
+BACKENDS: dict[str, type[Board | BitBoard]] = {
+    'board': Board,
+    'bitboard': BitBoard,
+}
+
+
+def make_corpus(size: int, seed: int = 0) -> list[str]:
+    # positions from random games, so the corpus is the same every run
+    rng = random.Random(seed)
+    corpus: list[str] = []
+    while len(corpus) < size:
+        board = BitBoard()
+        for _ in range(rng.randrange(20, 120)):
+            moves = sorted(board.legal_moves)
+            if not moves:
+                break
+            board.push(rng.choice(moves))
+            corpus.append(board.fen())
+    return corpus[:size]
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog='python benchmarks/fen.py',
+        description='measure fen parse and serialise throughput',
+    )
+    parser.add_argument('-n', '--size', type=int, default=10000)
+    parser.add_argument(
+        '--corpus',
+        help='file with one fen per line instead of random positions',
+    )
+    parser.add_argument(
+        '-b',
+        '--backend',
+        choices=BACKENDS,
+        action='append',
+        help='can be given more than once, defaults to every backend',
+    )
+    args = parser.parse_args(argv)
+
+    if args.corpus:
+        with open(args.corpus) as f:
+            corpus = [line.strip() for line in f if line.strip()]
+    else:
+        corpus = make_corpus(args.size)
+
+    for backend in args.backend or BACKENDS:
+        Backend = BACKENDS[backend]
+        start = time.perf_counter()
+        boards = [Backend(fen) for fen in corpus]
+        parse = time.perf_counter() - start
+
+        start = time.perf_counter()
+        fens = [board.fen() for board in boards]
+        serialise = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for board in boards:
+            board.fen()
+        cached = time.perf_counter() - start
+
+        assert fens == corpus
+        for name, elapsed in (
+            ('parse', parse),
+            ('serialise', serialise),
+            ('cached', cached),
+        ):
+            print(f'{backend} {name}: {len(corpus) / elapsed:.0f} fen/s')
+
+
+if __name__ == '__main__':
+    main()
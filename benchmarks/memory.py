@@ -0,0 +1,71 @@
+import argparse
+import gc
+import tracemalloc
+from typing import Callable
+
+from chess.bitboard import BitBoard
+from chess.board import Board
+
+FENS = {
+    'start': 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+    'middlegame': (
+        'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1'
+    ),
+    'endgame': '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1',
+}
+BACKENDS: dict[str, type[Board | BitBoard]] = {
+    'board': Board,
+    'bitboard': BitBoard,
+}
+
+
+def bytes_per_board(
+    factory: Callable[[str], Board | BitBoard],
+    fen: str,
+    count: int,
+    legal_moves: bool,
+) -> float:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        boards = [factory(fen) for _ in range(count)]
+        if legal_moves:
+            # web.manager keeps boards whose legal moves were generated
+            # when the last move was checked
+            for board in boards:
+                board.legal_moves
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del boards
+    return (after - before) / count
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog='python benchmarks/memory.py',
+        description='measure the memory held by every live board',
+    )
+    parser.add_argument('-n', '--count', type=int, default=1000)
+    parser.add_argument(
+        '-b',
+        '--backend',
+        choices=BACKENDS,
+        action='append',
+        help='can be given more than once, defaults to every backend',
+    )
+    args = parser.parse_args(argv)
+
+    for backend in args.backend or BACKENDS:
+        for name, fen in FENS.items():
+            for legal_moves in (False, True):
+                size = bytes_per_board(
+                    BACKENDS[backend], fen, args.count, legal_moves
+                )
+                label = f'{name} + legal moves' if legal_moves else name
+                print(f'{backend} {label}: {size:.0f} bytes per board')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,304 @@
+import argparse
+import gc
+import json
+import platform
+import random
+import re
+import sys
+import time
+from typing import Callable
+
+from chess.board import Board
+from chess.fen import STARTING_FEN
+from chess.util import Move
+
+# a benchmark runs once and returns how many operations it did
+Benchmark = Callable[[], int]
+
+# random games are played from these to get positions of every class
+SEEDS = [
+    STARTING_FEN,
+    'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+    '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1',
+    '4k3/8/8/8/8/8/4P3/4K3 w - - 0 1',
+    '6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1',
+]
+CLASSES = ['opening', 'middlegame', 'endgame', 'in-check']
+
+# the positions of tests/test_perft.py, at depths that take about as
+# long as each other, with their node counts
+PERFT = {
+    'start': (STARTING_FEN, 3, 8902),
+    'kiwipete': (SEEDS[1], 2, 2039),
+    'position3': (SEEDS[2], 4, 43238),
+    'position4': (
+        'r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1',
+        3,
+        9467,
+    ),
+    'position5': (
+        'rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8',
+        2,
+        1486,
+    ),
+    'position6': (
+        'r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1'
+        ' w - - 0 10',
+        2,
+        2079,
+    ),
+}
+
+
+def classify(board: Board) -> str:
+    if board._is_king_in_check(board.active_color):
+        return 'in-check'
+    pieces = sum(len(color_pieces) for color_pieces in board._pieces)
+    if pieces >= 28:
+        return 'opening'
+    if pieces <= 12:
+        return 'endgame'
+    return 'middlegame'
+
+
+def make_positions(size: int, seed: int = 0) -> dict[str, list[str]]:
+    # positions from random games, so they are the same every run
+    rng = random.Random(seed)
+    positions: dict[str, list[str]] = {name: [] for name in CLASSES}
+    while any(len(fens) < size for fens in positions.values()):
+        board = Board(rng.choice(SEEDS))
+        for _ in range(rng.randrange(10, 80)):
+            moves = sorted(board._get_legal_moves())
+            if not moves:
+                break
+            board._push(rng.choice(moves))
+            fens = positions[classify(board)]
+            if len(fens) < size:
+                fens.append(board.fen())
+    return positions
+
+
+def make_game(plies: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    board = Board()
+    game = []
+    for _ in range(plies):
+        moves = sorted(board._get_legal_moves())
+        if not moves:
+            break
+        move = rng.choice(moves)
+        board._push(move)
+        game.append(Move.unpack(move).uci())
+    return game
+
+
+def make_suite(size: int) -> dict[str, Benchmark]:
+    positions = make_positions(size)
+    corpus = [fen for fens in positions.values() for fen in fens]
+    game = make_game(200)
+    suite: dict[str, Benchmark] = {}
+
+    def board_init() -> int:
+        for fen in corpus:
+            Board(fen)
+        return len(corpus)
+
+    boards = [Board(fen) for fen in corpus]
+
+    def fen() -> int:
+        for board in boards:
+            # fen() is cached until the next move
+            board._fen = None
+            board.fen()
+        return len(boards)
+
+    def move_uci() -> int:
+        board = Board()
+        for uci in game:
+            board.move_uci(uci)
+        return len(game)
+
+    def replay() -> int:
+        Board().replay(game)
+        return len(game)
+
+    suite['board_init'] = board_init
+    suite['fen'] = fen
+    suite['move_uci'] = move_uci
+    suite['replay'] = replay
+
+    for name in CLASSES:
+        class_boards = [Board(fen) for fen in positions[name]]
+
+        def legal_moves(class_boards: list[Board] = class_boards) -> int:
+            for board in class_boards:
+                board._legal_moves = None
+                board._get_legal_moves()
+            return len(class_boards)
+
+        suite[f'legal_moves/{name}'] = legal_moves
+
+    attack_boards = [Board(fen) for fen in positions['middlegame']]
+    squares = [row * 10 + col for row in range(2, 10) for col in range(1, 9)]
+
+    def square_attacked() -> int:
+        for board in attack_boards:
+            color = board.active_color
+            for index in squares:
+                board._is_square_under_attack(index, color)
+        return len(attack_boards) * len(squares)
+
+    suite['square_attacked'] = square_attacked
+
+    for name, (perft_fen, depth, nodes) in PERFT.items():
+
+        def perft(
+            perft_fen: str = perft_fen, depth: int = depth, nodes: int = nodes
+        ) -> int:
+            counted = Board(perft_fen).perft(depth)
+            if counted != nodes:
+                raise AssertionError(f'perft counted {counted}, not {nodes}')
+            return counted
+
+        suite[f'perft/{name}'] = perft
+    return suite
+
+
+def run(
+    suite: dict[str, Benchmark],
+    repeat: int,
+    min_time: float,
+    pattern: str | None = None,
+) -> dict[str, float]:
+    # every run calls a benchmark until min_time has passed and the
+    # fastest run counts, the runs of all benchmarks take turns so a
+    # slow spell of the machine does not land on just one of them
+    selected = {
+        name: benchmark
+        for name, benchmark in suite.items()
+        if not pattern or re.search(pattern, name)
+    }
+    for benchmark in selected.values():
+        benchmark()
+    results = dict.fromkeys(selected, 0.0)
+    for _ in range(repeat):
+        for name, benchmark in selected.items():
+            operations = 0
+            elapsed = 0.0
+            # like timeit, so collections do not land on whichever run
+            # happens to cross the threshold
+            gc.collect()
+            gc.disable()
+            try:
+                start = time.perf_counter()
+                while elapsed < min_time:
+                    operations += benchmark()
+                    elapsed = time.perf_counter() - start
+            finally:
+                gc.enable()
+            results[name] = max(results[name], operations / elapsed)
+    for name, rate in results.items():
+        print(f'{name}: {rate:.0f}/s', file=sys.stderr)
+    return results
+
+
+def compare(
+    baseline: dict[str, float], results: dict[str, float], threshold: float
+) -> list[str]:
+    # every metric is a rate, so a regression is one that dropped by
+    # more than threshold, returns the names of those
+    regressions = []
+    for name, rate in results.items():
+        if name not in baseline:
+            print(f'{name}: not in the baseline')
+            continue
+        change = rate / baseline[name] - 1
+        flag = ''
+        if change < -threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(
+            f'{name}: {baseline[name]:.0f}/s -> {rate:.0f}/s '
+            f'({change:+.1%}){flag}'
+        )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog='python benchmarks/suite.py',
+        description='measure the chess package and compare with a baseline',
+    )
+    parser.add_argument(
+        '-n',
+        '--size',
+        type=int,
+        default=200,
+        help='positions per position class',
+    )
+    parser.add_argument('-r', '--repeat', type=int, default=5)
+    parser.add_argument(
+        '--min-time',
+        type=float,
+        default=0.2,
+        help='seconds every run takes at least',
+    )
+    parser.add_argument(
+        '-k',
+        '--filter',
+        metavar='PATTERN',
+        help='only run the benchmarks whose name matches this regex',
+    )
+    parser.add_argument(
+        '-o',
+        '--output',
+        help='write the results to this json file',
+    )
+    parser.add_argument(
+        '--load',
+        metavar='PATH',
+        help='compare results from this json file instead of running',
+    )
+    parser.add_argument(
+        '--baseline',
+        metavar='PATH',
+        help='json file of an earlier run to compare with',
+    )
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=0.1,
+        help='slowdown that counts as a regression, 0.1 is 10%%',
+    )
+    args = parser.parse_args(argv)
+
+    if args.load:
+        with open(args.load) as f:
+            results = json.load(f)['results']
+    else:
+        results = run(
+            make_suite(args.size), args.repeat, args.min_time, args.filter
+        )
+    report = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+    elif not args.baseline:
+        print(json.dumps(report, indent=2))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(baseline, results, args.threshold)
+        if regressions:
+            print(f'{len(regressions)} regressed: {", ".join(regressions)}')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
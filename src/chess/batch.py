@@ -0,0 +1,325 @@
+import dataclasses
+import functools
+from typing import Iterable, Sequence
+
+import numpy as np
+
+from .board import Board
+from .position import Position
+from .util import INDEX_TO_SQUARE
+
+# squares are numbered a1=0, b1=1, ..., h8=63 as in chess.bitboard
+# pieces are 1 to 6 for a white pawn to king, negated for black, 0 is empty
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(1, 7)
+VALUES = np.array([0, 1, 3, 3, 5, 9, 0], dtype=np.int16)
+
+_FEN_SQUARES = np.array(
+    [rank * 8 + file for rank in range(7, -1, -1) for file in range(8)]
+)
+_CHAR_CODES = np.zeros(256, dtype=np.int8)
+for _code, _char in enumerate('pnbrqk', 1):
+    _CHAR_CODES[ord(_char.upper())] = _code
+    _CHAR_CODES[ord(_char)] = -_code
+
+
+def _mask(squares: Iterable[int]) -> np.uint64:
+    return np.uint64(sum(1 << sq for sq in squares))
+
+
+# a direction is a shift and the squares it can land on without wrapping
+# around the board, the targets of one direction from several pieces
+# never overlap, so counting them counts moves
+def _direction(dr: int, df: int) -> tuple[int, np.uint64]:
+    return dr * 8 + df, _mask(
+        sq
+        for sq in range(64)
+        if 0 <= sq % 8 - df < 8 and 0 <= sq // 8 - dr < 8
+    )
+
+
+_KNIGHT_DIRECTIONS = [
+    _direction(dr, df)
+    for dr, df in [
+        (1, 2),
+        (2, 1),
+        (2, -1),
+        (1, -2),
+        (-1, -2),
+        (-2, -1),
+        (-2, 1),
+        (-1, 2),
+    ]
+]
+_ROOK_DIRECTIONS = [
+    _direction(dr, df) for dr, df in [(1, 0), (-1, 0), (0, 1), (0, -1)]
+]
+_BISHOP_DIRECTIONS = [
+    _direction(dr, df) for dr, df in [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+]
+_KING_DIRECTIONS = _ROOK_DIRECTIONS + _BISHOP_DIRECTIONS
+# indexed by colour, 0 is white
+_PAWN_PUSHES = [_direction(1, 0), _direction(-1, 0)]
+_PAWN_CAPTURES = [
+    [_direction(1, -1), _direction(1, 1)],
+    [_direction(-1, -1), _direction(-1, 1)],
+]
+# pushes that land here can be pushed again
+_PAWN_DOUBLE_RANKS = [_mask(range(16, 24)), _mask(range(40, 48))]
+_PAWN_LAST_RANKS = [_mask(range(56, 64)), _mask(range(8))]
+# the colour, the bit, the king square and the squares between for each
+# castle right
+_CASTLES = [
+    (0, 1, _mask([4]), _mask([5, 6])),
+    (0, 2, _mask([4]), _mask([1, 2, 3])),
+    (1, 4, _mask([60]), _mask([61, 62])),
+    (1, 8, _mask([60]), _mask([57, 58, 59])),
+]
+_BIT = np.uint64(1) << np.arange(64, dtype=np.uint64)
+_BYTE_COUNTS = np.array([i.bit_count() for i in range(256)], np.uint8)
+_ZERO = np.uint64(0)
+
+
+def _shift(
+    bitboards: np.ndarray, direction: tuple[int, np.uint64]
+) -> np.ndarray:
+    amount, mask = direction
+    if amount > 0:
+        return (bitboards << np.uint64(amount)) & mask
+    return (bitboards >> np.uint64(-amount)) & mask
+
+
+def _slide(
+    bitboards: np.ndarray,
+    direction: tuple[int, np.uint64],
+    empty: np.ndarray,
+) -> np.ndarray:
+    # every square up to and including the first one that is not empty
+    targets = _shift(bitboards, direction)
+    ray = targets
+    for _ in range(6):
+        targets = _shift(targets & empty, direction)
+        ray |= targets
+    return ray
+
+
+def _count(bitboards: np.ndarray) -> np.ndarray:
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(bitboards).astype(np.int32)
+    counts = _BYTE_COUNTS[bitboards.view(np.uint8)]
+    return counts.reshape(-1, 8).sum(axis=1, dtype=np.int32)
+
+
+@dataclasses.dataclass
+class Analysis:
+    # whether the side to move is in check
+    in_check: np.ndarray
+    # pseudolegal moves of the side to move, as Board generates them
+    mobility: np.ndarray
+    # material of white and black with pawn=1 up to queen=9
+    material: np.ndarray
+
+
+@dataclasses.dataclass
+class Batch:
+    # (N, 64) piece codes
+    pieces: np.ndarray
+    # (N,) 0 if white is to move, 1 if black is
+    side: np.ndarray
+    # (N,) castle right bits as in chess.fen.CASTLE_RIGHTS
+    castling: np.ndarray
+    # (N,) en passant square, -1 if there is none
+    en_passant: np.ndarray
+    halfmoves: np.ndarray
+    fullmoves: np.ndarray
+
+    @classmethod
+    def from_fens(cls, fens: Iterable[str]) -> 'Batch':
+        return cls.from_positions([Position.from_fen(fen) for fen in fens])
+
+    @classmethod
+    def from_positions(cls, positions: Sequence[Position]) -> 'Batch':
+        count = len(positions)
+        # every placement goes through the character table at once
+        chars = ''.join([position.squares for position in positions])
+        codes = _CHAR_CODES[
+            np.frombuffer(chars.encode('ascii'), dtype=np.uint8)
+        ].reshape(count, 64)
+        pieces = np.zeros((count, 64), dtype=np.int8)
+        pieces[:, _FEN_SQUARES] = codes
+        return cls(
+            pieces,
+            np.array(
+                [position.active_color == 'b' for position in positions],
+                dtype=np.int8,
+            ),
+            np.array(
+                [position.castle_rights for position in positions],
+                dtype=np.uint8,
+            ),
+            np.array(
+                [
+                    INDEX_TO_SQUARE[position.en_passant]
+                    if position.en_passant
+                    else -1
+                    for position in positions
+                ],
+                dtype=np.int8,
+            ),
+            np.array(
+                [position.halfmoves for position in positions],
+                dtype=np.int16,
+            ),
+            np.array(
+                [position.fullmoves for position in positions],
+                dtype=np.int32,
+            ),
+        )
+
+    def __len__(self) -> int:
+        return len(self.side)
+
+    @functools.cached_property
+    def bitboards(self) -> np.ndarray:
+        # (13, N) bitboards indexed by piece code, negative codes wrap
+        # around to the black pieces and 0 holds the empty squares
+        planes = self.pieces[None, :, :] == np.arange(-6, 7)[:, None, None]
+        packed = np.packbits(planes, axis=2, bitorder='little')
+        bitboards = packed.view('<u8')[:, :, 0].astype(np.uint64)
+        return np.roll(bitboards, -6, axis=0)
+
+    def _attacks(self, color: int) -> np.ndarray:
+        sign = 1 if color == 0 else -1
+        bitboards = self.bitboards
+        empty = bitboards[0]
+        queens = bitboards[sign * QUEEN]
+        attacks = np.zeros(len(self), dtype=np.uint64)
+        for direction in _PAWN_CAPTURES[color]:
+            attacks |= _shift(bitboards[sign * PAWN], direction)
+        for direction in _KNIGHT_DIRECTIONS:
+            attacks |= _shift(bitboards[sign * KNIGHT], direction)
+        for direction in _KING_DIRECTIONS:
+            attacks |= _shift(bitboards[sign * KING], direction)
+        for sliders, directions in (
+            (bitboards[sign * ROOK] | queens, _ROOK_DIRECTIONS),
+            (bitboards[sign * BISHOP] | queens, _BISHOP_DIRECTIONS),
+        ):
+            for direction in directions:
+                attacks |= _slide(sliders, direction, empty)
+        return attacks
+
+    def attacks(self, color: int) -> np.ndarray:
+        # (N, 64) squares attacked by color, 0 is white
+        return (self._attacks(color)[:, None] & _BIT) != 0
+
+    def in_check(self) -> np.ndarray:
+        bitboards = self.bitboards
+        checked = np.zeros(len(self), dtype=bool)
+        for color, king in ((0, KING), (1, -KING)):
+            attacked = (bitboards[king] & self._attacks(1 - color)) != 0
+            checked |= (self.side == color) & attacked
+        return checked
+
+    def material(self) -> np.ndarray:
+        # (N, 2) material of white and black
+        white = VALUES[np.clip(self.pieces, 0, None)].sum(axis=1)
+        black = VALUES[np.clip(-self.pieces, 0, None)].sum(axis=1)
+        return np.stack([white, black], axis=1)
+
+    def mobility(self) -> np.ndarray:
+        mobility = np.zeros(len(self), dtype=np.int32)
+        for color in (0, 1):
+            rows = np.nonzero(self.side == color)[0]
+            if len(rows):
+                mobility[rows] = self._mobility(rows, color)
+        return mobility
+
+    def _mobility(self, rows: np.ndarray, color: int) -> np.ndarray:
+        sign = 1 if color == 0 else -1
+        bitboards = self.bitboards[:, rows]
+        empty = bitboards[0]
+        own = np.bitwise_or.reduce(bitboards[sign * np.arange(1, 7)], axis=0)
+        enemy = ~(own | empty)
+        free = ~own
+        moves = np.zeros(len(rows), dtype=np.int32)
+
+        queens = bitboards[sign * QUEEN]
+        for direction in _KNIGHT_DIRECTIONS:
+            moves += _count(_shift(bitboards[sign * KNIGHT], direction) & free)
+        for direction in _KING_DIRECTIONS:
+            moves += _count(_shift(bitboards[sign * KING], direction) & free)
+        for sliders, directions in (
+            (bitboards[sign * ROOK] | queens, _ROOK_DIRECTIONS),
+            (bitboards[sign * BISHOP] | queens, _BISHOP_DIRECTIONS),
+        ):
+            for direction in directions:
+                moves += _count(_slide(sliders, direction, empty) & free)
+
+        # a promotion counts once for every piece it can promote to
+        pawns = bitboards[sign * PAWN]
+        last_rank = _PAWN_LAST_RANKS[color]
+        single = _shift(pawns, _PAWN_PUSHES[color]) & empty
+        double = (
+            _shift(single & _PAWN_DOUBLE_RANKS[color], _PAWN_PUSHES[color])
+            & empty
+        )
+        moves += _count(single) + 3 * _count(single & last_rank)
+        moves += _count(double)
+        # en passant needs the pawn that made the double step behind it
+        en_passant = self.en_passant[rows].astype(np.int64)
+        has_en_passant = en_passant >= 0
+        behind = _shift(
+            np.where(has_en_passant, _BIT[en_passant], _ZERO),
+            _PAWN_PUSHES[1 - color],
+        )
+        en_passant_target = np.where(
+            (behind & bitboards[-sign * PAWN]) != 0, _BIT[en_passant], _ZERO
+        )
+        for direction in _PAWN_CAPTURES[color]:
+            captures = _shift(pawns, direction) & (enemy | en_passant_target)
+            moves += _count(captures) + 3 * _count(captures & last_rank)
+
+        castling = self.castling[rows]
+        occupied = ~empty
+        for castle_color, bit, king, between in _CASTLES:
+            if castle_color == color:
+                moves += (
+                    ((castling & bit) != 0)
+                    & ((bitboards[sign * KING] & king) != 0)
+                    & ((occupied & between) == 0)
+                )
+        return moves
+
+    def analyse(self) -> Analysis:
+        return Analysis(self.in_check(), self.mobility(), self.material())
+
+
+def analyse_board(board: Board) -> tuple[bool, int, tuple[int, int]]:
+    # the single position fallback, worked out with Board alone
+    color = board.active_color
+    moves: list[int] = []
+    for piece, index in board._pieces[color.index].items():
+        piece.add_pseudolegal_moves(board, index, moves)
+    values = {'p': 1, 'n': 3, 'b': 3, 'r': 5, 'q': 9, 'k': 0}
+    material = [0, 0]
+    for pieces in board._pieces:
+        for piece in pieces:
+            material[piece.color.index] += values[piece.char]
+    return (
+        board._is_king_in_check(color),
+        len(moves),
+        (material[0], material[1]),
+    )
+
+
+def mismatches(fens: Sequence[str], analysis: Analysis) -> list[int]:
+    # indices of the positions where the batch and Board disagree
+    return [
+        i
+        for i, fen in enumerate(fens)
+        if analyse_board(Board(fen))
+        != (
+            bool(analysis.in_check[i]),
+            int(analysis.mobility[i]),
+            (int(analysis.material[i, 0]), int(analysis.material[i, 1])),
+        )
+    ]
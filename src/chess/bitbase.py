@@ -0,0 +1,385 @@
+import argparse
+import collections
+import mmap
+import os
+import random
+import time
+
+from . import pieces as p
+from .board import Board
+from .color import BLACK, WHITE
+from .position import Position
+from .util import INDEX_TO_SQUARE
+
+# results from the point of view of the side to move
+LOSS, DRAW, WIN = -1, 0, 1
+# every position takes two bits: 0 for an illegal one, then loss,
+# draw and win
+_ILLEGAL, _LOSS, _DRAW, _WIN = range(4)
+_RESULTS = [None, LOSS, DRAW, WIN]
+
+# a position is the side to move (0 is white, the side with the extra
+# piece), the white king, the black king and the extra piece, all of
+# them squares from a1=0 to h8=63
+SIZE = 2 * 64 * 64 * 64
+# in the order they are generated, pawns promote into the ones before
+ENDGAMES = ['kqk', 'krk', 'kpk']
+
+
+def _index(side: int, white_king: int, black_king: int, piece: int) -> int:
+    return side << 18 | white_king << 12 | black_king << 6 | piece
+
+
+def _on_board(rank: int, file: int) -> bool:
+    return 0 <= rank < 8 and 0 <= file < 8
+
+
+def _make_rays(directions: list[tuple[int, int]]) -> list[list[list[int]]]:
+    rays = []
+    for sq in range(64):
+        square_rays = []
+        for dr, df in directions:
+            ray = []
+            rank, file = sq // 8 + dr, sq % 8 + df
+            while _on_board(rank, file):
+                ray.append(rank * 8 + file)
+                rank, file = rank + dr, file + df
+            square_rays.append(ray)
+        rays.append(square_rays)
+    return rays
+
+
+def _make_between(rays: list[list[list[int]]]) -> list[int]:
+    # the squares in between two squares on a ray, -1 if there is no ray
+    between = [-1] * 64 * 64
+    for sq, square_rays in enumerate(rays):
+        for ray in square_rays:
+            mask = 0
+            for target in ray:
+                between[sq * 64 + target] = mask
+                mask |= 1 << target
+    return between
+
+
+_KING_STEPS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+_KING_STEPS += [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+_KINGS = [
+    [
+        (sq // 8 + dr) * 8 + sq % 8 + df
+        for dr, df in _KING_STEPS
+        if _on_board(sq // 8 + dr, sq % 8 + df)
+    ]
+    for sq in range(64)
+]
+_KING_MASKS = [sum(1 << target for target in _KINGS[sq]) for sq in range(64)]
+_RAYS = {
+    'r': _make_rays(_KING_STEPS[:4]),
+    'b': _make_rays(_KING_STEPS[4:]),
+}
+_RAYS['q'] = [r + b for r, b in zip(_RAYS['r'], _RAYS['b'])]
+_BETWEEN = {char: _make_between(rays) for char, rays in _RAYS.items()}
+_PAWN_ATTACKS = [
+    sum(
+        1 << (sq + 8 + df)
+        for df in (-1, 1)
+        if sq < 56 and _on_board(sq // 8 + 1, sq % 8 + df)
+    )
+    for sq in range(64)
+]
+
+
+def _is_attacked(char: str, piece: int, target: int, blockers: int) -> bool:
+    if char == 'p':
+        return bool(_PAWN_ATTACKS[piece] >> target & 1)
+    between = _BETWEEN[char][piece * 64 + target]
+    return between >= 0 and not between & blockers
+
+
+def generate(char: str, promotions: dict[str, bytearray]) -> bytearray:
+    # retrograde analysis: mates are found first, then every position
+    # one move before a lost one is won and every position whose moves
+    # all lead to won ones is lost, whatever is left is a draw
+    # promotions holds the unpacked kqk and krk results for pawns
+    results = bytearray(SIZE)
+    # black moves that do not lead to a win yet, -1 if black can draw
+    # by taking the piece
+    remaining = [0] * (SIZE // 2)
+    queue: collections.deque[int] = collections.deque()
+    pawn = char == 'p'
+
+    for white_king in range(64):
+        for black_king in range(64):
+            if (
+                black_king == white_king
+                or _KING_MASKS[white_king] >> black_king & 1
+            ):
+                continue
+            blockers = 1 << white_king
+            for piece in range(8, 56) if pawn else range(64):
+                if piece == white_king or piece == black_king:
+                    continue
+                check = _is_attacked(char, piece, black_king, blockers)
+
+                # white to move, black may not be in check
+                if not check:
+                    i = _index(0, white_king, black_king, piece)
+                    results[i] = _DRAW
+                    target = piece + 8
+                    if (
+                        pawn
+                        and piece >= 48
+                        and target != white_king
+                        and target != black_king
+                    ):
+                        j = _index(1, white_king, black_king, target)
+                        if _LOSS in (promotions['q'][j], promotions['r'][j]):
+                            results[i] = _WIN
+                            queue.append(i)
+
+                i = _index(1, white_king, black_king, piece)
+                results[i] = _DRAW
+                moves = 0
+                for target in _KINGS[black_king]:
+                    if _KING_MASKS[white_king] >> target & 1:
+                        continue
+                    if target == piece:
+                        if not _KING_MASKS[white_king] >> piece & 1:
+                            moves = -1
+                            break
+                        continue
+                    if not _is_attacked(char, piece, target, blockers):
+                        moves += 1
+                remaining[i - SIZE // 2] = moves
+                if moves == 0 and check:
+                    results[i] = _LOSS
+                    queue.append(i)
+
+    while queue:
+        i = queue.popleft()
+        white_king = i >> 12 & 63
+        black_king = i >> 6 & 63
+        piece = i & 63
+        if i >> 18:
+            # black is lost here, so every white move into it wins
+            predecessors = [
+                _index(0, square, black_king, piece)
+                for square in _KINGS[white_king]
+                if square != piece
+            ]
+            if pawn:
+                square = piece - 8
+                if square >= 8 and square not in (white_king, black_king):
+                    predecessors.append(
+                        _index(0, white_king, black_king, square)
+                    )
+                    square -= 8
+                    if square // 8 == 1 and square not in (
+                        white_king,
+                        black_king,
+                    ):
+                        predecessors.append(
+                            _index(0, white_king, black_king, square)
+                        )
+            else:
+                for ray in _RAYS[char][piece]:
+                    for square in ray:
+                        if square == white_king or square == black_king:
+                            break
+                        predecessors.append(
+                            _index(0, white_king, black_king, square)
+                        )
+            # illegal positions are never marked as a draw
+            for j in predecessors:
+                if results[j] == _DRAW:
+                    results[j] = _WIN
+                    queue.append(j)
+        else:
+            # white wins here, black moves into it lose once none is left
+            for square in _KINGS[black_king]:
+                if square == piece:
+                    continue
+                j = _index(1, white_king, square, piece)
+                moves = remaining[j - SIZE // 2]
+                if moves > 0 and results[j] == _DRAW:
+                    remaining[j - SIZE // 2] = moves - 1
+                    if moves == 1:
+                        results[j] = _LOSS
+                        queue.append(j)
+    return results
+
+
+def pack(results: bytearray) -> bytearray:
+    packed = bytearray(SIZE // 4)
+    for i in range(0, SIZE, 4):
+        packed[i >> 2] = (
+            results[i]
+            | results[i + 1] << 2
+            | results[i + 2] << 4
+            | results[i + 3] << 6
+        )
+    return packed
+
+
+def generate_all(directory: str | os.PathLike) -> None:
+    os.makedirs(directory, exist_ok=True)
+    results: dict[str, bytearray] = {}
+    for name in ENDGAMES:
+        char = name[1]
+        results[char] = generate(char, results)
+        with open(os.path.join(directory, f'{name}.bin'), 'wb') as f:
+            f.write(pack(results[char]))
+
+
+class Bitbases:
+    def __init__(self, directory: str | os.PathLike) -> None:
+        self._tables: dict[str, mmap.mmap] = {}
+        for name in ENDGAMES:
+            path = os.path.join(directory, f'{name}.bin')
+            if not os.path.exists(path):
+                continue
+            with open(path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size != SIZE // 4:
+                    raise ValueError(f'bitbase has the wrong size: {path}')
+                self._tables[name[1]] = mmap.mmap(
+                    f.fileno(), 0, access=mmap.ACCESS_READ
+                )
+
+    def __enter__(self) -> 'Bitbases':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for table in self._tables.values():
+            table.close()
+
+    def probe_squares(
+        self,
+        char: str,
+        side: int,
+        white_king: int,
+        black_king: int,
+        piece: int,
+    ) -> int | None:
+        # white has the piece, None for an illegal position
+        i = _index(side, white_king, black_king, piece)
+        return _RESULTS[self._tables[char][i >> 2] >> ((i & 3) << 1) & 3]
+
+    def probe(self, board: Board) -> int | None:
+        # None if the position is not covered
+        pieces = [
+            (piece, index)
+            for color_pieces in board._pieces
+            for piece, index in color_pieces.items()
+            if not isinstance(piece, p.King)
+        ]
+        if len(pieces) > 1 or not all(board._kings):
+            return None
+        if not pieces:
+            return DRAW
+        piece, index = pieces[0]
+        if isinstance(piece, (p.Knight, p.Bishop)):
+            return DRAW
+        if piece.char not in self._tables:
+            return None
+        strong = piece.color
+        squares = [
+            INDEX_TO_SQUARE[board._kings[strong.index]],
+            INDEX_TO_SQUARE[board._kings[1 - strong.index]],
+            INDEX_TO_SQUARE[index],
+        ]
+        if strong is BLACK:
+            # the tables have white as the strong side, so the board is
+            # flipped upside down
+            squares = [sq ^ 56 for sq in squares]
+        side = 0 if board.active_color is strong else 1
+        return self.probe_squares(piece.char, side, *squares)
+
+
+def _make_board(char: str, i: int) -> Board:
+    squares = ['.'] * 64
+    for sq, icon in ((i >> 12 & 63, 'K'), (i >> 6 & 63, 'k'), (i & 63, char)):
+        squares[(7 - sq // 8) * 8 + sq % 8] = icon
+    return Board.from_position(
+        Position(''.join(squares), 'b' if i >> 18 else 'w', 0, 0, 0, 1)
+    )
+
+
+def validate(
+    bitbases: Bitbases, char: str, samples: int = 1000, seed: int = 0
+) -> list[str]:
+    # checks random positions against Board: a position is illegal if
+    # the side not to move is in check, and every result has to be the
+    # best one over Board's legal moves, one ply deep
+    # returns the fens of the positions that do not match
+    rng = random.Random(seed)
+    mismatches = []
+    checked = 0
+    while checked < samples:
+        i = rng.randrange(SIZE)
+        white_king, black_king, piece = i >> 12 & 63, i >> 6 & 63, i & 63
+        if len({white_king, black_king, piece}) < 3 or (
+            char == 'p' and not 8 <= piece < 56
+        ):
+            continue
+        board = _make_board(char.upper(), i)
+        result = bitbases.probe_squares(
+            char, i >> 18, white_king, black_king, piece
+        )
+        color = board.active_color
+        illegal = board._is_king_in_check(BLACK if color is WHITE else WHITE)
+        if illegal or result is None:
+            if illegal != (result is None):
+                mismatches.append(board.fen())
+            continue
+        checked += 1
+        outcomes = []
+        for move in board._get_legal_moves():
+            board._push(move)
+            outcome = bitbases.probe(board)
+            board._pop()
+            if outcome is None:
+                mismatches.append(board.fen())
+                break
+            outcomes.append(-outcome)
+        else:
+            if outcomes:
+                expected = max(outcomes)
+            elif board._is_king_in_check(color):
+                expected = LOSS
+            else:
+                expected = DRAW
+            if expected != result:
+                mismatches.append(board.fen())
+    return mismatches
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog='python -m chess.bitbase',
+        description='generate the kqk, krk and kpk bitbases',
+    )
+    parser.add_argument('directory')
+    parser.add_argument(
+        '--validate',
+        type=int,
+        default=1000,
+        metavar='N',
+        help='number of positions per bitbase to check against Board',
+    )
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    generate_all(args.directory)
+    print(f'generated in {time.perf_counter() - start:.1f}s')
+    with Bitbases(args.directory) as bitbases:
+        for name in ENDGAMES:
+            mismatches = validate(bitbases, name[1], args.validate)
+            print(f'{name}: {len(mismatches)} mismatches')
+            for fen in mismatches:
+                print(f'  {fen}')
+
+
+if __name__ == '__main__':
+    main()
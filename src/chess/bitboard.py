@@ -0,0 +1,735 @@
+from typing import Iterable
+
+from . import pieces as p
+from . import status
+from .color import BLACK, WHITE, Color
+from .exceptions import IllegalMoveError, NotAPieceError
+from .fen import STARTING_FEN
+from .position import Position
+from .status import Status
+from .util import (
+    INDEX_TO_SQUARE,
+    SQUARE_TO_INDEX,
+    CastleRights,
+    Move,
+    index_to_square,
+    square_to_index,
+)
+
+# squares are numbered a1=0, b1=1, ..., h8=63
+# pieces are numbered color * 6 + piece type
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+_WHITE, _BLACK = 0, 1
+
+_PIECE_TYPES = [p.Pawn, p.Knight, p.Bishop, p.Rook, p.Queen, p.King]
+_PROMOTION_CHARS = ['', 'N', 'B', 'R', 'Q']
+_CHAR_TO_PROMOTION = {'': 0, 'N': KNIGHT, 'B': BISHOP, 'R': ROOK, 'Q': QUEEN}
+_COLORS = [WHITE, BLACK]
+
+# fen characters by piece number, -1 (an empty square) picks the '.'
+_FEN_CHARS = 'PNBRQKpnbrqk.'
+# squares in the order fen lists them, a8 to h1
+_FEN_SQUARES = [
+    rank * 8 + file for rank in range(7, -1, -1) for file in range(8)
+]
+
+_FULL = (1 << 64) - 1
+
+_CASTLE_K, _CASTLE_Q, _CASTLE_k, _CASTLE_q = 1, 2, 4, 8
+_CASTLE_MASK = [15] * 64
+_CASTLE_MASK[0] = 15 ^ _CASTLE_Q
+_CASTLE_MASK[7] = 15 ^ _CASTLE_K
+_CASTLE_MASK[4] = 15 ^ (_CASTLE_K | _CASTLE_Q)
+_CASTLE_MASK[56] = 15 ^ _CASTLE_q
+_CASTLE_MASK[63] = 15 ^ _CASTLE_k
+_CASTLE_MASK[60] = 15 ^ (_CASTLE_k | _CASTLE_q)
+
+
+def _on_board(rank: int, file: int) -> bool:
+    return 0 <= rank < 8 and 0 <= file < 8
+
+
+def _leaper_attacks(deltas: list[tuple[int, int]]) -> list[int]:
+    table = []
+    for sq in range(64):
+        rank, file = divmod(sq, 8)
+        attacks = 0
+        for dr, df in deltas:
+            if _on_board(rank + dr, file + df):
+                attacks |= 1 << ((rank + dr) * 8 + file + df)
+        table.append(attacks)
+    return table
+
+
+def _ray_attacks(dr: int, df: int) -> list[int]:
+    table = []
+    for sq in range(64):
+        rank, file = divmod(sq, 8)
+        attacks = 0
+        rank, file = rank + dr, file + df
+        while _on_board(rank, file):
+            attacks |= 1 << (rank * 8 + file)
+            rank, file = rank + dr, file + df
+        table.append(attacks)
+    return table
+
+
+KNIGHT_ATTACKS = _leaper_attacks(
+    [(1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2)]
+)
+KING_ATTACKS = _leaper_attacks(
+    [(1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1)]
+)
+PAWN_ATTACKS = [
+    _leaper_attacks([(1, -1), (1, 1)]),
+    _leaper_attacks([(-1, -1), (-1, 1)]),
+]
+
+# rays going towards higher squares are cut at their lowest set blocker,
+# rays going towards lower squares at their highest one
+_NORTH = _ray_attacks(1, 0)
+_EAST = _ray_attacks(0, 1)
+_NORTH_EAST = _ray_attacks(1, 1)
+_NORTH_WEST = _ray_attacks(1, -1)
+_SOUTH = _ray_attacks(-1, 0)
+_WEST = _ray_attacks(0, -1)
+_SOUTH_EAST = _ray_attacks(-1, 1)
+_SOUTH_WEST = _ray_attacks(-1, -1)
+
+ROOK_RAYS = [
+    _NORTH[sq] | _EAST[sq] | _SOUTH[sq] | _WEST[sq] for sq in range(64)
+]
+BISHOP_RAYS = [
+    _NORTH_EAST[sq] | _NORTH_WEST[sq] | _SOUTH_EAST[sq] | _SOUTH_WEST[sq]
+    for sq in range(64)
+]
+
+
+def _between_and_line() -> tuple[list[list[int]], list[list[int]]]:
+    between = [[0] * 64 for _ in range(64)]
+    line = [[0] * 64 for _ in range(64)]
+    directions = [
+        (_NORTH, _SOUTH, 8),
+        (_EAST, _WEST, 1),
+        (_NORTH_EAST, _SOUTH_WEST, 9),
+        (_NORTH_WEST, _SOUTH_EAST, 7),
+    ]
+    for sq in range(64):
+        for forward, backward, step in directions:
+            full = forward[sq] | backward[sq] | 1 << sq
+            for ray, sign in ((forward, 1), (backward, -1)):
+                squares = 0
+                target = sq
+                rest = ray[sq]
+                while rest:
+                    target += step * sign
+                    between[sq][target] = squares
+                    line[sq][target] = full
+                    squares |= 1 << target
+                    rest &= ~(1 << target)
+    return between, line
+
+
+BETWEEN, LINE = _between_and_line()
+
+
+def rook_attacks(sq: int, occ: int) -> int:
+    attacks = 0
+    ray = _NORTH[sq]
+    blockers = ray & occ
+    if blockers:
+        ray ^= _NORTH[(blockers & -blockers).bit_length() - 1]
+    attacks |= ray
+    ray = _EAST[sq]
+    blockers = ray & occ
+    if blockers:
+        ray ^= _EAST[(blockers & -blockers).bit_length() - 1]
+    attacks |= ray
+    ray = _SOUTH[sq]
+    blockers = ray & occ
+    if blockers:
+        ray ^= _SOUTH[blockers.bit_length() - 1]
+    attacks |= ray
+    ray = _WEST[sq]
+    blockers = ray & occ
+    if blockers:
+        ray ^= _WEST[blockers.bit_length() - 1]
+    return attacks | ray
+
+
+def bishop_attacks(sq: int, occ: int) -> int:
+    attacks = 0
+    ray = _NORTH_EAST[sq]
+    blockers = ray & occ
+    if blockers:
+        ray ^= _NORTH_EAST[(blockers & -blockers).bit_length() - 1]
+    attacks |= ray
+    ray = _NORTH_WEST[sq]
+    blockers = ray & occ
+    if blockers:
+        ray ^= _NORTH_WEST[(blockers & -blockers).bit_length() - 1]
+    attacks |= ray
+    ray = _SOUTH_EAST[sq]
+    blockers = ray & occ
+    if blockers:
+        ray ^= _SOUTH_EAST[blockers.bit_length() - 1]
+    attacks |= ray
+    ray = _SOUTH_WEST[sq]
+    blockers = ray & occ
+    if blockers:
+        ray ^= _SOUTH_WEST[blockers.bit_length() - 1]
+    return attacks | ray
+
+
+def queen_attacks(sq: int, occ: int) -> int:
+    return rook_attacks(sq, occ) | bishop_attacks(sq, occ)
+
+
+def _encode(origin: int, dest: int, promotion: int = 0) -> int:
+    return origin | dest << 6 | promotion << 12
+
+
+def _to_move(move: int) -> Move:
+    return Move(
+        SQUARE_TO_INDEX[move & 63],
+        SQUARE_TO_INDEX[move >> 6 & 63],
+        _PROMOTION_CHARS[move >> 12],
+    )
+
+
+def _from_move(move: Move) -> int:
+    origin = INDEX_TO_SQUARE[move.origin]
+    dest = INDEX_TO_SQUARE[move.dest]
+    if origin < 0 or dest < 0:
+        raise ValueError(f'move is not on board: {move.origin, move.dest}')
+    promotion = _CHAR_TO_PROMOTION.get(move.promotion)
+    if promotion is None:
+        raise ValueError(f'not a promotion piece: {move.promotion}')
+    return _encode(origin, dest, promotion)
+
+
+class BitBoard:
+    def __init__(self, fen: str | None = None) -> None:
+        if fen is None:
+            fen = STARTING_FEN
+        self._load(Position.from_fen(fen))
+
+    @classmethod
+    def from_position(cls, position: Position):
+        board = cls.__new__(cls)
+        board._load(position)
+        return board
+
+    def _load(self, position: Position) -> None:
+        self._bb = [0] * 12
+        self._occ = [0, 0]
+        self._squares = [-1] * 64
+        self._parse_board(position.squares)
+        self._side = _WHITE if position.active_color == 'w' else _BLACK
+        # the castle right bits are the ones chess.fen uses
+        self._castling = position.castle_rights
+        self._ep = (
+            INDEX_TO_SQUARE[position.en_passant] if position.en_passant else -1
+        )
+        self.fullmoves = position.fullmoves
+        self.halfmoves = position.halfmoves
+        self._stack: list[
+            tuple[Move, tuple, list[int] | None, Status | None]
+        ] = []
+        self._legal_moves: list[int] | None = None
+        self._status: Status | None = None
+        self._fen: str | None = None
+
+    def copy(self) -> 'BitBoard':
+        # the move history is not copied, pop() only works on the original
+        board = self.__class__.__new__(self.__class__)
+        board.__dict__.update(self.__dict__)
+        board._bb = self._bb[:]
+        board._occ = self._occ[:]
+        board._squares = self._squares[:]
+        board._stack = []
+        return board
+
+    def position(self) -> Position:
+        squares = self._squares
+        return Position(
+            ''.join([_FEN_CHARS[squares[sq]] for sq in _FEN_SQUARES]),
+            'wb'[self._side],
+            self._castling,
+            self.en_passant,
+            self.halfmoves,
+            self.fullmoves,
+        )
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}('{self.fen()}')"
+
+    def __iter__(self):
+        entities: list[p.Piece | p.Empty | p.Border] = [p.BORDER] * 120
+        for sq, piece in enumerate(self._squares):
+            index = SQUARE_TO_INDEX[sq]
+            if piece < 0:
+                entities[index] = p.EMPTY
+            else:
+                color, piece_type = divmod(piece, 6)
+                entities[index] = _PIECE_TYPES[piece_type](_COLORS[color])
+        return entities.__iter__()
+
+    def __getitem__(self, __key: str | int):
+        if isinstance(__key, str):
+            __key = square_to_index(__key)
+        sq = INDEX_TO_SQUARE[__key]
+        if sq < 0:
+            return p.BORDER
+        piece = self._squares[sq]
+        if piece < 0:
+            return p.EMPTY
+        color, piece_type = divmod(piece, 6)
+        return _PIECE_TYPES[piece_type](_COLORS[color])
+
+    @property
+    def legal_moves(self) -> set[Move]:
+        return {_to_move(move) for move in self._get_legal_moves()}
+
+    def _get_legal_moves(self) -> list[int]:
+        if self._legal_moves is None:
+            self._legal_moves = self._generate()
+        return self._legal_moves
+
+    @property
+    def status(self) -> Status:
+        if self._status is None:
+            self._status = self._get_status()
+        return self._status
+
+    def has_legal_move(self) -> bool:
+        # there is no early exit in _generate, so the moves are kept for
+        # the move that usually follows
+        return bool(self._get_legal_moves())
+
+    @property
+    def active_color(self) -> Color:
+        return _COLORS[self._side]
+
+    @property
+    def castle_rights(self) -> list[CastleRights]:
+        return [
+            CastleRights(
+                bool(self._castling & _CASTLE_K),
+                bool(self._castling & _CASTLE_Q),
+            ),
+            CastleRights(
+                bool(self._castling & _CASTLE_k),
+                bool(self._castling & _CASTLE_q),
+            ),
+        ]
+
+    @property
+    def en_passant(self) -> int:
+        return 0 if self._ep < 0 else SQUARE_TO_INDEX[self._ep]
+
+    def _parse_board(self, squares: str) -> None:
+        for sq, char in zip(_FEN_SQUARES, squares):
+            if char != '.':
+                self._set(sq, _FEN_CHARS.index(char))
+
+    def fen(self) -> str:
+        if self._fen is None:
+            self._fen = self.position().fen()
+        return self._fen
+
+    def _set(self, sq: int, piece: int) -> None:
+        bit = 1 << sq
+        self._bb[piece] |= bit
+        self._occ[piece // 6] |= bit
+        self._squares[sq] = piece
+
+    def _clear(self, sq: int) -> None:
+        bit = 1 << sq
+        piece = self._squares[sq]
+        self._bb[piece] ^= bit
+        self._occ[piece // 6] ^= bit
+        self._squares[sq] = -1
+
+    def _is_square_attacked(self, sq: int, color: int, occ: int) -> bool:
+        bb = self._bb
+        base = color * 6
+        if PAWN_ATTACKS[color ^ 1][sq] & bb[base + PAWN]:
+            return True
+        if KNIGHT_ATTACKS[sq] & bb[base + KNIGHT]:
+            return True
+        if KING_ATTACKS[sq] & bb[base + KING]:
+            return True
+        queens = bb[base + QUEEN]
+        rooks = bb[base + ROOK] | queens
+        if rooks & ROOK_RAYS[sq] and rook_attacks(sq, occ) & rooks:
+            return True
+        bishops = bb[base + BISHOP] | queens
+        if bishops & BISHOP_RAYS[sq] and bishop_attacks(sq, occ) & bishops:
+            return True
+        return False
+
+    def _attackers(self, sq: int, color: int, occ: int) -> int:
+        bb = self._bb
+        base = color * 6
+        queens = bb[base + QUEEN]
+        return (
+            PAWN_ATTACKS[color ^ 1][sq] & bb[base + PAWN]
+            | KNIGHT_ATTACKS[sq] & bb[base + KNIGHT]
+            | KING_ATTACKS[sq] & bb[base + KING]
+            | rook_attacks(sq, occ) & (bb[base + ROOK] | queens)
+            | bishop_attacks(sq, occ) & (bb[base + BISHOP] | queens)
+        )
+
+    def _is_king_in_check(self, color: int) -> bool:
+        king = self._bb[color * 6 + KING]
+        if not king:
+            return False
+        return self._is_square_attacked(
+            king.bit_length() - 1, color ^ 1, self._occ[0] | self._occ[1]
+        )
+
+    def _generate(self) -> list[int]:
+        us = self._side
+        them = us ^ 1
+        bb = self._bb
+        base = us * 6
+        enemy_base = them * 6
+        own = self._occ[us]
+        enemy = self._occ[them]
+        occ = own | enemy
+        moves: list[int] = []
+        append = moves.append
+
+        king = bb[base + KING]
+        ksq = king.bit_length() - 1
+        checkers = 0
+        pinned = 0
+        pin_lines: dict[int, int] = {}
+        enemy_queens = bb[enemy_base + QUEEN]
+        enemy_rooks = bb[enemy_base + ROOK] | enemy_queens
+        enemy_bishops = bb[enemy_base + BISHOP] | enemy_queens
+
+        if king:
+            checkers = self._attackers(ksq, them, occ)
+            snipers = ROOK_RAYS[ksq] & enemy_rooks
+            snipers |= BISHOP_RAYS[ksq] & enemy_bishops
+            while snipers:
+                bit = snipers & -snipers
+                snipers ^= bit
+                sniper = bit.bit_length() - 1
+                blockers = BETWEEN[ksq][sniper] & occ
+                if blockers & own and not blockers & (blockers - 1):
+                    pinned |= blockers
+                    pin_lines[blockers.bit_length() - 1] = LINE[ksq][sniper]
+
+            targets = KING_ATTACKS[ksq] & ~own
+            without_king = occ ^ king
+            while targets:
+                bit = targets & -targets
+                targets ^= bit
+                dest = bit.bit_length() - 1
+                if not self._is_square_attacked(dest, them, without_king):
+                    append(ksq | dest << 6)
+
+            if checkers & (checkers - 1):
+                return moves
+
+        if checkers:
+            checker = checkers.bit_length() - 1
+            mask = checkers | BETWEEN[ksq][checker]
+        else:
+            mask = _FULL
+            self._generate_castling(ksq, occ, append)
+
+        allowed = ~own & mask
+
+        pieces = bb[base + KNIGHT] & ~pinned
+        while pieces:
+            bit = pieces & -pieces
+            pieces ^= bit
+            origin = bit.bit_length() - 1
+            targets = KNIGHT_ATTACKS[origin] & allowed
+            while targets:
+                dest_bit = targets & -targets
+                targets ^= dest_bit
+                append(origin | (dest_bit.bit_length() - 1) << 6)
+
+        for piece_type, attacks in (
+            (BISHOP, bishop_attacks),
+            (ROOK, rook_attacks),
+            (QUEEN, queen_attacks),
+        ):
+            pieces = bb[base + piece_type]
+            while pieces:
+                bit = pieces & -pieces
+                pieces ^= bit
+                origin = bit.bit_length() - 1
+                targets = attacks(origin, occ) & allowed
+                if bit & pinned:
+                    targets &= pin_lines[origin]
+                while targets:
+                    dest_bit = targets & -targets
+                    targets ^= dest_bit
+                    append(origin | (dest_bit.bit_length() - 1) << 6)
+
+        self._generate_pawn_moves(
+            us, own, enemy, occ, mask, pinned, pin_lines, ksq, append
+        )
+        return moves
+
+    def _generate_castling(self, ksq: int, occ: int, append) -> None:
+        us = self._side
+        them = us ^ 1
+        kingside, queenside = (
+            (_CASTLE_K, _CASTLE_Q) if us == _WHITE else (_CASTLE_k, _CASTLE_q)
+        )
+        home = 4 if us == _WHITE else 60
+        if ksq != home:
+            return
+        if (
+            self._castling & kingside
+            and not occ & (0b11 << home + 1)
+            and not self._is_square_attacked(home + 1, them, occ)
+            and not self._is_square_attacked(home + 2, them, occ)
+        ):
+            append(home | (home + 2) << 6)
+        if (
+            self._castling & queenside
+            and not occ & (0b111 << home - 3)
+            and not self._is_square_attacked(home - 1, them, occ)
+            and not self._is_square_attacked(home - 2, them, occ)
+        ):
+            append(home | (home - 2) << 6)
+
+    def _generate_pawn_moves(
+        self,
+        us: int,
+        own: int,
+        enemy: int,
+        occ: int,
+        mask: int,
+        pinned: int,
+        pin_lines: dict[int, int],
+        ksq: int,
+        append,
+    ) -> None:
+        bb = self._bb
+        forward = 8 if us == _WHITE else -8
+        start_rank = 1 if us == _WHITE else 6
+        last_rank = 7 if us == _WHITE else 0
+        attacks_table = PAWN_ATTACKS[us]
+        ep = self._ep
+
+        pawns = bb[us * 6 + PAWN]
+        while pawns:
+            bit = pawns & -pawns
+            pawns ^= bit
+            origin = bit.bit_length() - 1
+            allowed = mask
+            if bit & pinned:
+                allowed &= pin_lines[origin]
+
+            dests = []
+            dest = origin + forward
+            if not occ >> dest & 1:
+                if allowed >> dest & 1:
+                    dests.append(dest)
+                dest += forward
+                if (
+                    origin >> 3 == start_rank
+                    and not occ >> dest & 1
+                    and allowed >> dest & 1
+                ):
+                    dests.append(dest)
+
+            targets = attacks_table[origin] & enemy & allowed
+            while targets:
+                dest_bit = targets & -targets
+                targets ^= dest_bit
+                dests.append(dest_bit.bit_length() - 1)
+
+            for dest in dests:
+                if dest >> 3 == last_rank:
+                    for promotion in (QUEEN, ROOK, BISHOP, KNIGHT):
+                        append(origin | dest << 6 | promotion << 12)
+                else:
+                    append(origin | dest << 6)
+
+            if ep >= 0 and attacks_table[origin] >> ep & 1:
+                if self._is_en_passant_legal(origin, ep, forward, ksq, occ):
+                    append(origin | ep << 6)
+
+    def _is_en_passant_legal(
+        self, origin: int, ep: int, forward: int, ksq: int, occ: int
+    ) -> bool:
+        captured_bit = 1 << (ep - forward)
+        them = self._side ^ 1
+        enemy_pawns = self._bb[them * 6 + PAWN]
+        if not enemy_pawns & captured_bit:
+            return False
+        if ksq < 0:
+            return True
+        after = occ ^ (1 << origin) ^ captured_bit | 1 << ep
+        self._bb[them * 6 + PAWN] = enemy_pawns ^ captured_bit
+        try:
+            return not self._is_square_attacked(ksq, them, after)
+        finally:
+            self._bb[them * 6 + PAWN] = enemy_pawns
+
+    def _make(self, move: int) -> None:
+        origin = move & 63
+        dest = move >> 6 & 63
+        promotion = move >> 12
+        us = self._side
+        piece = self._squares[origin]
+        if piece < 0:
+            raise NotAPieceError(
+                f'not a piece: {index_to_square(SQUARE_TO_INDEX[origin])}'
+            )
+
+        self.halfmoves += 1
+        if self._squares[dest] >= 0:
+            self._clear(dest)
+            self.halfmoves = 0
+        self._clear(origin)
+        self._set(dest, piece)
+
+        ep = -1
+        piece_type = piece - us * 6
+        if piece_type == PAWN:
+            self.halfmoves = 0
+            if dest == self._ep:
+                self._clear(dest - 8 if us == _WHITE else dest + 8)
+            elif dest - origin in (16, -16):
+                ep = (origin + dest) // 2
+            if promotion:
+                self._clear(dest)
+                self._set(dest, us * 6 + promotion)
+        elif piece_type == KING:
+            if dest - origin == 2:
+                rook = self._squares[origin + 3]
+                self._clear(origin + 3)
+                self._set(origin + 1, rook)
+            elif origin - dest == 2:
+                rook = self._squares[origin - 4]
+                self._clear(origin - 4)
+                self._set(origin - 1, rook)
+
+        self._castling &= _CASTLE_MASK[origin] & _CASTLE_MASK[dest]
+        self._ep = ep
+        self._fen = None
+        if us == _BLACK:
+            self.fullmoves += 1
+        self._side = us ^ 1
+
+    def _state(self) -> tuple:
+        return (
+            self._bb[:],
+            self._occ[:],
+            self._squares[:],
+            self._side,
+            self._castling,
+            self._ep,
+            self.halfmoves,
+            self.fullmoves,
+            self._fen,
+        )
+
+    def push(self, move: Move) -> None:
+        # the move is not checked for legality
+        # so it is up to the caller to only push pseudolegal moves
+        state = self._state()
+        self._make(_from_move(move))
+        self._stack.append((move, state, self._legal_moves, self._status))
+        self._legal_moves = None
+        self._status = None
+
+    def pop(self) -> Move:
+        move, state, self._legal_moves, self._status = self._stack.pop()
+        self._restore(state)
+        return move
+
+    def _restore(self, state: tuple) -> None:
+        (
+            self._bb,
+            self._occ,
+            self._squares,
+            self._side,
+            self._castling,
+            self._ep,
+            self.halfmoves,
+            self.fullmoves,
+            self._fen,
+        ) = state
+
+    def perft(self, depth: int) -> int:
+        return self._perft(depth)
+
+    def divide(self, depth: int) -> dict[Move, int]:
+        nodes = {}
+        for move in self._generate():
+            state = self._state()
+            self._make(move)
+            nodes[_to_move(move)] = self._perft(depth - 1)
+            self._restore(state)
+        return nodes
+
+    def _perft(self, depth: int) -> int:
+        moves = self._generate()
+        if depth <= 1:
+            return len(moves) if depth == 1 else 1
+        nodes = 0
+        for move in moves:
+            state = self._state()
+            self._make(move)
+            nodes += self._perft(depth - 1)
+            self._restore(state)
+        return nodes
+
+    def _get_status(self) -> Status:
+        if not self.has_legal_move():
+            if self._is_king_in_check(self._side):
+                return status.Checkmate(_COLORS[self._side ^ 1])
+            return status.Stalemate()
+        if self.halfmoves >= 50:
+            return status.Draw()
+        return status.Ongoing()
+
+    def move_uci(self, move_uci: str) -> None:
+        move = Move.from_uci(move_uci)
+        self._move(move)
+
+    def replay(
+        self, moves: Iterable[Move | str], trusted: bool = True
+    ) -> None:
+        # see Board.replay, the caches are cleared also when a move
+        # fails part of the way through
+        try:
+            for move in moves:
+                if isinstance(move, str):
+                    move = Move.from_uci(move)
+                if trusted:
+                    packed = _from_move(move)
+                    # like Board, a pawn on the last row has to promote
+                    if (
+                        self._squares[packed & 63] % 6 == PAWN
+                        and not packed >> 12
+                        and (packed >> 6 & 63) // 8 in (0, 7)
+                    ):
+                        raise IllegalMoveError(f'move is not legal: {move}')
+                    self._make(packed)
+                else:
+                    self._move(move)
+        finally:
+            self._legal_moves = None
+            self._status = None
+
+    def _move(self, move: Move) -> None:
+        packed = _from_move(move)
+        if packed not in self._get_legal_moves():
+            raise IllegalMoveError(f'move is not legal: {move}')
+
+        self._make(packed)
+        self._legal_moves = None
+        self._status = None
@@ -1,43 +1,132 @@
 import contextlib
+import dataclasses
+from typing import Iterable, Iterator, Literal
 
+from . import evaluation, status, zobrist
 from . import pieces as p
-from . import status
 from .color import BLACK, WHITE, Color
-from .exceptions import FENError, IllegalMoveError, NotAPieceError
+from .exceptions import IllegalMoveError, NotAPieceError
+from .fen import STARTING_FEN
+from .position import Position
+from .status import Status
+from .transposition import PerftTable
 from .util import CastleRights, Move, index_to_square, square_to_index
 
+# board indices of the squares from a8 to h1, the order fen uses
+_FEN_INDICES = [row * 10 + col for row in range(2, 10) for col in range(1, 9)]
+
+# probe: play every pseudolegal move and look for a check
+# pins: find checkers and pinned pieces once, only probe king moves
+# and en passant
+MoveGen = Literal['probe', 'pins']
+
+# staged move generation orders captures by most valuable victim, then
+# least valuable attacker, promotions add the piece they promote to
+_CAPTURE_ORDER = {
+    p.Pawn: 1,
+    p.Knight: 2,
+    p.Bishop: 3,
+    p.Rook: 4,
+    p.Queen: 5,
+    p.King: 6,
+}
+
+
+@dataclasses.dataclass(slots=True)
+class Undo:
+    move: int
+    castle_rights: list[CastleRights]
+    en_passant: int
+    halfmoves: int
+    fullmoves: int
+    zobrist: int
+    legal_moves: list[int] | None
+    status: Status | None
+    fen: str | None
+    captured: p.Piece | None = None
+    squares: list[tuple[int, p.Piece | p.Empty | p.Border]] = (
+        dataclasses.field(default_factory=list)
+    )
+
 
 class Board:
     _PIECE_TYPES = {p.Pawn, p.Knight, p.Bishop, p.Rook, p.Queen, p.King}
     _PAWN_PROMOTIONS = {p.Knight, p.Bishop, p.Rook, p.Queen}
     _COLORS = [WHITE, BLACK]
-
-    def __init__(self, fen: str | None = None) -> None:
-        self._CHAR_TO_PIECE = {Type.char: Type for Type in self._PIECE_TYPES}
-        self._CHAR_TO_PROMOTION = {
-            Type.char: Type for Type in self._PAWN_PROMOTIONS
-        }
+    _CHAR_TO_PROMOTION = {Type.char: Type for Type in _PAWN_PROMOTIONS}
+    _FEN_PIECES = {
+        char: (Type, color)
+        for Type in _PIECE_TYPES
+        for char, color in ((Type.char.upper(), WHITE), (Type.char, BLACK))
+    }
+    # evaluate() compares the running scores with a full recount
+    debug_evaluation = False
+
+    def __init__(
+        self, fen: str | None = None, movegen: MoveGen = 'pins'
+    ) -> None:
+        self.movegen = movegen
         if fen is None:
-            fen = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
-        (
-            board,
-            active_color,
-            castle_rights,
-            en_passant,
-            halfmoves,
-            fullmoves,
-        ) = fen.split()
-
-        self._board = self._parse_board(board)
-        self.active_color = self._parse_active_color(active_color)
-        self._total_halfmoves = self._COLORS.index(self.active_color)
-        self.castle_rights = self._parse_castle_rights(castle_rights)
-        self.en_passant = self._parse_en_passant(en_passant)
-        self.fullmoves = self._parse_fullmoves(fullmoves)
-        self.halfmoves = self._parse_halfmoves(halfmoves)
-        self._pieces = self._get_sets_of_pieces_by_color()
-        self.legal_moves = self._get_legal_moves_for_active_color()
-        self.status = self._get_status()
+            fen = STARTING_FEN
+        self._load(Position.from_fen(fen))
+
+    @classmethod
+    def from_position(cls, position: Position, movegen: MoveGen = 'pins'):
+        board = cls.__new__(cls)
+        board.movegen = movegen
+        board._load(position)
+        return board
+
+    def _load(self, position: Position) -> None:
+        self._board = self._parse_board(position.squares)
+        self.active_color = WHITE if position.active_color == 'w' else BLACK
+        self._total_halfmoves = self.active_color.index
+        self.castle_rights = self._parse_castle_rights(position.castle_rights)
+        self.en_passant = position.en_passant
+        self.fullmoves = position.fullmoves
+        self.halfmoves = position.halfmoves
+        self._pieces, self._kings = self._get_squares_of_pieces_by_color()
+        self.zobrist = self._get_zobrist()
+        self._material, self._piece_squares = self._get_scores()
+        self._undo_stack: list[Undo] = []
+        self._undo: Undo | None = None
+        self._legal_moves: list[int] | None = None
+        self._status: Status | None = None
+        self._fen: str | None = None
+        # perft reuses one move list per ply instead of allocating new ones
+        self._move_lists: list[list[int]] = []
+
+    def copy(self) -> 'Board':
+        # pieces are never changed once created and the caches are never
+        # changed in place, so both boards share them
+        # the move history is not copied, pop() only works on the original
+        board = self.__class__.__new__(self.__class__)
+        board.__dict__.update(self.__dict__)
+        board._board = self._board[:]
+        board.castle_rights = [
+            CastleRights(cr.kingside, cr.queenside)
+            for cr in self.castle_rights
+        ]
+        board._pieces = [dict(pieces) for pieces in self._pieces]
+        board._kings = self._kings[:]
+        board._material = self._material[:]
+        board._piece_squares = self._piece_squares[:]
+        board._undo_stack = []
+        board._undo = None
+        board._move_lists = []
+        return board
+
+    def position(self) -> Position:
+        # borders have no icon, so joining every square leaves
+        # the 64 characters from a8 to h1
+        return Position(
+            ''.join([entity.icon for entity in self._board]),
+            'w' if self.active_color == WHITE else 'b',
+            self._get_castle_bits(),
+            self.en_passant,
+            self.halfmoves,
+            self.fullmoves,
+        )
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}('{self.fen()}')"
@@ -55,157 +144,81 @@ class Board:
     ):
         if isinstance(__key, str):
             __key = square_to_index(__key)
-        self._board[__key] = __item
-
-    def _parse_active_color(self, active_color: str) -> Color:
-        if active_color == 'w':
-            return WHITE
-        elif active_color == 'b':
-            return BLACK
-        raise FENError(f"active color is not 'w' or 'b': {active_color}")
-
-    def _parse_en_passant(self, en_passant: str) -> int:
-        if en_passant == '-':
-            return 0
-        return square_to_index(en_passant)
-
-    def _parse_castle_rights(
-        self, castle_rights: str
-    ) -> dict[Color, CastleRights]:
-        if castle_rights == '-':
-            return {
-                WHITE: CastleRights(False, False),
-                BLACK: CastleRights(False, False),
-            }
-        return {
-            WHITE: CastleRights('K' in castle_rights, 'Q' in castle_rights),
-            BLACK: CastleRights('k' in castle_rights, 'q' in castle_rights),
-        }
-
-    def _parse_fullmoves(self, fullmoves: str) -> int:
-        try:
-            fm = int(fullmoves)
-        except ValueError:
-            raise FENError(f'fullmove counter is not a number: {fullmoves}')
-        if fm < 1:
-            raise FENError(f'fullmove counter is less than 1: {fullmoves}')
-        return fm
-
-    def _parse_halfmoves(self, halfmoves: str) -> int:
-        try:
-            hm = int(halfmoves)
-        except ValueError:
-            raise FENError(f'halfmove clock is not a number: {halfmoves}')
-        if not 0 <= hm <= 100:
-            raise FENError(
-                f'halfmove clock is below 0 or above 100: {halfmoves}'
-            )
-        return hm
-
-    def _parse_board(
-        self, fen_board: str
-    ) -> list[p.Piece | p.Empty | p.Border]:
-        board = []
-
-        rows = len(fen_board.split('/'))
-        if rows != 8:
-            raise FENError(f'board does not have 8 rows: {rows}')
-        # TODO: check if each row has 8 columns
-
-        for _ in range(21):
-            board.append(p.Border())
-
-        for char in fen_board:
-            if char.isdigit():
-                for _ in range(int(char)):
-                    board.append(p.Empty())
-            elif char == '/':
-                board.append(p.Border())
-                board.append(p.Border())
-            else:
-                if char.lower() not in self._CHAR_TO_PIECE:
-                    raise FENError(f'character is not a piece type: {char}')
-                color = WHITE if char.isupper() else BLACK
-                PieceType = self._CHAR_TO_PIECE[char.lower()]
-                piece = PieceType(color)
-                board.append(piece)
-
-        for _ in range(21):
-            board.append(p.Border())
+        self._put(__key, __item)
+        self._legal_moves = None
+        self._status = None
+        self._fen = None
+
+    @property
+    def legal_moves(self) -> set[Move]:
+        return {Move.unpack(move) for move in self._get_legal_moves()}
+
+    def _get_legal_moves(self) -> list[int]:
+        if self._legal_moves is None:
+            self._legal_moves = self._get_legal_moves_for_active_color()
+        return self._legal_moves
+
+    @property
+    def status(self) -> Status:
+        if self._status is None:
+            self._status = self._get_status()
+        return self._status
+
+    def has_legal_move(self) -> bool:
+        if self._legal_moves is not None:
+            return bool(self._legal_moves)
+        moves: list[int] = []
+        self._add_legal_moves(moves, first_only=True)
+        return bool(moves)
+
+    def _parse_castle_rights(self, bits: int) -> list[CastleRights]:
+        # indexed by Color.index
+        return [
+            CastleRights(bool(bits & 1), bool(bits & 2)),
+            CastleRights(bool(bits & 4), bool(bits & 8)),
+        ]
 
+    def _parse_board(self, squares: str) -> list[p.Piece | p.Empty | p.Border]:
+        board: list[p.Piece | p.Empty | p.Border] = [p.BORDER] * 120
+        for index, char in zip(_FEN_INDICES, squares):
+            if char == '.':
+                board[index] = p.EMPTY
+            else:
+                PieceType, color = self._FEN_PIECES[char]
+                board[index] = PieceType(color)
         return board
 
     def fen(self) -> str:
-        board = ''
-        empty = 0
-        for row in [
-            self._board[row_num * 10 : row_num * 10 + 10]
-            for row_num in range(2, 10)
-        ]:
-            for piece in row:
-                if isinstance(piece, p.Empty):
-                    empty += 1
-                elif isinstance(piece, p.Piece):
-                    if empty != 0:
-                        board += str(empty)
-                        empty = 0
-                    board += (
-                        piece.char.upper()
-                        if piece.color == WHITE
-                        else piece.char
-                    )
-            if empty != 0:
-                board += str(empty)
-                empty = 0
-            board += '/'
-        board = board[:-1]
-        active_color = 'w' if self.active_color == WHITE else 'b'
-        if self.castle_rights == {
-            WHITE: CastleRights(False, False),
-            BLACK: CastleRights(False, False),
-        }:
-            castle_rights = '-'
-        else:
-            white_cr = self.castle_rights[WHITE]
-            black_cr = self.castle_rights[BLACK]
-            castle_rights = (
-                'K' * white_cr.kingside
-                + 'Q' * white_cr.queenside
-                + 'k' * black_cr.kingside
-                + 'q' * black_cr.queenside
-            )
-        en_passant = (
-            '-' if self.en_passant == 0 else index_to_square(self.en_passant)
+        if self._fen is None:
+            self._fen = self.position().fen()
+        return self._fen
+
+    def _get_castle_bits(self) -> int:
+        white_cr, black_cr = self.castle_rights
+        return (
+            white_cr.kingside
+            | white_cr.queenside << 1
+            | black_cr.kingside << 2
+            | black_cr.queenside << 3
         )
-        halfmove = str(self.halfmoves)
-        fullmove = str(self.fullmoves)
 
-        return ' '.join(
-            [
-                board,
-                active_color,
-                castle_rights,
-                en_passant,
-                halfmove,
-                fullmove,
-            ]
-        )
-
-    def _get_sets_of_pieces_by_color(self) -> dict[Color, set[p.Piece]]:
-        white_pieces = set()
-        black_pieces = set()
-        for piece in self:
+    def _get_squares_of_pieces_by_color(
+        self,
+    ) -> tuple[list[dict[p.Piece, int]], list[int]]:
+        # both are indexed by Color.index, a king square of 0 means
+        # that colour has no king on the board
+        pieces: list[dict[p.Piece, int]] = [{}, {}]
+        kings = [0, 0]
+        for index, piece in enumerate(self._board):
             if isinstance(piece, p.Piece):
-                if piece.color == WHITE:
-                    white_pieces.add(piece)
-                else:
-                    black_pieces.add(piece)
-        return {WHITE: white_pieces, BLACK: black_pieces}
-
-    def _get_status(self) -> status.Status:
-        checked = self._is_king_in_check(self.active_color)
-        has_moves = bool(self.legal_moves)
-        if not has_moves:
+                pieces[piece.color.index][piece] = index
+                if isinstance(piece, p.King):
+                    kings[piece.color.index] = index
+        return pieces, kings
+
+    def _get_status(self) -> Status:
+        if not self.has_legal_move():
+            checked = self._is_king_in_check(self.active_color)
             if checked:
                 return (
                     status.Checkmate(WHITE)
@@ -221,32 +234,99 @@ class Board:
     def _is_square_under_attack(
         self, index: int, color: Color | None = None
     ) -> bool:
-        enemy_types = {
-            type(piece)
-            for piece in self._pieces[WHITE if color == BLACK else BLACK]
-        }
-        return any(
-            Type.is_square_attacked_by_piece_type(self, index, color)
-            for Type in enemy_types
-        )
+        if color is None:
+            target = self._board[index]
+            if not isinstance(target, p.Piece):
+                return False
+            color = target.color
+        board = self._board
 
-    def _is_king_in_check(self, color: Color):
-        kings = {
-            king for king in self._pieces[color] if isinstance(king, p.King)
-        }
-        return any(
-            self._is_square_under_attack(self._board.index(king), color)
-            for king in kings
-        )
+        # cheapest lookups first, every one of them can exit early
+        for offset in (9 * color.forward_sign, 11 * color.forward_sign):
+            piece = board[index + offset]
+            if isinstance(piece, p.Pawn) and piece.color != color:
+                return True
+        for (target_index,) in p.Knight.rays[index]:
+            piece = board[target_index]
+            if isinstance(piece, p.Knight) and piece.color != color:
+                return True
+        for (target_index,) in p.King.rays[index]:
+            piece = board[target_index]
+            if isinstance(piece, p.King) and piece.color != color:
+                return True
+        for rays, Type in (
+            (p.Rook.rays[index], p.Rook),
+            (p.Bishop.rays[index], p.Bishop),
+        ):
+            for ray in rays:
+                for target_index in ray:
+                    piece = board[target_index]
+                    if isinstance(piece, p.Empty):
+                        continue
+                    if (
+                        isinstance(piece, (Type, p.Queen))
+                        and piece.color != color
+                    ):
+                        return True
+                    break
+        return False
+
+    def _is_king_in_check(self, color: Color) -> bool:
+        index = self._kings[color.index]
+        if not index:
+            return False
+        return self._is_square_under_attack(index, color)
 
     def move_uci(self, move_uci: str) -> None:
         move = Move.from_uci(move_uci)
         self._move(move)
 
+    def replay(
+        self, moves: Iterable[Move | str], trusted: bool = True
+    ) -> None:
+        # trusted moves were checked when they were stored, so they are
+        # applied without generating the legal moves of every position,
+        # the final position works them out when they are asked for
+        board = self._board
+        for move in moves:
+            if isinstance(move, str):
+                move = Move.from_uci(move)
+            if not trusted:
+                self._move(move)
+                continue
+            packed = move.pack()
+            # checked before _advance touches the clocks, a pawn that
+            # reaches the last row needs a piece to promote to
+            piece = board[packed & 127]
+            if not isinstance(piece, p.Piece):
+                raise NotAPieceError(f'not a piece: {move}')
+            row = piece.color.promotion_row
+            if (
+                isinstance(piece, p.Pawn)
+                and not move.promotion
+                and row <= move.dest <= row + 10
+            ):
+                raise IllegalMoveError(f'move is not legal: {move}')
+            self._advance(packed)
+
+    def _find_move(self, fen: str) -> int | None:
+        # the legal move that leads to the position of fen
+        for move in self._get_legal_moves():
+            self._push(move)
+            found = self.fen() == fen
+            self._pop()
+            if found:
+                return move
+        return None
+
     def _move(self, move: Move) -> None:
-        if move not in self.legal_moves:
+        packed = move.pack()
+        if packed not in self._get_legal_moves():
             raise IllegalMoveError(f'move is not legal: {move}')
 
+        self._advance(packed)
+
+    def _advance(self, move: int) -> None:
         self.halfmoves += 1
         self._total_halfmoves += 1
 
@@ -258,11 +338,140 @@ class Board:
         self.active_color = self._COLORS[
             self._total_halfmoves % len(self._COLORS)
         ]
-        self.legal_moves = self._get_legal_moves_for_active_color()
-        self.status = self._get_status()
+        self.zobrist ^= zobrist.BLACK_TO_MOVE
+        self._legal_moves = None
+        self._status = None
+        self._fen = None
+
+    def push(self, move: Move) -> None:
+        self._push(move.pack())
 
-    def _move_raw(self, move: Move, bookkepp: bool = True) -> None:
-        index = move.origin
+    def pop(self) -> Move:
+        return Move.unpack(self._pop())
+
+    def _push(self, move: int) -> None:
+        # the move is not checked for legality
+        # so it is up to the caller to only push pseudolegal moves
+        piece = self._board[move & 127]
+        if not isinstance(piece, p.Piece):
+            raise NotAPieceError(f'not a piece: {index_to_square(move & 127)}')
+
+        undo = Undo(
+            move,
+            [
+                CastleRights(cr.kingside, cr.queenside)
+                for cr in self.castle_rights
+            ],
+            self.en_passant,
+            self.halfmoves,
+            self.fullmoves,
+            self.zobrist,
+            self._legal_moves,
+            self._status,
+            self._fen,
+        )
+        self._undo = undo
+        try:
+            self._advance(move)
+        finally:
+            self._undo = None
+        for _, entity in undo.squares:
+            if isinstance(entity, p.Piece) and entity.color != piece.color:
+                undo.captured = entity
+        self._undo_stack.append(undo)
+
+    def _pop(self) -> int:
+        undo = self._undo_stack.pop()
+
+        for index, entity in reversed(undo.squares):
+            self._put(index, entity)
+
+        self.castle_rights = undo.castle_rights
+        self.en_passant = undo.en_passant
+        self.halfmoves = undo.halfmoves
+        self.fullmoves = undo.fullmoves
+        self.zobrist = undo.zobrist
+        self._legal_moves = undo.legal_moves
+        self._status = undo.status
+        self._fen = undo.fen
+        self._total_halfmoves -= 1
+        self.active_color = self._COLORS[
+            self._total_halfmoves % len(self._COLORS)
+        ]
+        return undo.move
+
+    def perft(self, depth: int, table: PerftTable | None = None) -> int:
+        # divide(0) counts every move as a leaf, like BitBoard
+        if depth <= 0:
+            return 1
+        if table is not None and depth > 1:
+            nodes = table.probe(self.zobrist, depth)
+            if nodes is not None:
+                return nodes
+        ply = len(self._undo_stack)
+        while len(self._move_lists) <= ply:
+            self._move_lists.append([])
+        moves = self._move_lists[ply]
+        moves.clear()
+        self._add_legal_moves(moves)
+        # bulk counting, the last ply only needs the number of moves
+        if depth == 1:
+            return len(moves)
+        nodes = 0
+        for move in moves:
+            self._push(move)
+            nodes += self.perft(depth - 1, table)
+            self._pop()
+        if table is not None:
+            table.store(self.zobrist, depth, nodes)
+        return nodes
+
+    def divide(
+        self, depth: int, table: PerftTable | None = None
+    ) -> dict[Move, int]:
+        nodes = {}
+        for move in self._get_legal_moves_for_active_color():
+            self._push(move)
+            nodes[Move.unpack(move)] = self.perft(depth - 1, table)
+            self._pop()
+        return nodes
+
+    def _put(self, index: int, entity: p.Piece | p.Empty | p.Border) -> None:
+        occupant = self._board[index]
+        if self._undo is not None:
+            self._undo.squares.append((index, occupant))
+
+        # a piece is only dropped from the index if it is still recorded
+        # on this square, castling moves the rook before clearing its origin
+        if isinstance(occupant, p.Piece):
+            keys = zobrist.PIECES[occupant.char, occupant.color.name]
+            self.zobrist ^= keys[index]
+            color_index = occupant.color.index
+            self._material[color_index] -= evaluation.VALUES[occupant.char]
+            self._piece_squares[color_index] -= evaluation.PIECE_SQUARES[
+                occupant.icon
+            ][index]
+            squares = self._pieces[color_index]
+            if squares.get(occupant) == index:
+                del squares[occupant]
+                if self._kings[color_index] == index:
+                    self._kings[color_index] = 0
+
+        self._board[index] = entity
+        if isinstance(entity, p.Piece):
+            keys = zobrist.PIECES[entity.char, entity.color.name]
+            self.zobrist ^= keys[index]
+            color_index = entity.color.index
+            self._material[color_index] += evaluation.VALUES[entity.char]
+            self._piece_squares[color_index] += evaluation.PIECE_SQUARES[
+                entity.icon
+            ][index]
+            self._pieces[color_index][entity] = index
+            if isinstance(entity, p.King):
+                self._kings[color_index] = index
+
+    def _move_raw(self, move: int) -> None:
+        index = move & 127
         piece = self._board[index]
 
         # not possible if called through Board._move
@@ -272,21 +481,77 @@ class Board:
         if not isinstance(piece, p.Piece):
             raise NotAPieceError(f'not a piece: {index_to_square(index)}')
 
-        piece.make_move(self, move, bookkepp)
+        # castle rights and en passant are hashed as a whole
+        # so the old state is taken out and the new one put in
+        self.zobrist ^= self._get_state_zobrist()
+        piece.make_move(self, move)
+        self.zobrist ^= self._get_state_zobrist()
+        self._fen = None
+
+    def _get_state_zobrist(self) -> int:
+        key = zobrist.EN_PASSANT[self.en_passant]
+        white_cr, black_cr = self.castle_rights
+        if white_cr.kingside:
+            key ^= zobrist.CASTLE_RIGHTS[0]
+        if white_cr.queenside:
+            key ^= zobrist.CASTLE_RIGHTS[1]
+        if black_cr.kingside:
+            key ^= zobrist.CASTLE_RIGHTS[2]
+        if black_cr.queenside:
+            key ^= zobrist.CASTLE_RIGHTS[3]
+        return key
+
+    def _get_zobrist(self) -> int:
+        key = self._get_state_zobrist()
+        if self.active_color == BLACK:
+            key ^= zobrist.BLACK_TO_MOVE
+        for index, piece in enumerate(self._board):
+            if isinstance(piece, p.Piece):
+                key ^= zobrist.PIECES[piece.char, piece.color.name][index]
+        return key
+
+    def _get_scores(self) -> tuple[list[int], list[int]]:
+        # material and piece square scores, both indexed by Color.index
+        material = [0, 0]
+        piece_squares = [0, 0]
+        for index, piece in enumerate(self._board):
+            if isinstance(piece, p.Piece):
+                material[piece.color.index] += evaluation.VALUES[piece.char]
+                piece_squares[piece.color.index] += evaluation.PIECE_SQUARES[
+                    piece.icon
+                ][index]
+        return material, piece_squares
+
+    def evaluate(self) -> int:
+        # centipawns from the point of view of the side to move,
+        # _put keeps the scores up to date so there is nothing to count
+        if self.debug_evaluation:
+            scores = self._get_scores()
+            if scores != (self._material, self._piece_squares):
+                raise AssertionError(
+                    f'evaluation is out of sync: {scores} !='
+                    f' {(self._material, self._piece_squares)}'
+                )
+        material = self._material
+        piece_squares = self._piece_squares
+        score = material[0] + piece_squares[0] - material[1] - piece_squares[1]
+        return score if self.active_color is WHITE else -score
 
     @contextlib.contextmanager
-    def _with_move(self, move: Move):
-        board = self._board
-        self._board = board.copy()
-        self._move_raw(move, False)
-        yield
-        self._board = board
+    def _with_move(self, move: int):
+        self._push(move)
+        try:
+            yield
+        finally:
+            self._pop()
 
     def _get_pseudolegal_moves_by_index(self, index: int) -> set[Move]:
         piece = self._board[index]
         if not isinstance(piece, p.Piece):
             raise NotAPieceError(f'not a piece: {index_to_square(index)}')
-        return piece.get_pseudolegal_moves(self, index)
+        moves: list[int] = []
+        piece.add_pseudolegal_moves(self, index, moves)
+        return {Move.unpack(move) for move in moves}
 
     def _get_pseudolegal_moves_by_square(self, square: str) -> set[Move]:
         index = square_to_index(square)
@@ -296,15 +561,227 @@ class Board:
         piece = self._board[index]
         if not isinstance(piece, p.Piece):
             raise NotAPieceError(f'not a piece: {index_to_square(index)}')
-        return piece.get_legal_moves(self, index)
+        moves: list[int] = []
+        piece.add_legal_moves(self, index, moves)
+        return {Move.unpack(move) for move in moves}
 
     def _get_legal_moves_by_square(self, square: str) -> set[Move]:
         index = square_to_index(square)
         return self._get_legal_moves_by_index(index)
 
-    def _get_legal_moves_for_active_color(self) -> set[Move]:
-        moves = set()
-        for piece in self._pieces[self.active_color]:
-            index = self._board.index(piece)
-            moves.update(piece.get_legal_moves(self, index))
+    def _get_legal_moves_for_active_color(self) -> list[int]:
+        moves: list[int] = []
+        self._add_legal_moves(moves)
         return moves
+
+    def _add_legal_moves(
+        self, moves: list[int], first_only: bool = False
+    ) -> None:
+        # first_only stops after the first piece that has a legal move
+        if self.movegen == 'pins':
+            self._add_masked_legal_moves(moves, first_only)
+            return
+        # pushing a promotion swaps pieces in the dict we are iterating over
+        for piece, index in list(
+            self._pieces[self.active_color.index].items()
+        ):
+            piece.add_legal_moves(self, index, moves)
+            if first_only and moves:
+                return
+
+    def _add_masked_legal_moves(
+        self, moves: list[int], first_only: bool = False
+    ) -> None:
+        color = self.active_color
+        checkers, pins = self._get_checkers_and_pins(color)
+        evasions = None
+        if len(checkers) == 1:
+            evasions = checkers[0]
+
+        for piece, index in list(self._pieces[color.index].items()):
+            if isinstance(piece, p.King):
+                mask = None
+            elif len(checkers) > 1:
+                continue
+            else:
+                mask = evasions
+                if index in pins:
+                    mask = pins[index] if mask is None else mask & pins[index]
+            piece.add_masked_legal_moves(self, index, moves, mask)
+            if first_only and moves:
+                return
+
+    def _iter_piece_moves(
+        self, targets: set[int] | None = None
+    ) -> Iterator[list[int]]:
+        # legal moves one piece at a time, so a caller that stops early
+        # never generates the rest, targets limits the destinations but
+        # is only a hint, moves outside of it may still show up
+        color = self.active_color
+        pieces = list(self._pieces[color.index].items())
+        if self.movegen != 'pins':
+            for piece, index in pieces:
+                moves: list[int] = []
+                piece.add_legal_moves(self, index, moves)
+                yield moves
+            return
+
+        checkers, pins = self._get_checkers_and_pins(color)
+        evasions = checkers[0] if len(checkers) == 1 else None
+        for piece, index in pieces:
+            if isinstance(piece, p.King):
+                mask = targets
+            elif len(checkers) > 1:
+                continue
+            else:
+                mask = targets
+                for line in (evasions, pins.get(index)):
+                    if line is not None:
+                        mask = line if mask is None else mask & line
+            moves = []
+            piece.add_masked_legal_moves(self, index, moves, mask)
+            yield moves
+
+    def _is_capture(self, move: int) -> bool:
+        # promotions are handled like captures, they change the material
+        dest = move >> 7 & 127
+        target = self._board[dest]
+        return bool(
+            move >> 14
+            or isinstance(target, p.Piece)
+            or (
+                dest == self.en_passant
+                and isinstance(self._board[move & 127], p.Pawn)
+            )
+        )
+
+    def _get_capture_order(self, move: int) -> int:
+        squares = self._board
+        victim = squares[move >> 7 & 127]
+        # en passant takes a pawn from an empty square
+        victim_order = _CAPTURE_ORDER.get(type(victim), 1)
+        if move >> 14 and isinstance(victim, p.Empty):
+            victim_order = 0
+        attacker_order = _CAPTURE_ORDER[type(squares[move & 127])]
+        return (victim_order + (move >> 14)) * 8 - attacker_order
+
+    def _get_capture_targets(self) -> set[int]:
+        color = self.active_color
+        targets = set(self._pieces[1 - color.index].values())
+        targets.update(range(color.promotion_row + 1, color.promotion_row + 9))
+        if self.en_passant:
+            targets.add(self.en_passant)
+        return targets
+
+    def has_capture(self) -> bool:
+        # stops at the first piece with a capture or promotion
+        return any(
+            self._is_capture(move)
+            for moves in self._iter_piece_moves(self._get_capture_targets())
+            for move in moves
+        )
+
+    def _iter_captures(self) -> Iterator[int]:
+        # legal captures and promotions, best first
+        captures = [
+            move
+            for moves in self._iter_piece_moves(self._get_capture_targets())
+            for move in moves
+            if self._is_capture(move)
+        ]
+        captures.sort(key=self._get_capture_order, reverse=True)
+        yield from captures
+
+    def _iter_quiet_moves(self) -> Iterator[int]:
+        # the legal moves _iter_captures leaves out
+        for moves in self._iter_piece_moves():
+            for move in moves:
+                if not self._is_capture(move):
+                    yield move
+
+    def _iter_evasions(self) -> Iterator[int]:
+        # legal moves out of check, captures first, nothing if the king
+        # is not in check, the check masks make these cheap to generate
+        # all at once
+        if not self._is_king_in_check(self.active_color):
+            return
+        moves = [move for moves in self._iter_piece_moves() for move in moves]
+        moves.sort(
+            key=lambda move: (
+                self._get_capture_order(move) + 100
+                if self._is_capture(move)
+                else 0
+            ),
+            reverse=True,
+        )
+        yield from moves
+
+    def _iter_staged_moves(self) -> Iterator[int]:
+        # every legal move, evasions when in check, otherwise captures
+        # and promotions before quiet moves
+        if self._is_king_in_check(self.active_color):
+            yield from self._iter_evasions()
+            return
+        yield from self._iter_captures()
+        yield from self._iter_quiet_moves()
+
+    def captures(self) -> Iterator[Move]:
+        for move in self._iter_captures():
+            yield Move.unpack(move)
+
+    def quiet_moves(self) -> Iterator[Move]:
+        for move in self._iter_quiet_moves():
+            yield Move.unpack(move)
+
+    def evasions(self) -> Iterator[Move]:
+        for move in self._iter_evasions():
+            yield Move.unpack(move)
+
+    def staged_moves(self) -> Iterator[Move]:
+        for move in self._iter_staged_moves():
+            yield Move.unpack(move)
+
+    def _get_checkers_and_pins(
+        self, color: Color
+    ) -> tuple[list[set[int]], dict[int, set[int]]]:
+        # every checker comes with the squares that resolve its check
+        # every pinned piece index comes with the squares it can move to
+        checkers: list[set[int]] = []
+        pins: dict[int, set[int]] = {}
+        index = self._kings[color.index]
+        if not index:
+            return checkers, pins
+        board = self._board
+
+        for offset in (9 * color.forward_sign, 11 * color.forward_sign):
+            piece = board[index + offset]
+            if isinstance(piece, p.Pawn) and piece.color != color:
+                checkers.append({index + offset})
+        for (target_index,) in p.Knight.rays[index]:
+            piece = board[target_index]
+            if isinstance(piece, p.Knight) and piece.color != color:
+                checkers.append({target_index})
+
+        for rays, Type in (
+            (p.Rook.rays[index], p.Rook),
+            (p.Bishop.rays[index], p.Bishop),
+        ):
+            for ray in rays:
+                pinned = None
+                for i, target_index in enumerate(ray):
+                    piece = board[target_index]
+                    if isinstance(piece, p.Empty):
+                        continue
+                    if piece.color == color:
+                        if pinned is not None:
+                            break
+                        pinned = target_index
+                        continue
+                    if isinstance(piece, (Type, p.Queen)):
+                        line = set(ray[: i + 1])
+                        if pinned is None:
+                            checkers.append(line)
+                        else:
+                            pins[pinned] = line
+                    break
+        return checkers, pins
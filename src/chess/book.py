@@ -0,0 +1,198 @@
+import bisect
+import collections
+import mmap
+import os
+import random
+import struct
+from typing import Iterable, NamedTuple, Sequence
+
+from . import pieces as p
+from . import status
+from .board import Board
+from .util import INDEX_TO_SQUARE, PROMOTIONS, SQUARE_TO_INDEX, Move
+
+# polyglot layout: 16 byte big endian entries sorted by key
+# key (8 bytes), move (2 bytes), weight (2 bytes), learn (4 bytes)
+# the keys are Board.zobrist, not the polyglot Random64 keys, so books
+# only work with each other when both were written by this module
+ENTRY = struct.Struct('>QHHI')
+_KEY = struct.Struct('>Q')
+_MAX_WEIGHT = 0xFFFF
+
+
+def encode_move(board: Board, move: Move) -> int:
+    # to file, to row, from file, from row and promotion, 3 bits each,
+    # castling is written as the king taking its own rook
+    dest = move.dest
+    piece = board[move.origin]
+    if (
+        isinstance(piece, p.King)
+        and move.origin == piece.color.king_index
+        and abs(dest - move.origin) == 2
+    ):
+        if dest > move.origin:
+            dest = piece.color.king_rook_index
+        else:
+            dest = piece.color.queen_rook_index
+    return (
+        INDEX_TO_SQUARE[dest]
+        | INDEX_TO_SQUARE[move.origin] << 6
+        | PROMOTIONS.index(move.promotion) << 12
+    )
+
+
+def decode_move(board: Board, move: int) -> Move:
+    origin = SQUARE_TO_INDEX[move >> 6 & 63]
+    dest = SQUARE_TO_INDEX[move & 63]
+    piece = board[origin]
+    if isinstance(piece, p.King) and origin == piece.color.king_index:
+        if dest == piece.color.king_rook_index:
+            dest = origin + 2
+        elif dest == piece.color.queen_rook_index:
+            dest = origin - 2
+    return Move(origin, dest, PROMOTIONS[move >> 12 & 7])
+
+
+class BookEntry(NamedTuple):
+    move: Move
+    weight: int
+    learn: int
+
+
+class _Keys:
+    # lets bisect search the keys in place
+    def __init__(self, data: mmap.mmap | bytes) -> None:
+        self._data = data
+
+    def __len__(self) -> int:
+        return len(self._data) // ENTRY.size
+
+    def __getitem__(self, i: int) -> int:
+        return _KEY.unpack_from(self._data, i * ENTRY.size)[0]
+
+
+class OpeningBook:
+    def __init__(self, path: str | os.PathLike) -> None:
+        # the file is mapped, not read, so processes that open the same
+        # book share its pages and opening it costs nothing up front
+        self.path = path
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size % ENTRY.size:
+                raise ValueError(f'book size is not a multiple of 16: {path}')
+            # an empty file cannot be mapped
+            self._data: mmap.mmap | bytes = (
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                if size
+                else b''
+            )
+        self._keys = _Keys(self._data)
+
+    def __reduce__(self):
+        # worker processes map the file again instead of copying it
+        return self.__class__, (self.path,)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __enter__(self) -> 'OpeningBook':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+
+    def probe(self, key: int) -> list[tuple[int, int, int]]:
+        # raw move, weight and learn of every entry with this key
+        entries = []
+        i = bisect.bisect_left(self._keys, key)
+        while i < len(self._keys):
+            entry_key, move, weight, learn = ENTRY.unpack_from(
+                self._data, i * ENTRY.size
+            )
+            if entry_key != key:
+                break
+            entries.append((move, weight, learn))
+            i += 1
+        return entries
+
+    def find(self, board: Board) -> list[BookEntry]:
+        # moves that are not legal here came from another position
+        # with the same key and are left out
+        legal_moves = board._get_legal_moves()
+        entries = []
+        for raw_move, weight, learn in self.probe(board.zobrist):
+            move = decode_move(board, raw_move)
+            if move.pack() in legal_moves:
+                entries.append(BookEntry(move, weight, learn))
+        return entries
+
+    def choose(
+        self, board: Board, rng: random.Random | None = None
+    ) -> Move | None:
+        # picks a move in proportion to its weight
+        entries = [entry for entry in self.find(board) if entry.weight]
+        if not entries:
+            return None
+        return (rng or random).choices(
+            [entry.move for entry in entries],
+            [entry.weight for entry in entries],
+        )[0]
+
+
+class BookBuilder:
+    def __init__(self, max_plies: int = 30) -> None:
+        self.max_plies = max_plies
+        self.games = 0
+        self._weights: collections.Counter[tuple[int, int]] = (
+            collections.Counter()
+        )
+
+    def add_game(self, fens: Sequence[str]) -> bool:
+        # fens holds the position before the first move and the position
+        # after every move, only finished games count, a win is worth 2
+        # to the winner's moves and a draw 1 to both sides
+        if not fens:
+            return False
+        result = Board(fens[-1]).status
+        if isinstance(result, status.Ongoing):
+            return False
+        board = Board(fens[0])
+        played = []
+        for fen in fens[1 : self.max_plies + 1]:
+            packed = board._find_move(fen)
+            if packed is None:
+                break
+            move = Move.unpack(packed)
+            played.append(
+                (board.zobrist, encode_move(board, move), board.active_color)
+            )
+            board.push(move)
+        for key, move, color in played:
+            if isinstance(result, status.Checkmate):
+                points = 2 if result.winner is color else 0
+            else:
+                points = 1
+            if points:
+                self._weights[key, move] += points
+        self.games += 1
+        return True
+
+    def add_games(self, games: Iterable[Sequence[str]]) -> int:
+        return sum(self.add_game(fens) for fens in games)
+
+    def write(self, path: str | os.PathLike) -> int:
+        # weights are scaled down together if one does not fit in 2 bytes
+        heaviest = max(self._weights.values(), default=0)
+        scale = min(1, _MAX_WEIGHT / heaviest) if heaviest else 1
+        entries = sorted(
+            (key, -max(1, int(weight * scale)), move)
+            for (key, move), weight in self._weights.items()
+        )
+        with open(path, 'wb') as f:
+            for key, weight, move in entries:
+                f.write(ENTRY.pack(key, move, -weight, 0))
+        return len(entries)
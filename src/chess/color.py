@@ -1,8 +1,11 @@
 import dataclasses
 
 
-@dataclasses.dataclass(unsafe_hash=True)
+# colours are compared by identity and index colour-indexed lists
+# such as Board.castle_rights, so there are only ever two of them
+@dataclasses.dataclass(eq=False, slots=True)
 class Color:
+    index: int
     name: str
     forward_sign: int
     king_row: int
@@ -12,8 +15,13 @@ class Color:
     king_rook_index: int
     queen_rook_index: int
 
+    def __reduce__(self) -> str:
+        # unpickling hands back the module level instance
+        return self.name
+
 
 WHITE = Color(
+    index=0,
     name='WHITE',
     forward_sign=-1,
     king_row=90,
@@ -24,6 +32,7 @@ WHITE = Color(
     queen_rook_index=91,
 )
 BLACK = Color(
+    index=1,
     name='BLACK',
     forward_sign=1,
     king_row=20,
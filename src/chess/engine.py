@@ -0,0 +1,317 @@
+import argparse
+import dataclasses
+import math
+import time
+from typing import Callable
+
+from .board import Board
+from .fen import STARTING_FEN
+from .transposition import EXACT, LOWER, UPPER, SearchTable
+from .util import Move
+
+# scores are in centipawns from the point of view of the side to move
+INFINITY = 1_000_000
+MATE = 100_000
+# anything beyond this is a mate, MATE minus the plies it takes
+MATE_BOUND = MATE - 1_000
+MAX_PLY = 128
+
+# move ordering: the table move, then captures and promotions by
+# most valuable victim, least valuable attacker, then killers, then the rest
+_TABLE_MOVE = 1 << 20
+_CAPTURE = 1 << 16
+_KILLER = 1 << 15
+# every node checks the limits only this often
+_CHECK_INTERVAL = 1024
+
+
+def _score_to_table(score: int, ply: int) -> int:
+    # mates are stored as the distance from the node, not from the root
+    if score >= MATE_BOUND:
+        return score + ply
+    if score <= -MATE_BOUND:
+        return score - ply
+    return score
+
+
+def _score_from_table(score: int, ply: int) -> int:
+    if score >= MATE_BOUND:
+        return score - ply
+    if score <= -MATE_BOUND:
+        return score + ply
+    return score
+
+
+class _Abort(Exception):
+    pass
+
+
+@dataclasses.dataclass
+class SearchResult:
+    # None if the side to move has no legal move
+    move: Move | None
+    score: int
+    depth: int
+    pv: list[Move]
+    nodes: int
+    elapsed: float
+
+    @property
+    def nps(self) -> float:
+        return self.nodes / self.elapsed if self.elapsed else 0
+
+    @property
+    def mate(self) -> int | None:
+        # moves until mate, negative if the side to move gets mated
+        if abs(self.score) < MATE_BOUND:
+            return None
+        moves = (MATE - abs(self.score) + 1) // 2
+        return moves if self.score > 0 else -moves
+
+
+class Engine:
+    def __init__(self, hash_mb: float = 16) -> None:
+        # the table is kept between searches, killers are not
+        self.table = SearchTable(hash_mb)
+        self.nodes = 0
+        self._killers = [[0, 0] for _ in range(MAX_PLY)]
+        self._pv: list[list[int]] = [[] for _ in range(MAX_PLY + 1)]
+        self._deadline = math.inf
+        self._node_limit = math.inf
+        self._next_check = 0.0
+
+    def search(
+        self,
+        board: Board,
+        depth: int | None = None,
+        time_limit: float | None = None,
+        nodes: int | None = None,
+        on_iteration: Callable[[SearchResult], None] | None = None,
+    ) -> SearchResult:
+        # searches one ply deeper at a time until a limit is hit,
+        # an unfinished iteration is thrown away
+        if depth is None and time_limit is None and nodes is None:
+            raise ValueError('search needs a depth, time or node limit')
+        start = time.perf_counter()
+        self.nodes = 0
+        self._killers = [[0, 0] for _ in range(MAX_PLY)]
+        self._deadline = (
+            start + time_limit if time_limit is not None else math.inf
+        )
+        self._node_limit = nodes if nodes is not None else math.inf
+        self._next_check = min(_CHECK_INTERVAL, self._node_limit)
+
+        moves = board._get_legal_moves()
+        if not moves:
+            in_check = board._is_king_in_check(board.active_color)
+            return SearchResult(None, -MATE if in_check else 0, 0, [], 0, 0)
+
+        result = SearchResult(Move.unpack(moves[0]), 0, 0, [], 0, 0)
+        root = len(board._undo_stack)
+        max_depth = min(
+            depth if depth is not None else MAX_PLY - 1, MAX_PLY - 1
+        )
+        # a budget of nothing gets the first legal move without a search
+        if (time_limit is not None and time_limit <= 0) or (
+            nodes is not None and nodes <= 0
+        ):
+            max_depth = 0
+        for current in range(1, max_depth + 1):
+            try:
+                score = self._negamax(board, current, -INFINITY, INFINITY, 0)
+            except _Abort:
+                while len(board._undo_stack) > root:
+                    board._pop()
+                # a move that beat the first one is still better than none
+                if not result.depth and self._pv[0]:
+                    result.move = Move.unpack(self._pv[0][0])
+                break
+            pv = [Move.unpack(move) for move in self._pv[0]]
+            elapsed = time.perf_counter() - start
+            result = SearchResult(
+                pv[0], score, current, pv, self.nodes, elapsed
+            )
+            if on_iteration is not None:
+                on_iteration(result)
+            if abs(score) >= MATE_BOUND:
+                break
+            # the next iteration takes longer than all of the ones before
+            if time_limit is not None and elapsed > time_limit / 2:
+                break
+        result.nodes = self.nodes
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def _check_limits(self) -> None:
+        if self.nodes >= self._node_limit:
+            raise _Abort
+        if time.perf_counter() >= self._deadline:
+            raise _Abort
+        self._next_check = min(self.nodes + _CHECK_INTERVAL, self._node_limit)
+
+    def _negamax(
+        self, board: Board, depth: int, alpha: int, beta: int, ply: int
+    ) -> int:
+        self.nodes += 1
+        if self.nodes >= self._next_check:
+            self._check_limits()
+        self._pv[ply] = []
+        in_check = board._is_king_in_check(board.active_color)
+        # checks are searched one ply deeper so mates are not missed
+        if in_check:
+            depth += 1
+        if depth <= 0 or ply >= MAX_PLY - 1:
+            return self._quiesce(board, alpha, beta, ply)
+        if ply and self._is_repetition(board):
+            return 0
+
+        key = board.zobrist
+        table_move = 0
+        entry = self.table.probe(key)
+        if entry is not None:
+            table_move, score, entry_depth, bound = entry
+            if ply and entry_depth >= depth:
+                score = _score_from_table(score, ply)
+                if (
+                    bound == EXACT
+                    or (bound == LOWER and score >= beta)
+                    or (bound == UPPER and score <= alpha)
+                ):
+                    return score
+
+        moves: list[int] = []
+        board._add_legal_moves(moves)
+        if not moves:
+            return -MATE + ply if in_check else 0
+        # the same draw rule as Board.status
+        if board.halfmoves >= 50:
+            return 0
+        self._order(board, moves, table_move, ply)
+
+        original_alpha = alpha
+        best_score = -INFINITY
+        best_move = 0
+        for move in moves:
+            board._push(move)
+            score = -self._negamax(board, depth - 1, -beta, -alpha, ply + 1)
+            board._pop()
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    self._pv[ply] = [move, *self._pv[ply + 1]]
+                    if score >= beta:
+                        if not board._is_capture(move):
+                            killers = self._killers[ply]
+                            if killers[0] != move:
+                                killers[1] = killers[0]
+                                killers[0] = move
+                        break
+
+        if best_score >= beta:
+            bound = LOWER
+        elif best_score > original_alpha:
+            bound = EXACT
+        else:
+            bound = UPPER
+        self.table.store(
+            key, best_move, _score_to_table(best_score, ply), depth, bound
+        )
+        return best_score
+
+    def _quiesce(self, board: Board, alpha: int, beta: int, ply: int) -> int:
+        # only captures and promotions, so the evaluation is not taken
+        # in the middle of an exchange
+        self.nodes += 1
+        if self.nodes >= self._next_check:
+            self._check_limits()
+        self._pv[ply] = []
+        best_score = board.evaluate()
+        if best_score >= beta or ply >= MAX_PLY - 1:
+            return best_score
+        if best_score > alpha:
+            alpha = best_score
+
+        for move in board._iter_captures():
+            board._push(move)
+            score = -self._quiesce(board, -beta, -alpha, ply + 1)
+            board._pop()
+            if score > best_score:
+                best_score = score
+                if score > alpha:
+                    if score >= beta:
+                        break
+                    alpha = score
+        return best_score
+
+    def _order(
+        self, board: Board, moves: list[int], table_move: int, ply: int
+    ) -> None:
+        killer, second_killer = self._killers[ply]
+
+        def key(move: int) -> int:
+            if move == table_move:
+                return _TABLE_MOVE
+            if board._is_capture(move):
+                return _CAPTURE + board._get_capture_order(move)
+            if move == killer:
+                return _KILLER + 1
+            if move == second_killer:
+                return _KILLER
+            return 0
+
+        moves.sort(key=key, reverse=True)
+
+    def _is_repetition(self, board: Board) -> bool:
+        # every undo keeps the key from before its move, two plies back
+        # the same side was to move, a capture or pawn move ends the search
+        stack = board._undo_stack
+        key = board.zobrist
+        end = max(len(stack) - board.halfmoves, 0)
+        for i in range(len(stack) - 2, end - 1, -2):
+            if stack[i].zobrist == key:
+                return True
+        return False
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog='python -m chess.engine',
+        description='search a position for the best move',
+    )
+    parser.add_argument('fen', nargs='?', default=STARTING_FEN)
+    parser.add_argument('-d', '--depth', type=int)
+    parser.add_argument(
+        '-t', '--time', type=float, help='time limit in seconds'
+    )
+    parser.add_argument('-n', '--nodes', type=int, help='node limit')
+    parser.add_argument(
+        '--hash',
+        type=float,
+        default=16,
+        metavar='MB',
+        help='size of the transposition table',
+    )
+    args = parser.parse_args(argv)
+    if args.depth is None and args.time is None and args.nodes is None:
+        args.time = 1.0
+
+    def report(result: SearchResult) -> None:
+        mate = result.mate
+        score = f'mate {mate}' if mate is not None else f'cp {result.score}'
+        print(
+            f'depth {result.depth} score {score} nodes {result.nodes}'
+            f' nps {result.nps:.0f} time {result.elapsed:.3f}'
+            f' pv {" ".join(move.uci() for move in result.pv)}'
+        )
+
+    engine = Engine(args.hash)
+    result = engine.search(
+        Board(args.fen), args.depth, args.time, args.nodes, report
+    )
+    print(f'bestmove {result.move.uci() if result.move else "(none)"}')
+
+
+if __name__ == '__main__':
+    main()
@@ -12,3 +12,7 @@ class NotAPieceError(ChessError):
 
 class IllegalMoveError(ChessError):
     pass
+
+
+class SANError(ChessError):
+    pass
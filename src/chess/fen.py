@@ -0,0 +1,103 @@
+import re
+
+from .exceptions import FENError
+from .util import square_to_index
+
+STARTING_FEN = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
+
+# placements are handled as 64 characters from a8 to h1
+# with '.' for an empty square
+_EXPAND = {char: char for char in 'PNBRQKpnbrqk'}
+_EXPAND.update({str(count): '.' * count for count in range(1, 9)})
+_COLLAPSE = [('.' * count, str(count)) for count in range(8, 0, -1)]
+_DOUBLE_DIGIT = re.compile(r'\d\d')
+
+# castle rights as bits: K=1, Q=2, k=4, q=8
+_CASTLE_BITS = {'K': 1, 'Q': 2, 'k': 4, 'q': 8}
+CASTLE_RIGHTS = [
+    ''.join(char for char, bit in _CASTLE_BITS.items() if bits & bit) or '-'
+    for bits in range(16)
+]
+
+
+def split(fen: str) -> list[str]:
+    fields = fen.split()
+    if len(fields) != 6:
+        raise FENError(f'fen does not have 6 fields: {fen}')
+    return fields
+
+
+def decode_placement(placement: str) -> str:
+    rows = placement.split('/')
+    if len(rows) != 8:
+        raise FENError(f'board does not have 8 rows: {len(rows)}')
+    if _DOUBLE_DIGIT.search(placement):
+        raise FENError(f'board has two digits in a row: {placement}')
+    squares = []
+    for row in rows:
+        try:
+            expanded = ''.join([_EXPAND[char] for char in row])
+        except KeyError as e:
+            raise FENError(f'character is not a piece type: {e.args[0]}')
+        if len(expanded) != 8:
+            raise FENError(f'row does not have 8 columns: {row}')
+        squares.append(expanded)
+    return ''.join(squares)
+
+
+def encode_placement(squares: str) -> str:
+    placement = '/'.join([squares[i : i + 8] for i in range(0, 64, 8)])
+    for run, count in _COLLAPSE:
+        placement = placement.replace(run, count)
+    return placement
+
+
+def decode_active_color(active_color: str) -> str:
+    if active_color not in ('w', 'b'):
+        raise FENError(f"active color is not 'w' or 'b': {active_color}")
+    return active_color
+
+
+def decode_castle_rights(castle_rights: str) -> int:
+    if castle_rights == '-':
+        return 0
+    bits = 0
+    for char in castle_rights:
+        bit = _CASTLE_BITS.get(char)
+        if bit is None or bits & bit:
+            raise FENError(f'castle rights are not valid: {castle_rights}')
+        bits |= bit
+    return bits
+
+
+def decode_en_passant(en_passant: str, active_color: str) -> int:
+    # board index of the square, 0 if there is none
+    if en_passant == '-':
+        return 0
+    try:
+        index = square_to_index(en_passant)
+    except ValueError:
+        raise FENError(f'en passant is not a square: {en_passant}')
+    if en_passant[1] != ('6' if active_color == 'w' else '3'):
+        raise FENError(f'en passant square is on the wrong row: {en_passant}')
+    return index
+
+
+def decode_halfmoves(halfmoves: str) -> int:
+    try:
+        hm = int(halfmoves)
+    except ValueError:
+        raise FENError(f'halfmove clock is not a number: {halfmoves}')
+    if not 0 <= hm <= 100:
+        raise FENError(f'halfmove clock is below 0 or above 100: {halfmoves}')
+    return hm
+
+
+def decode_fullmoves(fullmoves: str) -> int:
+    try:
+        fm = int(fullmoves)
+    except ValueError:
+        raise FENError(f'fullmove counter is not a number: {fullmoves}')
+    if fm < 1:
+        raise FENError(f'fullmove counter is less than 1: {fullmoves}')
+    return fm
@@ -0,0 +1,209 @@
+import argparse
+import collections
+import concurrent.futures
+import functools
+import os
+import time
+from typing import Callable
+
+from .bitboard import BitBoard
+from .board import Board
+from .position import Position
+from .transposition import PerftTable, Replace
+from .util import Move
+
+BACKENDS: dict[str, type[Board | BitBoard]] = {
+    'board': Board,
+    'bitboard': BitBoard,
+}
+
+
+def _get_factory(
+    board: Board | BitBoard,
+) -> Callable[[Position], Board | BitBoard]:
+    if isinstance(board, Board):
+        return functools.partial(Board.from_position, movegen=board.movegen)
+    return type(board).from_position
+
+
+# every worker process keeps its own table for all of its tasks
+_worker_table: PerftTable | None = None
+
+
+def _init_worker(hash_mb: float, replace: Replace) -> None:
+    global _worker_table
+    if hash_mb > 0:
+        _worker_table = PerftTable(hash_mb, replace)
+
+
+def _perft_position(
+    factory: Callable[[Position], Board | BitBoard],
+    position: Position,
+    depth: int,
+) -> tuple[int, int, int, int]:
+    # the nodes and the hits, misses and stores of the table for them
+    board = factory(position)
+    table = _worker_table
+    if not isinstance(board, Board) or table is None:
+        return board.perft(depth), 0, 0, 0
+    hits, misses, stores = table.hits, table.misses, table.stores
+    nodes = board.perft(depth, table)
+    return (
+        nodes,
+        table.hits - hits,
+        table.misses - misses,
+        table.stores - stores,
+    )
+
+
+def _split(
+    board: Board | BitBoard, depth: int, plies: int
+) -> list[tuple[Move, Position, int]]:
+    # the subtrees are sent to workers as position snapshots,
+    # a small tuple to pickle that needs no fen parsing on the other side
+    tasks = []
+    for move in board.legal_moves:
+        board.push(move)
+        if plies > 1 and depth > 2:
+            for reply in board.legal_moves:
+                board.push(reply)
+                tasks.append((move, board.position(), depth - 2))
+                board.pop()
+        else:
+            tasks.append((move, board.position(), depth - 1))
+        board.pop()
+    return tasks
+
+
+def divide_parallel(
+    board: Board | BitBoard,
+    depth: int,
+    jobs: int | None = None,
+    hash_mb: float = 0,
+    replace: Replace = 'depth',
+    counts: collections.Counter[str] | None = None,
+) -> dict[Move, int]:
+    # the hits, misses and stores of the tables of all workers are added
+    # to counts
+    if depth < 1:
+        raise ValueError(f'depth has to be at least 1: {depth}')
+    # two plies give enough tasks to keep every worker busy
+    # even when a few root moves hold most of the tree
+    tasks = _split(board, depth, 2 if depth >= 4 else 1)
+    nodes = {move: 0 for move in board.legal_moves}
+    factory = _get_factory(board)
+    jobs = jobs or os.cpu_count() or 1
+    with concurrent.futures.ProcessPoolExecutor(
+        jobs, initializer=_init_worker, initargs=(hash_mb, replace)
+    ) as executor:
+        results = executor.map(
+            _perft_position,
+            [factory] * len(tasks),
+            [position for _, position, _ in tasks],
+            [task_depth for _, _, task_depth in tasks],
+            chunksize=max(1, len(tasks) // (jobs * 4)),
+        )
+        for (move, _, _), (result, hits, misses, stores) in zip(
+            tasks, results
+        ):
+            nodes[move] += result
+            if counts is not None:
+                counts.update(hits=hits, misses=misses, stores=stores)
+    return nodes
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog='python -m chess.perft',
+        description='count leaf nodes of the move tree up to a given depth',
+    )
+    parser.add_argument('depth', type=int)
+    parser.add_argument(
+        'fen',
+        nargs='?',
+        default='rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+    )
+    parser.add_argument(
+        '-b',
+        '--backend',
+        choices=BACKENDS,
+        default='board',
+    )
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        type=int,
+        default=1,
+        help='number of worker processes, 0 uses every core',
+    )
+    parser.add_argument(
+        '--hash',
+        type=float,
+        default=0,
+        metavar='MB',
+        help='size of the transposition table per process, 0 disables it',
+    )
+    parser.add_argument(
+        '--replace',
+        choices=['depth', 'always'],
+        default='depth',
+        help='transposition table replacement scheme',
+    )
+    args = parser.parse_args(argv)
+    if args.hash > 0 and args.backend != 'board':
+        parser.error('the transposition table needs the board backend')
+
+    board = BACKENDS[args.backend](args.fen)
+    table = None
+    counts: collections.Counter[str] = collections.Counter()
+    start = time.perf_counter()
+    if args.depth > 0 and args.jobs != 1:
+        nodes_by_move = divide_parallel(
+            board,
+            args.depth,
+            args.jobs or None,
+            args.hash,
+            args.replace,
+            counts,
+        )
+    elif args.depth > 0 and isinstance(board, Board) and args.hash > 0:
+        table = PerftTable(args.hash, args.replace)
+        nodes_by_move = board.divide(args.depth, table)
+    elif args.depth > 0:
+        nodes_by_move = board.divide(args.depth)
+    else:
+        nodes_by_move = {}
+    elapsed = time.perf_counter() - start
+
+    for uci, nodes in sorted(
+        (move.uci(), nodes) for move, nodes in nodes_by_move.items()
+    ):
+        print(f'{uci}: {nodes}')
+    total = sum(nodes_by_move.values()) if args.depth > 0 else 1
+    print()
+    print(f'nodes: {total}')
+    print(f'time: {elapsed:.3f}s')
+    print(f'nps: {total / elapsed if elapsed else 0:.0f}')
+    if args.hash > 0 and args.depth > 0:
+        if table is not None:
+            counts.update(
+                hits=table.hits, misses=table.misses, stores=table.stores
+            )
+            size = (
+                f'{len(table)} entries'
+                f' in {table.size_bytes / 1024 / 1024:.1f}MB'
+            )
+        else:
+            # every worker process has a table of its own
+            jobs = args.jobs or os.cpu_count() or 1
+            size = f'{jobs} tables of {args.hash}MB'
+        probes = counts['hits'] + counts['misses']
+        print(
+            f'hash: {counts["hits"]} hits, {counts["misses"]} misses'
+            f' ({counts["hits"] / probes if probes else 0:.1%}),'
+            f' {counts["stores"]} stores, {size}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,365 @@
+import argparse
+import re
+import sys
+import time
+from typing import Iterable, Iterator, NamedTuple, Sequence, TextIO
+
+from . import pieces as p
+from . import status
+from .board import Board
+from .color import WHITE
+from .exceptions import FENError, IllegalMoveError, SANError
+from .fen import STARTING_FEN
+from .util import PROMOTIONS, Move, index_to_square, square_to_index
+
+SEVEN_TAG_ROSTER = [
+    'Event',
+    'Site',
+    'Date',
+    'Round',
+    'White',
+    'Black',
+    'Result',
+]
+RESULTS = {'1-0', '0-1', '1/2-1/2', '*'}
+# export format lines are at most 79 characters long
+_LINE_LENGTH = 79
+
+_SAN = re.compile(
+    r'([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQ]))?[+#]?[!?]*'
+)
+_CASTLING = re.compile(r'([O0]-[O0](-[O0])?)[+#]?[!?]*')
+_HEADER = re.compile(r'\[\s*(\w+)\s*"((?:[^"\\]|\\.)*)"\s*\]')
+_ESCAPE = re.compile(r'\\(.)')
+# a move number is its own token, also when it sticks to the move
+_TOKEN = re.compile(r'[{};()]|\d+\.+|[^\s{};()]+')
+_MOVE_NUMBER = re.compile(r'\d+\.*')
+
+
+class Game(NamedTuple):
+    headers: dict[str, str]
+    moves: list[Move]
+    # why the moves stop early, the moves before it are kept
+    error: str | None = None
+
+    def board(self) -> Board:
+        # the position the game starts from
+        return Board(self.headers.get('FEN', STARTING_FEN))
+
+
+def _find_moves(board: Board, char: str, dest: int) -> list[int]:
+    # legal moves to dest by the pieces of one kind, only those pieces
+    # are generated, which is a lot cheaper than every legal move
+    color = board.active_color
+    found = []
+    for piece, index in list(board._pieces[color.index].items()):
+        if piece.char != char:
+            continue
+        moves: list[int] = []
+        king = isinstance(piece, p.King)
+        if king:
+            # castling has its own rules, and kings have few moves
+            piece.add_legal_moves(board, index, moves)
+        else:
+            piece.add_pseudolegal_moves(board, index, moves)
+        for move in moves:
+            if move >> 7 & 127 != dest:
+                continue
+            if not king:
+                board._push(move)
+                check = board._is_king_in_check(color)
+                board._pop()
+                if check:
+                    continue
+            found.append(move)
+    return found
+
+
+def _parse_san(board: Board, san: str) -> int:
+    castling = _CASTLING.fullmatch(san)
+    if castling:
+        king = board._kings[board.active_color.index]
+        dest = king - 2 if castling.group(2) else king + 2
+        for move in _find_moves(board, 'k', dest):
+            if move & 127 == king:
+                return move
+        raise IllegalMoveError(f'move is not legal: {san}')
+
+    match = _SAN.fullmatch(san)
+    if match is None:
+        raise SANError(f'not a move: {san}')
+    char, file, rank, square, promotion = match.groups()
+    promotion_index = PROMOTIONS.index(promotion) if promotion else 0
+    found = 0
+    for move in _find_moves(
+        board, (char or 'p').lower(), square_to_index(square)
+    ):
+        origin_square = index_to_square(move & 127)
+        if (
+            move >> 14 != promotion_index
+            or (file and origin_square[0] != file)
+            or (rank and origin_square[1] != rank)
+        ):
+            continue
+        if found:
+            raise SANError(f'move is ambiguous: {san}')
+        found = move
+    if not found:
+        raise IllegalMoveError(f'move is not legal: {san}')
+    return found
+
+
+def parse_san(board: Board, san: str) -> Move:
+    return Move.unpack(_parse_san(board, san))
+
+
+def _to_san(board: Board, move: int) -> str:
+    origin = move & 127
+    dest = move >> 7 & 127
+    piece = board._board[origin]
+    captures = not isinstance(board._board[dest], p.Empty)
+    if isinstance(piece, p.King) and abs(dest - origin) == 2:
+        san = 'O-O' if dest > origin else 'O-O-O'
+    elif isinstance(piece, p.Pawn):
+        san = index_to_square(dest)
+        if dest % 10 != origin % 10:
+            # en passant captures land on an empty square
+            san = f'{index_to_square(origin)[0]}x{san}'
+        if move >> 14:
+            san += f'={PROMOTIONS[move >> 14]}'
+    else:
+        # other pieces of the same kind that can go to the same square
+        others = [
+            other & 127
+            for other in _find_moves(board, piece.char, dest)
+            if other & 127 != origin
+        ]
+        origin_square = index_to_square(origin)
+        prefix = ''
+        if others:
+            if all(other % 10 != origin % 10 for other in others):
+                prefix = origin_square[0]
+            elif all(other // 10 != origin // 10 for other in others):
+                prefix = origin_square[1]
+            else:
+                prefix = origin_square
+        capture = 'x' if captures else ''
+        san = f'{piece.char.upper()}{prefix}{capture}{index_to_square(dest)}'
+
+    board._push(move)
+    if board._is_king_in_check(board.active_color):
+        san += '+' if board.has_legal_move() else '#'
+    board._pop()
+    return san
+
+
+def to_san(board: Board, move: Move) -> str:
+    packed = move.pack()
+    if packed not in board._get_legal_moves():
+        raise IllegalMoveError(f'move is not legal: {move}')
+    return _to_san(board, packed)
+
+
+def result(board: Board) -> str:
+    # the result tag for a game that ended in this position
+    game_status = board.status
+    if isinstance(game_status, status.Checkmate):
+        return '1-0' if game_status.winner is WHITE else '0-1'
+    if isinstance(game_status, status.Ongoing):
+        return '*'
+    return '1/2-1/2'
+
+
+def game_from_fens(
+    fens: Sequence[str], headers: dict[str, str] | None = None
+) -> Game:
+    headers = dict(headers or {})
+    board = Board(fens[0])
+    if fens[0] != STARTING_FEN:
+        headers['SetUp'] = '1'
+        headers['FEN'] = fens[0]
+    moves = []
+    error = None
+    for fen in fens[1:]:
+        move = board._find_move(fen)
+        if move is None:
+            error = f'no legal move leads to {fen}'
+            break
+        moves.append(Move.unpack(move))
+        board._push(move)
+    headers.setdefault('Result', '*' if error else result(board))
+    return Game(headers, moves, error)
+
+
+def read_games(lines: Iterable[str]) -> Iterator[Game]:
+    # lines can be an open file, it is read one line at a time and only
+    # the game being read is kept, so the size of the file does not
+    # matter, games with a move that is not legal or not understood keep
+    # the moves before it and the error
+    headers: dict[str, str] = {}
+    moves: list[Move] = []
+    board: Board | None = None
+    error: str | None = None
+    # a tag after movetext starts the next game, also when no move of
+    # this one could be read
+    in_movetext = False
+    in_comment = False
+    depth = 0
+
+    for line in lines:
+        if in_comment:
+            end = line.find('}')
+            if end < 0:
+                continue
+            in_comment = False
+            line = line[end + 1 :]
+        elif line.startswith('%'):
+            continue
+        elif line.lstrip().startswith('['):
+            header = _HEADER.match(line.lstrip())
+            if header:
+                if in_movetext:
+                    # the last game had no termination marker
+                    if headers or moves or error:
+                        yield Game(headers, moves, error)
+                    headers, moves, board, error = {}, [], None, None
+                    in_movetext = False
+                    depth = 0
+                headers[header.group(1)] = _ESCAPE.sub(r'\1', header.group(2))
+                continue
+
+        pos = 0
+        while True:
+            if in_comment:
+                end = line.find('}', pos)
+                if end < 0:
+                    break
+                in_comment = False
+                pos = end + 1
+            token_match = _TOKEN.search(line, pos)
+            if token_match is None:
+                break
+            token = token_match.group()
+            pos = token_match.end()
+            in_movetext = True
+            if token == '{':
+                in_comment = True
+            elif token == ';':
+                break
+            elif token == '(':
+                depth += 1
+            elif token == ')':
+                depth = max(depth - 1, 0)
+            elif depth:
+                continue
+            elif token in RESULTS:
+                headers.setdefault('Result', token)
+                yield Game(headers, moves, error)
+                headers, moves, board, error = {}, [], None, None
+                in_movetext = False
+            elif _MOVE_NUMBER.fullmatch(token) or token[0] in '$!?':
+                # move numbers, numeric annotation glyphs and suffixes,
+                # castling written with zeros starts with a digit too
+                continue
+            elif error is None:
+                try:
+                    if board is None:
+                        board = Board(headers.get('FEN', STARTING_FEN))
+                    move = _parse_san(board, token)
+                except (FENError, SANError, IllegalMoveError) as e:
+                    error = str(e)
+                    continue
+                board._push(move)
+                moves.append(Move.unpack(move))
+
+    if headers or moves or error:
+        yield Game(headers, moves, error)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def write_game(f: TextIO, game: Game) -> None:
+    # the seven tag roster comes first and in its order, tags that are
+    # missing from it are written as unknown
+    headers = {tag: '?' for tag in SEVEN_TAG_ROSTER}
+    headers['Result'] = '*'
+    headers.update(game.headers)
+    for tag in SEVEN_TAG_ROSTER:
+        f.write(f'[{tag} "{_escape(headers.pop(tag))}"]\n')
+    for tag, value in headers.items():
+        f.write(f'[{tag} "{_escape(value)}"]\n')
+    f.write('\n')
+
+    board = game.board()
+    tokens = []
+    for i, move in enumerate(game.moves):
+        if board.active_color is WHITE:
+            tokens.append(f'{board.fullmoves}.')
+        elif i == 0:
+            tokens.append(f'{board.fullmoves}...')
+        packed = move.pack()
+        tokens.append(_to_san(board, packed))
+        board._push(packed)
+    tokens.append(game.headers.get('Result', '*'))
+
+    line = ''
+    for token in tokens:
+        if not line:
+            line = token
+        elif len(line) + 1 + len(token) > _LINE_LENGTH:
+            f.write(f'{line}\n')
+            line = token
+        else:
+            line = f'{line} {token}'
+    f.write(f'{line}\n\n')
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog='python -m chess.pgn',
+        description='read every game of a pgn file and report the speed',
+    )
+    parser.add_argument('path', help="pgn file, '-' for standard input")
+    parser.add_argument(
+        '-o',
+        '--output',
+        help='write the games back out as pgn to this file',
+    )
+    args = parser.parse_args(argv)
+
+    games = moves = errors = 0
+    start = time.perf_counter()
+    source = (
+        sys.stdin
+        if args.path == '-'
+        else open(args.path, encoding='utf-8', errors='replace')
+    )
+    output = open(args.output, 'w') if args.output else None
+    try:
+        for game in read_games(source):
+            games += 1
+            moves += len(game.moves)
+            if game.error:
+                errors += 1
+                print(f'game {games}: {game.error}', file=sys.stderr)
+            if output:
+                write_game(output, game)
+            if games % 1000 == 0:
+                elapsed = time.perf_counter() - start
+                print(f'{games} games, {games / elapsed:.0f} games/s')
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output:
+            output.close()
+    elapsed = time.perf_counter() - start
+    print(
+        f'{games} games, {moves} moves, {errors} with errors '
+        f'in {elapsed:.1f}s, {games / elapsed:.0f} games/s'
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -2,38 +2,85 @@ from typing import TYPE_CHECKING
 
 from .color import WHITE, Color
 from .exceptions import NotAPieceError
-from .util import Move, index_to_square
+from .util import PROMOTIONS, index_to_square, pack_move
 
 if TYPE_CHECKING:
     from .board import Board
 
 
+def _is_on_board(index: int) -> bool:
+    return 21 <= index <= 98 and index % 10 not in {0, 9}
+
+
+def _make_rays(offsets: list[int], length: int) -> list[list[list[int]]]:
+    # rays[index] holds, for every offset, the on-board squares reachable
+    # from index in that direction, nearest first
+    rays = []
+    for index in range(120):
+        index_rays = []
+        if _is_on_board(index):
+            for offset in offsets:
+                ray = []
+                target_index = index + offset
+                while _is_on_board(target_index) and len(ray) < length:
+                    ray.append(target_index)
+                    target_index += offset
+                if ray:
+                    index_rays.append(ray)
+        rays.append(index_rays)
+    return rays
+
+
 class BoardEntity:
+    __slots__ = ()
     char = ''
-
-    @property
-    def icon(self) -> str:
-        return self.char
+    # what the square shows, also the character fen uses for it
+    icon = ''
 
 
 class Piece(BoardEntity):
+    __slots__ = ('color', 'icon')
+
     def __init__(self, color: Color) -> None:
         self.color = color
+        # TODO: make color agnostic
+        self.icon = self.char.upper() if color == WHITE else self.char
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}('{self.color.name}')"
 
-    def get_pseudolegal_moves(self, board: 'Board', index: int) -> set[Move]:
+    def add_pseudolegal_moves(
+        self,
+        board: 'Board',
+        index: int,
+        moves: list[int],
+        mask: set[int] | None = None,
+    ) -> None:
+        # appends packed moves, see chess.util.pack_move
+        # and skips destinations outside of mask unless it is None
         raise NotImplementedError
 
-    def get_legal_moves(self, board: 'Board', index: int) -> set[Move]:
-        pseudolegal_moves = self.get_pseudolegal_moves(board, index)
-        legal_moves = set()
+    def add_legal_moves(
+        self, board: 'Board', index: int, moves: list[int]
+    ) -> None:
+        pseudolegal_moves: list[int] = []
+        self.add_pseudolegal_moves(board, index, pseudolegal_moves)
         for move in pseudolegal_moves:
-            with board._with_move(move):
-                if not board._is_king_in_check(self.color):
-                    legal_moves.add(move)
-        return legal_moves
+            board._push(move)
+            if not board._is_king_in_check(self.color):
+                moves.append(move)
+            board._pop()
+
+    def add_masked_legal_moves(
+        self,
+        board: 'Board',
+        index: int,
+        moves: list[int],
+        mask: set[int] | None,
+    ) -> None:
+        # mask holds the destinations that keep the king safe
+        # (check evasions and the pin line), None means anything goes
+        self.add_pseudolegal_moves(board, index, moves, mask)
 
     @classmethod
     def is_square_attacked_by_piece_type(
@@ -44,34 +91,40 @@ class Piece(BoardEntity):
     ) -> bool:
         raise NotImplementedError
 
-    def make_move(
-        self,
+    @staticmethod
+    def _get_target_color(
         board: 'Board',
-        move: Move,
-        bookkeep: bool = True,
-    ) -> None:
-        if bookkeep:
-            captured_piece = board[move.dest]
-            if isinstance(captured_piece, Piece):
-                board.halfmoves = 0
-                board._pieces[captured_piece.color].remove(captured_piece)
-                cr = board.castle_rights[captured_piece.color]
-                if move.dest == captured_piece.color.king_rook_index:
-                    cr.kingside = False
-                if move.dest == captured_piece.color.queen_rook_index:
-                    cr.queenside = False
-            board.en_passant = 0
-
-        board[move.origin] = Empty()
-        board[move.dest] = self
-
-    @property
-    def icon(self) -> str:
-        # TODO: make color agnostic
-        return self.char.upper() if self.color == WHITE else self.char
+        index: int,
+        color: Color | None,
+    ) -> Color | None:
+        if color is not None:
+            return color
+        target = board[index]
+        if not isinstance(target, Piece):
+            return None
+        return target.color
+
+    def make_move(self, board: 'Board', move: int) -> None:
+        origin = move & 127
+        dest = move >> 7 & 127
+        captured_piece = board[dest]
+        if isinstance(captured_piece, Piece):
+            board.halfmoves = 0
+            cr = board.castle_rights[captured_piece.color.index]
+            if dest == captured_piece.color.king_rook_index:
+                cr.kingside = False
+            if dest == captured_piece.color.queen_rook_index:
+                cr.queenside = False
+        board.en_passant = 0
+
+        board._put(origin, EMPTY)
+        board._put(dest, self)
 
 
 class SymmetricMovePiece(Piece):
+    __slots__ = ()
+    rays: list[list[list[int]]]
+
     @classmethod
     def is_square_attacked_by_piece_type(
         cls,
@@ -79,104 +132,153 @@ class SymmetricMovePiece(Piece):
         index: int,
         color: Color | None = None,
     ) -> bool:
-        target = board[index]
-        if color is not None:
-            target_color = color
-        else:
-            if not isinstance(target, Piece):
-                return False
-            target_color = target.color
-        fake_piece = cls(target_color)
-        moves = fake_piece.get_pseudolegal_moves(board, index)
-        for move in moves:
-            piece = board[move.dest]
-            if isinstance(piece, cls):
-                return True
+        target_color = cls._get_target_color(board, index, color)
+        if target_color is None:
+            return False
+        # the moves are symmetric so we look outward from the target
+        # and stop each ray at the first piece we hit
+        squares = board._board
+        for ray in cls.rays[index]:
+            for target_index in ray:
+                piece = squares[target_index]
+                if isinstance(piece, Empty):
+                    continue
+                if isinstance(piece, cls) and piece.color != target_color:
+                    return True
+                break
         return False
 
 
 class SlidingPiece(SymmetricMovePiece):
+    __slots__ = ()
     offsets: list[int]
 
-    def get_pseudolegal_moves(self, board: 'Board', index: int) -> set[Move]:
-        moves = set()
-        for offset in self.offsets:
-            target_index = index
-            while True:
-                target_index += offset
-                piece = board[target_index]
-
-                if isinstance(piece, Empty):
-                    moves.add(Move(index, target_index))
-                elif isinstance(piece, Border):
-                    break
-                elif piece.color != self.color:
-                    moves.add(Move(index, target_index))
-                    break
-                else:  # piece.color == self.color
+    def add_pseudolegal_moves(
+        self,
+        board: 'Board',
+        index: int,
+        moves: list[int],
+        mask: set[int] | None = None,
+    ) -> None:
+        squares = board._board
+        append = moves.append
+        for ray in self.rays[index]:
+            for target_index in ray:
+                piece = squares[target_index]
+                if isinstance(piece, Piece):
+                    if piece.color != self.color and (
+                        mask is None or target_index in mask
+                    ):
+                        append(index | target_index << 7)
                     break
-        return moves
+                if mask is None or target_index in mask:
+                    append(index | target_index << 7)
 
 
 class JumpingPiece(SymmetricMovePiece):
+    __slots__ = ()
     offsets: list[int]
 
-    def get_pseudolegal_moves(self, board: 'Board', index: int) -> set[Move]:
-        moves = set()
-        for offset in self.offsets:
-            target_index = index + offset
-            piece = board[target_index]
-
-            if isinstance(piece, Border):
+    def add_pseudolegal_moves(
+        self,
+        board: 'Board',
+        index: int,
+        moves: list[int],
+        mask: set[int] | None = None,
+    ) -> None:
+        squares = board._board
+        append = moves.append
+        for (target_index,) in self.rays[index]:
+            piece = squares[target_index]
+            if isinstance(piece, Piece) and piece.color == self.color:
                 continue
-            if isinstance(piece, Empty) or piece.color != self.color:
-                moves.add(Move(index, target_index))
-
-        return moves
+            if mask is None or target_index in mask:
+                append(index | target_index << 7)
 
 
 class Pawn(Piece):
+    __slots__ = ()
     char = 'p'
 
-    def _make_moves(self, board: 'Board', origin: int, dest: int) -> set[Move]:
+    def _add_moves(self, origin: int, dest: int, moves: list[int]) -> None:
         if self.color.promotion_row <= dest <= self.color.promotion_row + 10:
-            return {
-                Move(origin, dest, Type.char.upper())
-                for Type in board._PAWN_PROMOTIONS
-            }
-        return {Move(origin, dest)}
-
-    def get_pseudolegal_moves(self, board: 'Board', index: int) -> set[Move]:
-        moves = set()
+            for promotion in range(1, len(PROMOTIONS)):
+                moves.append(pack_move(origin, dest, promotion))
+        else:
+            moves.append(origin | dest << 7)
+
+    def _add_pushes_and_captures(
+        self,
+        board: 'Board',
+        index: int,
+        moves: list[int],
+        mask: set[int] | None,
+    ) -> None:
+        squares = board._board
         offset = 10 * self.color.forward_sign
-        attack_offsets = {offset + 1, offset - 1}
 
         target_index = index + offset
-        piece = board[target_index]
-        if isinstance(piece, Empty):
-            moves.update(self._make_moves(board, index, target_index))
+        if isinstance(squares[target_index], Empty):
+            if mask is None or target_index in mask:
+                self._add_moves(index, target_index, moves)
             target_index += offset
-            piece = board[target_index]
             if (
                 self.color.dmove_row <= index <= self.color.dmove_row + 10
-                and isinstance(piece, Empty)
+                and isinstance(squares[target_index], Empty)
+                and (mask is None or target_index in mask)
             ):
-                moves.update(self._make_moves(board, index, target_index))
+                self._add_moves(index, target_index, moves)
 
-        for attack_offset in attack_offsets:
-            target_index = index + attack_offset
-            piece = board[target_index]
-            en_passant_piece = board[board.en_passant - offset]
+        for target_index in (index + offset - 1, index + offset + 1):
+            piece = squares[target_index]
             if (
-                target_index == board.en_passant
-                and isinstance(en_passant_piece, Pawn)
-                and en_passant_piece.color != self.color
-                or isinstance(piece, Piece)
+                isinstance(piece, Piece)
                 and piece.color != self.color
+                and (mask is None or target_index in mask)
             ):
-                moves.update(self._make_moves(board, index, target_index))
+                self._add_moves(index, target_index, moves)
 
-        return moves
+    def _get_en_passant_move(self, board: 'Board', index: int) -> int:
+        # 0 when this pawn cannot capture en passant
+        offset = 10 * self.color.forward_sign
+        if board.en_passant not in (index + offset - 1, index + offset + 1):
+            return 0
+        en_passant_piece = board[board.en_passant - offset]
+        if (
+            isinstance(en_passant_piece, Pawn)
+            and en_passant_piece.color != self.color
+        ):
+            return index | board.en_passant << 7
+        return 0
+
+    def add_pseudolegal_moves(
+        self,
+        board: 'Board',
+        index: int,
+        moves: list[int],
+        mask: set[int] | None = None,
+    ) -> None:
+        self._add_pushes_and_captures(board, index, moves, mask)
+        move = self._get_en_passant_move(board, index)
+        if move and (mask is None or board.en_passant in mask):
+            moves.append(move)
+
+    def add_masked_legal_moves(
+        self,
+        board: 'Board',
+        index: int,
+        moves: list[int],
+        mask: set[int] | None,
+    ) -> None:
+        self._add_pushes_and_captures(board, index, moves, mask)
+        # en passant removes a second piece from the board
+        # which masks do not account for, so it is probed
+        move = self._get_en_passant_move(board, index)
+        if move:
+            board._push(move)
+            if not board._is_king_in_check(self.color):
+                moves.append(move)
+            board._pop()
 
     @classmethod
     def is_square_attacked_by_piece_type(
@@ -185,13 +287,9 @@ class Pawn(Piece):
         index: int,
         color: Color | None = None,
     ) -> bool:
-        if color is not None:
-            target_color = color
-        else:
-            target = board[index]
-            if not isinstance(target, Piece):
-                return False
-            target_color = target.color
+        target_color = cls._get_target_color(board, index, color)
+        if target_color is None:
+            return False
         offsets = {
             9 * target_color.forward_sign,
             11 * target_color.forward_sign,
@@ -202,163 +300,188 @@ class Pawn(Piece):
                 return True
         return False
 
-    def make_move(
-        self,
-        board: 'Board',
-        move: Move,
-        bookkeep: bool = True,
-    ) -> None:
-        if move.dest == board.en_passant:
+    def make_move(self, board: 'Board', move: int) -> None:
+        origin = move & 127
+        dest = move >> 7 & 127
+        if dest == board.en_passant:
             en_passanted_index = (
                 board.en_passant - 10 * self.color.forward_sign
             )
-            if bookkeep:
-                en_passanted = board[en_passanted_index]
-                if not isinstance(en_passanted, Piece):
-                    raise NotAPieceError(
-                        "no piece en passant'ed:"
-                        f' {index_to_square(en_passanted_index)}'
-                    )
-                board._pieces[en_passanted.color].remove(en_passanted)
-            board[en_passanted_index] = Empty()
-
-        super().make_move(board, move, bookkeep)
+            en_passanted = board[en_passanted_index]
+            if not isinstance(en_passanted, Piece):
+                raise NotAPieceError(
+                    "no piece en passant'ed:"
+                    f' {index_to_square(en_passanted_index)}'
+                )
+            board._put(en_passanted_index, EMPTY)
+
+        super().make_move(board, move)
         Type = None
-        if (
-            self.color.promotion_row
-            <= move.dest
-            <= self.color.promotion_row + 10
-        ):
-            Type = board._CHAR_TO_PROMOTION[move.promotion.lower()]
-
-        if bookkeep:
-            if move.origin - move.dest == -20 * self.color.forward_sign:
-                idx = (move.origin + move.dest) // 2
-            else:
-                idx = 0
-            board.en_passant = idx
-            board.halfmoves = 0
-            if Type:
-                new_piece = Type(self.color)
-                board[move.dest] = new_piece
-                board._pieces[self.color].remove(self)
-                board._pieces[self.color].add(new_piece)
+        if self.color.promotion_row <= dest <= self.color.promotion_row + 10:
+            Type = board._CHAR_TO_PROMOTION[PROMOTIONS[move >> 14].lower()]
+
+        if origin - dest == -20 * self.color.forward_sign:
+            idx = (origin + dest) // 2
+        else:
+            idx = 0
+        board.en_passant = idx
+        board.halfmoves = 0
+        if Type:
+            new_piece = Type(self.color)
+            board._put(dest, new_piece)
 
 
 class Knight(JumpingPiece):
+    __slots__ = ()
     char = 'n'
     offsets = [-21, -19, -12, -8, 8, 12, 19, 21]
+    rays = _make_rays(offsets, 1)
 
 
 class Bishop(SlidingPiece):
+    __slots__ = ()
     char = 'b'
     offsets = [-11, -9, 9, 11]
+    rays = _make_rays(offsets, 7)
 
 
 class Rook(SlidingPiece):
+    __slots__ = ()
     char = 'r'
     offsets = [-10, -1, 1, 10]
+    rays = _make_rays(offsets, 7)
 
-    def make_move(
-        self,
-        board: 'Board',
-        move: Move,
-        bookkeep: bool = True,
-    ) -> None:
-        super().make_move(board, move, bookkeep)
+    def make_move(self, board: 'Board', move: int) -> None:
+        super().make_move(board, move)
 
-        if bookkeep:
-            cr = board.castle_rights[self.color]
+        origin = move & 127
+        cr = board.castle_rights[self.color.index]
 
-            cr.kingside = cr.kingside and (
-                self.color.king_rook_index != move.origin
-            )
-            cr.queenside = cr.queenside and (
-                self.color.queen_rook_index != move.origin
-            )
+        cr.kingside = cr.kingside and (self.color.king_rook_index != origin)
+        cr.queenside = cr.queenside and (self.color.queen_rook_index != origin)
 
 
 class Queen(SlidingPiece):
+    __slots__ = ()
     char = 'q'
     offsets = [-11, -10, -9, -1, 1, 9, 10, 11]
+    rays = _make_rays(offsets, 7)
 
 
 class King(JumpingPiece):
+    __slots__ = ()
     char = 'k'
     offsets = [-11, -10, -9, -1, 1, 9, 10, 11]
+    rays = _make_rays(offsets, 1)
 
-    def get_legal_moves(self, board: 'Board', index: int) -> set[Move]:
-        legal_moves = super().get_legal_moves(board, index)
-        kingside = Move(self.color.king_index, self.color.king_index + 2)
-        queenside = Move(self.color.king_index, self.color.king_index - 2)
-
-        if board._is_square_under_attack(self.color.king_index, self.color):
-            legal_moves.discard(queenside)
-            legal_moves.discard(kingside)
+    def add_legal_moves(
+        self, board: 'Board', index: int, moves: list[int]
+    ) -> None:
+        self.add_masked_legal_moves(board, index, moves, None)
 
-        if board._is_square_under_attack(
-            self.color.king_index - 1, self.color
-        ):
-            legal_moves.discard(queenside)
-        if board._is_square_under_attack(
-            self.color.king_index + 1, self.color
-        ):
-            legal_moves.discard(kingside)
-        return legal_moves
+    def add_masked_legal_moves(
+        self,
+        board: 'Board',
+        index: int,
+        moves: list[int],
+        mask: set[int] | None,
+    ) -> None:
+        # king moves change the squares it has to be safe on, so the mask
+        # only limits where it may go and is never a check evasion
+        pseudolegal_moves: list[int] = []
+        self.add_pseudolegal_moves(board, index, pseudolegal_moves, mask)
+        for move in pseudolegal_moves:
+            dest = move >> 7
+            # castling may neither start in nor pass through check
+            if (
+                dest - index in (2, -2)
+                and index == self.color.king_index
+                and (
+                    board._is_square_under_attack(index, self.color)
+                    or board._is_square_under_attack(
+                        (index + dest) // 2, self.color
+                    )
+                )
+            ):
+                continue
+            board._push(move)
+            if not board._is_king_in_check(self.color):
+                moves.append(move)
+            board._pop()
 
-    def get_pseudolegal_moves(self, board: 'Board', index: int) -> set[Move]:
-        moves = super().get_pseudolegal_moves(board, index)
+    def add_pseudolegal_moves(
+        self,
+        board: 'Board',
+        index: int,
+        moves: list[int],
+        mask: set[int] | None = None,
+    ) -> None:
+        super().add_pseudolegal_moves(board, index, moves, mask)
 
-        cr = board.castle_rights[self.color]
+        cr = board.castle_rights[self.color.index]
 
         if index != self.color.king_index:
-            return moves
+            return
 
-        if cr.queenside and all(
-            isinstance(board[i], Empty)
-            for i in range(
-                self.color.queen_rook_index + 1, self.color.king_index
+        dest = self.color.king_index - 2
+        if (
+            cr.queenside
+            and all(
+                isinstance(board[i], Empty)
+                for i in range(
+                    self.color.queen_rook_index + 1, self.color.king_index
+                )
             )
+            and (mask is None or dest in mask)
         ):
-            moves.add(Move(index, self.color.king_index - 2))
-        if cr.kingside and all(
-            isinstance(board[i], Empty)
-            for i in range(
-                self.color.king_index + 1, self.color.king_rook_index
+            moves.append(pack_move(index, dest))
+        dest = self.color.king_index + 2
+        if (
+            cr.kingside
+            and all(
+                isinstance(board[i], Empty)
+                for i in range(
+                    self.color.king_index + 1, self.color.king_rook_index
+                )
             )
+            and (mask is None or dest in mask)
         ):
-            moves.add(Move(index, self.color.king_index + 2))
-        return moves
-
-    def make_move(
-        self,
-        board: 'Board',
-        move: Move,
-        bookkeep: bool = True,
-    ) -> None:
-        super().make_move(board, move, bookkeep)
-
-        if move.origin == self.color.king_index:
-            if move.dest == self.color.king_index + 2:
-                board[self.color.king_index + 1] = board[
-                    self.color.king_rook_index
-                ]
-                board[self.color.king_rook_index] = Empty()
-            elif move.dest == self.color.king_index - 2:
-                board[self.color.king_index - 1] = board[
-                    self.color.queen_rook_index
-                ]
-                board[self.color.queen_rook_index] = Empty()
-
-        if bookkeep:
-            cr = board.castle_rights[self.color]
-            cr.kingside = False
-            cr.queenside = False
+            moves.append(pack_move(index, dest))
+
+    def make_move(self, board: 'Board', move: int) -> None:
+        super().make_move(board, move)
+
+        origin = move & 127
+        dest = move >> 7 & 127
+        if origin == self.color.king_index:
+            if dest == self.color.king_index + 2:
+                board._put(
+                    self.color.king_index + 1,
+                    board[self.color.king_rook_index],
+                )
+                board._put(self.color.king_rook_index, EMPTY)
+            elif dest == self.color.king_index - 2:
+                board._put(
+                    self.color.king_index - 1,
+                    board[self.color.queen_rook_index],
+                )
+                board._put(self.color.queen_rook_index, EMPTY)
+
+        cr = board.castle_rights[self.color.index]
+        cr.kingside = False
+        cr.queenside = False
 
 
 class Empty(BoardEntity):
+    __slots__ = ()
     char = '.'
+    icon = '.'
 
 
 class Border(BoardEntity):
-    pass
+    __slots__ = ()
+
+
+# every empty square and every border square holds the same instance
+EMPTY = Empty()
+BORDER = Border()
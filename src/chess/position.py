@@ -0,0 +1,59 @@
+from typing import NamedTuple
+
+from .fen import (
+    CASTLE_RIGHTS,
+    decode_active_color,
+    decode_castle_rights,
+    decode_en_passant,
+    decode_fullmoves,
+    decode_halfmoves,
+    decode_placement,
+    encode_placement,
+    split,
+)
+from .util import index_to_square
+
+
+class Position(NamedTuple):
+    # 64 characters from a8 to h1, '.' for an empty square
+    squares: str
+    # 'w' or 'b'
+    active_color: str
+    # castle right bits as in chess.fen.CASTLE_RIGHTS
+    castle_rights: int
+    # board index of the en passant square, 0 if there is none
+    en_passant: int
+    halfmoves: int
+    fullmoves: int
+
+    @classmethod
+    def from_fen(cls, fen: str):
+        (
+            placement,
+            active_color,
+            castle_rights,
+            en_passant,
+            halfmoves,
+            fullmoves,
+        ) = split(fen)
+        return cls(
+            decode_placement(placement),
+            decode_active_color(active_color),
+            decode_castle_rights(castle_rights),
+            decode_en_passant(en_passant, active_color),
+            decode_halfmoves(halfmoves),
+            decode_fullmoves(fullmoves),
+        )
+
+    def fen(self) -> str:
+        en_passant = self.en_passant
+        return ' '.join(
+            [
+                encode_placement(self.squares),
+                self.active_color,
+                CASTLE_RIGHTS[self.castle_rights],
+                index_to_square(en_passant) if en_passant else '-',
+                str(self.halfmoves),
+                str(self.fullmoves),
+            ]
+        )
@@ -0,0 +1,229 @@
+import collections
+import contextlib
+import dataclasses
+import functools
+import threading
+import time
+from typing import Any, Callable, Iterator
+
+from . import pieces as p
+from .board import Board
+
+# Board._move is split into finding the legal moves to check the move
+# against and applying it
+PHASES = ['legal_moves', 'advance']
+
+_lock = threading.Lock()
+# the open collections, replaced rather than changed so the counting
+# methods can go through it without the lock
+_collectors: tuple['_Collector', ...] = ()
+_originals: list[tuple[type, str, Callable]] = []
+
+
+@dataclasses.dataclass
+class Stats:
+    # pseudolegal moves generated, by piece character
+    moves: collections.Counter[str] = dataclasses.field(
+        default_factory=collections.Counter
+    )
+    # is the king in check after the move, for legality and status
+    legality_probes: int = 0
+    # every square attack test, legality probes make one each as well
+    attack_queries: int = 0
+    with_move: int = 0
+    copies: int = 0
+    moves_played: int = 0
+    # seconds spent in every phase of Board._move
+    phases: dict[str, float] = dataclasses.field(
+        default_factory=lambda: dict.fromkeys(PHASES, 0.0)
+    )
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            'moves': dict(self.moves),
+            'legality_probes': self.legality_probes,
+            'attack_queries': self.attack_queries,
+            'with_move': self.with_move,
+            'copies': self.copies,
+            'moves_played': self.moves_played,
+            'phases': dict(self.phases),
+        }
+
+
+class _ThreadState(threading.local):
+    # whether a thread is inside a generator or a phase of Board._move
+    generating = False
+    phase: str | None = None
+
+
+_state = _ThreadState()
+
+
+class _Collector:
+    # the counts are shared by every thread and updated under a lock
+    def __init__(self, boards: tuple[Board, ...]) -> None:
+        self.stats = Stats()
+        self.boards = boards
+        self.lock = threading.Lock()
+
+    def add(self, name: str) -> None:
+        with self.lock:
+            setattr(self.stats, name, getattr(self.stats, name) + 1)
+
+    def add_moves(self, char: str, moves: int) -> None:
+        with self.lock:
+            self.stats.moves[char] += moves
+
+    def add_time(self, phase: str, seconds: float) -> None:
+        with self.lock:
+            self.stats.phases[phase] += seconds
+
+
+def _collecting(board: Board) -> list[_Collector]:
+    # collections without boards count the work of every board
+    return [
+        collector
+        for collector in _collectors
+        if not collector.boards
+        or any(board is other for other in collector.boards)
+    ]
+
+
+def _defining_class(Type: type, name: str) -> type:
+    for cls in Type.__mro__:
+        if name in cls.__dict__:
+            return cls
+    raise AttributeError(name)
+
+
+def _count_moves(method: Callable) -> Callable:
+    # a generator can call another one, king moves go through the one
+    # for every jumping piece, only the outermost call counts
+    @functools.wraps(method)
+    def wrapper(self, board, index, moves, *args, **kwargs):
+        if _state.generating:
+            return method(self, board, index, moves, *args, **kwargs)
+        _state.generating = True
+        before = len(moves)
+        try:
+            return method(self, board, index, moves, *args, **kwargs)
+        finally:
+            _state.generating = False
+            for collector in _collecting(board):
+                collector.add_moves(self.char, len(moves) - before)
+
+    return wrapper
+
+
+def _count(name: str, method: Callable) -> Callable:
+    @functools.wraps(method)
+    def wrapper(board, *args, **kwargs):
+        for collector in _collecting(board):
+            collector.add(name)
+        return method(board, *args, **kwargs)
+
+    return wrapper
+
+
+def _time_phase(phase: str, method: Callable) -> Callable:
+    # only the calls made by Board._move are timed
+    @functools.wraps(method)
+    def wrapper(board, *args, **kwargs):
+        if _state.phase != 'move':
+            return method(board, *args, **kwargs)
+        _state.phase = phase
+        start = time.perf_counter()
+        try:
+            return method(board, *args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            for collector in _collecting(board):
+                collector.add_time(phase, seconds)
+            _state.phase = 'move'
+
+    return wrapper
+
+
+def _time_move(method: Callable) -> Callable:
+    @functools.wraps(method)
+    def wrapper(board, *args, **kwargs):
+        for collector in _collecting(board):
+            collector.add('moves_played')
+        _state.phase = 'move'
+        try:
+            return method(board, *args, **kwargs)
+        finally:
+            _state.phase = None
+
+    return wrapper
+
+
+def _get_patches() -> list[tuple[type, str, Callable]]:
+    patches = []
+    generators = {
+        _defining_class(Type, 'add_pseudolegal_moves')
+        for Type in (p.Pawn, p.Knight, p.Bishop, p.Rook, p.Queen, p.King)
+    }
+    for cls in generators:
+        method = cls.__dict__['add_pseudolegal_moves']
+        patches.append((cls, 'add_pseudolegal_moves', _count_moves(method)))
+    # pawns skip add_pseudolegal_moves when the pins are known
+    method = p.Pawn.__dict__['add_masked_legal_moves']
+    patches.append((p.Pawn, 'add_masked_legal_moves', _count_moves(method)))
+
+    for name, counter in (
+        ('_is_king_in_check', 'legality_probes'),
+        ('_is_square_under_attack', 'attack_queries'),
+        ('_with_move', 'with_move'),
+        ('copy', 'copies'),
+    ):
+        patches.append((Board, name, _count(counter, Board.__dict__[name])))
+    patches.append(
+        (
+            Board,
+            '_get_legal_moves',
+            _time_phase('legal_moves', Board._get_legal_moves),
+        )
+    )
+    patches.append((Board, '_advance', _time_phase('advance', Board._advance)))
+    patches.append((Board, '_move', _time_move(Board._move)))
+    return patches
+
+
+def _install() -> None:
+    try:
+        for cls, name, wrapper in _get_patches():
+            _originals.append((cls, name, cls.__dict__[name]))
+            setattr(cls, name, wrapper)
+    except BaseException:
+        _uninstall()
+        raise
+
+
+def _uninstall() -> None:
+    while _originals:
+        cls, name, original = _originals.pop()
+        setattr(cls, name, original)
+
+
+@contextlib.contextmanager
+def collect(*boards: Board) -> Iterator[Stats]:
+    # the counting versions of the methods are only put in place while
+    # a collection is open, so boards pay nothing for this the rest of
+    # the time, collections can overlap and each one counts the work of
+    # the boards it is given, or of every board in every thread
+    global _collectors
+    collector = _Collector(boards)
+    with _lock:
+        if not _collectors:
+            _install()
+        _collectors = (*_collectors, collector)
+    try:
+        yield collector.stats
+    finally:
+        with _lock:
+            _collectors = tuple(
+                other for other in _collectors if other is not collector
+            )
+            if not _collectors:
+                _uninstall()
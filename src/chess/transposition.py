@@ -0,0 +1,140 @@
+import array
+from typing import Literal
+
+Replace = Literal['depth', 'always']
+
+
+class PerftTable:
+    # key (8 bytes) + nodes (8 bytes) + depth (1 byte)
+    ENTRY_SIZE = 17
+
+    def __init__(
+        self, size_mb: float = 16, replace: Replace = 'depth'
+    ) -> None:
+        # depth: buckets of two, the first slot keeps the deepest entry
+        # and the second one takes whatever does not beat it
+        # always: buckets of one that are overwritten on every store
+        self.replace = replace
+        self._bucket_size = 2 if replace == 'depth' else 1
+        entries = int(size_mb * 1024 * 1024) // self.ENTRY_SIZE
+        buckets = 1 << max(0, (entries // self._bucket_size).bit_length() - 1)
+        self._mask = buckets - 1
+        size = buckets * self._bucket_size
+        self._keys = array.array('Q', bytes(8 * size))
+        self._nodes = array.array('Q', bytes(8 * size))
+        # depth 0 marks an empty slot, perft never stores it
+        self._depths = array.array('B', bytes(size))
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def __len__(self) -> int:
+        return len(self._depths)
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self) * self.ENTRY_SIZE
+
+    def probe(self, key: int, depth: int) -> int | None:
+        slot = (key & self._mask) * self._bucket_size
+        for slot in range(slot, slot + self._bucket_size):
+            if self._keys[slot] == key and self._depths[slot] == depth:
+                self.hits += 1
+                return self._nodes[slot]
+        self.misses += 1
+        return None
+
+    def store(self, key: int, depth: int, nodes: int) -> None:
+        slot = (key & self._mask) * self._bucket_size
+        if self.replace == 'depth':
+            if depth < self._depths[slot]:
+                slot += 1
+            elif self._keys[slot] != key:
+                # the entry it beats moves down to the second slot,
+                # unless it is the same position that is overwritten
+                self._keys[slot + 1] = self._keys[slot]
+                self._nodes[slot + 1] = self._nodes[slot]
+                self._depths[slot + 1] = self._depths[slot]
+        self._keys[slot] = key
+        self._nodes[slot] = nodes
+        self._depths[slot] = depth
+        self.stores += 1
+
+    def clear(self) -> None:
+        size = len(self)
+        self._keys = array.array('Q', bytes(8 * size))
+        self._nodes = array.array('Q', bytes(8 * size))
+        self._depths = array.array('B', bytes(size))
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+
+# how a stored search score relates to the real one
+EXACT, LOWER, UPPER = range(3)
+
+
+class SearchTable:
+    # key (8 bytes) + move (4 bytes) + score (4 bytes)
+    # + depth (1 byte) + bound (1 byte)
+    ENTRY_SIZE = 18
+
+    def __init__(self, size_mb: float = 16) -> None:
+        # buckets of one, a new position replaces the old one but a
+        # shallower result never replaces a deeper one of the same position
+        entries = int(size_mb * 1024 * 1024) // self.ENTRY_SIZE
+        size = 1 << max(0, entries.bit_length() - 1)
+        self._mask = size - 1
+        self._keys = array.array('Q', bytes(8 * size))
+        self._moves = array.array('I', bytes(4 * size))
+        self._scores = array.array('i', bytes(4 * size))
+        self._depths = array.array('B', bytes(size))
+        self._bounds = array.array('B', bytes(size))
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self) * self.ENTRY_SIZE
+
+    def probe(self, key: int) -> tuple[int, int, int, int] | None:
+        # move, score, depth and bound of the position
+        slot = key & self._mask
+        if self._keys[slot] != key:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return (
+            self._moves[slot],
+            self._scores[slot],
+            self._depths[slot],
+            self._bounds[slot],
+        )
+
+    def store(
+        self, key: int, move: int, score: int, depth: int, bound: int
+    ) -> None:
+        slot = key & self._mask
+        if self._keys[slot] == key and self._depths[slot] > depth:
+            return
+        self._keys[slot] = key
+        self._moves[slot] = move
+        self._scores[slot] = score
+        self._depths[slot] = depth
+        self._bounds[slot] = bound
+        self.stores += 1
+
+    def clear(self) -> None:
+        size = len(self)
+        self._keys = array.array('Q', bytes(8 * size))
+        self._moves = array.array('I', bytes(4 * size))
+        self._scores = array.array('i', bytes(4 * size))
+        self._depths = array.array('B', bytes(size))
+        self._bounds = array.array('B', bytes(size))
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
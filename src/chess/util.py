@@ -21,6 +21,25 @@ def index_to_square(index: int) -> str:
     return f'{letter}{8 - row_something}'
 
 
+# board indices by square number, a1=0, b1=1, ..., h8=63 like bitboards
+# and polyglot books number the squares, and the other way round with -1
+# for the border
+SQUARE_TO_INDEX = [21 + sq % 8 + (7 - sq // 8) * 10 for sq in range(64)]
+INDEX_TO_SQUARE = [-1] * 120
+for _sq, _index in enumerate(SQUARE_TO_INDEX):
+    INDEX_TO_SQUARE[_index] = _sq
+
+
+# move generators pack a move into a single int
+# origin | dest << 7 | promotion << 14, board indices fit in 7 bits
+# and the promotion piece is an index into PROMOTIONS
+PROMOTIONS = ['', 'N', 'B', 'R', 'Q']
+
+
+def pack_move(origin: int, dest: int, promotion: int = 0) -> int:
+    return origin | dest << 7 | promotion << 14
+
+
 class Move(NamedTuple):
     origin: int
     dest: int
@@ -32,6 +51,11 @@ class Move(NamedTuple):
         uci = f'{from_square}{to_square}{self.promotion}'
         return f"{self.__class__.__name__}('{uci}')"
 
+    def uci(self) -> str:
+        from_square = index_to_square(self.origin)
+        to_square = index_to_square(self.dest)
+        return f'{from_square}{to_square}{self.promotion.lower()}'
+
     @classmethod
     def from_uci(cls, uci: str):
         if not 4 <= len(uci) <= 5:
@@ -41,8 +65,19 @@ class Move(NamedTuple):
         promotion = uci[4:5].upper()
         return cls(origin, dest, promotion)
 
+    def pack(self) -> int:
+        if self.promotion not in PROMOTIONS:
+            raise ValueError(f'not a promotion piece: {self.promotion}')
+        return pack_move(
+            self.origin, self.dest, PROMOTIONS.index(self.promotion)
+        )
+
+    @classmethod
+    def unpack(cls, move: int):
+        return cls(move & 127, move >> 7 & 127, PROMOTIONS[move >> 14])
+
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class CastleRights:
     kingside: bool
     queenside: bool
@@ -0,0 +1,20 @@
+import random
+
+# a fixed seed keeps keys stable across processes and runs,
+# so hashes can be stored or sent to other workers
+_random = random.Random(0x5A0B81)
+
+
+def _get_keys(amount: int) -> list[int]:
+    return [_random.getrandbits(64) for _ in range(amount)]
+
+
+PIECES = {
+    (char, color): _get_keys(120)
+    for color in ('WHITE', 'BLACK')
+    for char in 'pnbrqk'
+}
+# white kingside, white queenside, black kingside, black queenside
+CASTLE_RIGHTS = _get_keys(4)
+EN_PASSANT = [0, *_get_keys(119)]
+BLACK_TO_MOVE = _get_keys(1)[0]
@@ -29,6 +29,13 @@ async def game_ws(
     try:
         while True:
             data = await ws.receive_json()
-            await manager.move(ws, user, data)
+            if not isinstance(data, dict):
+                await manager.send_notification(ws, 'invalid message')
+            elif data.get('resync'):
+                # moves only send the squares they change, a client that
+                # lost track of the board asks for all of it
+                await manager.send_board(ws)
+            else:
+                await manager.move(ws, user, data)
     except WebSocketDisconnect:
         await manager.disconnect(ws)
@@ -0,0 +1,44 @@
+import argparse
+import itertools
+
+from chess.book import BookBuilder
+from chess.fen import STARTING_FEN
+from sqlalchemy.orm import Session
+
+from . import crud
+from . import models as m
+
+
+def build_book(db: Session, path: str, max_plies: int = 30) -> BookBuilder:
+    # games are stored as the fen after every move, they all start from
+    # the starting position, a game that did not is dropped by the builder
+    # at its first move
+    builder = BookBuilder(max_plies)
+    for _, moves in itertools.groupby(
+        crud.iter_moves_by_chess(db), key=lambda move: move.chess_id
+    ):
+        builder.add_game([STARTING_FEN, *(move.fen for move in moves)])
+    builder.write(path)
+    return builder
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog='python -m web.book',
+        description='build an opening book from the finished games',
+    )
+    parser.add_argument('path')
+    parser.add_argument(
+        '--plies',
+        type=int,
+        default=30,
+        help='number of plies of every game that go into the book',
+    )
+    args = parser.parse_args(argv)
+    with m.DBSession() as db:
+        builder = build_book(db, args.path, args.plies)
+    print(f'{builder.games} games written to {args.path}')
+
+
+if __name__ == '__main__':
+    main()
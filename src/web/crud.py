@@ -1,3 +1,5 @@
+from typing import Iterator
+
 from sqlalchemy import delete, select
 from sqlalchemy.orm import Session
 
@@ -58,3 +60,14 @@ def create_move(db: Session, chess_id: str, user_id: str, fen: str) -> m.Move:
     db.commit()
     db.refresh(move)
     return move
+
+
+def iter_moves_by_chess(db: Session) -> Iterator[m.Move]:
+    # every move of every game, grouped by game in the order played,
+    # rows are streamed so the table never has to fit in memory
+    stmt = (
+        select(m.Move)
+        .order_by(m.Move.chess_id, m.Move.move_id)
+        .execution_options(yield_per=1000)
+    )
+    return db.execute(stmt).scalars()
@@ -1,9 +1,10 @@
 from typing import Literal
 
+from chess.bitboard import BitBoard
 from chess.board import Board
-from chess.color import BLACK, WHITE
+from chess.color import BLACK, WHITE, Color
 from chess.exceptions import IllegalMoveError
-from chess.pieces import Border, Piece
+from chess.pieces import BoardEntity, Border, Piece
 from chess.util import index_to_square
 from fastapi import WebSocket
 
@@ -15,6 +16,9 @@ Mode = Literal['htmx', 'json']
 
 
 class ChessManager:
+    # either chess.board.Board or chess.bitboard.BitBoard
+    board_class: type[Board | BitBoard] = Board
+
     def __init__(self, chess_id: str) -> None:
         self.db = m.DBSession()
 
@@ -23,9 +27,14 @@ class ChessManager:
             raise ValueError
 
         self.chess = chess
-        self.board = Board(chess.fen)
+        self.board = self.board_class(chess.fen)
         self.connections: list[WebSocket] = []
         self.ws_mode: dict[WebSocket, Mode] = {}
+        # the piece type and colour of every square as of the last
+        # update, to tell which squares a move changed
+        self.squares: dict[int, tuple[type, Color | None]] = {}
+        self._json_board: dict[str, dict[str, str]] | None = None
+        self._htmx_board: str | None = None
 
         self.update_board_responses()
 
@@ -102,8 +111,10 @@ class ChessManager:
             self.db.close()
 
     async def broadcast_board(self) -> None:
+        # after a move only the squares it changed are sent, the whole
+        # board goes out on connect and when a client asks to resync
         for ws in self.connections:
-            await self.send_board(ws)
+            await self.send_patch(ws)
 
     async def send_board(self, ws: WebSocket) -> None:
         mode = self.ws_mode[ws]
@@ -117,6 +128,18 @@ class ChessManager:
                 """
             )
 
+    async def send_patch(self, ws: WebSocket) -> None:
+        mode = self.ws_mode[ws]
+        if mode == 'json':
+            await ws.send_json({'type': 'patch', 'data': self.json_patch})
+        elif mode == 'htmx':
+            await ws.send_text(
+                f"""
+                {self.htmx_patch}
+                <div id="notification"></div>
+                """
+            )
+
     async def broadcast_notification(self, text: str) -> None:
         for ws in self.connections:
             await self.send_notification(ws, text)
@@ -128,36 +151,71 @@ class ChessManager:
         elif mode == 'htmx':
             await ws.send_text(f'<div id="notification">{text}</div>')
 
+    @property
+    def json_board(self) -> dict[str, dict[str, str]]:
+        if self._json_board is None:
+            self._json_board = {
+                index_to_square(i): _render_json(piece)
+                for i, piece in enumerate(self.board)
+                if not isinstance(piece, Border)
+            }
+        return self._json_board
+
+    @property
+    def htmx_board(self) -> str:
+        if self._htmx_board is None:
+            self._htmx_board = ''.join(
+                _render_html(i, piece)
+                for i, piece in enumerate(self.board)
+                if not isinstance(piece, Border)
+            )
+        return self._htmx_board
+
     def update_board_responses(self) -> None:
-        json_board = {}
-        html_squares = []
-        square_is_white = False
+        # a move renders only the squares it changed, the whole board is
+        # rendered when a client connects or resyncs after it
+        json_patch = {}
+        html_patch = []
+        squares = {}
 
         for i, piece in enumerate(self.board):
             if isinstance(piece, Border):
                 continue
-
-            json_board[index_to_square(i)] = {
-                'piece': type(piece).__name__,
-                'color': piece.color.name if isinstance(piece, Piece) else '',
-            }
-
-            if i % 10 == 1:
-                square_is_white = not square_is_white
-
-            html_squares.append(
-                f"""
-                <div id="{i}"
-                  class="{'white' if square_is_white else 'black'}">
+            square = (
+                type(piece),
+                piece.color if isinstance(piece, Piece) else None,
+            )
+            squares[i] = square
+            if self.squares.get(i) != square:
+                json_patch[index_to_square(i)] = _render_json(piece)
+                html_patch.append(_render_html(i, piece, oob=True))
+
+        self.squares = squares
+        self.json_patch = json_patch
+        self.htmx_patch = ''.join(html_patch)
+        self._json_board = None
+        self._htmx_board = None
+
+
+def _render_json(piece: BoardEntity) -> dict[str, str]:
+    return {
+        'piece': type(piece).__name__,
+        'color': piece.color.name if isinstance(piece, Piece) else '',
+    }
+
+
+def _render_html(index: int, piece: BoardEntity, oob: bool = False) -> str:
+    # a8 is a white square, the colours alternate along rows and files,
+    # the ws extension swaps every element by its id anyway, the
+    # attribute keeps patches working outside of it
+    color = 'white' if (index // 10 + index % 10) % 2 else 'black'
+    swap = ' hx-swap-oob="true"' if oob else ''
+    return f"""
+                <div id="{index}"{swap}
+                  class="{color}">
                   {piece.icon}
                 </div>
                 """
-            )
-            square_is_white = not square_is_white
-
-        htmx_board = ''.join(html_squares)
-        self.htmx_board = htmx_board
-        self.json_board = json_board
 
 
 MANAGERS: dict[str, ChessManager] = {}
@@ -0,0 +1,61 @@
+import argparse
+import itertools
+import time
+from typing import Sequence, TextIO
+
+import ulid
+from chess.fen import STARTING_FEN
+from chess.pgn import Game, game_from_fens, write_game
+from sqlalchemy.orm import Session
+
+from . import crud
+from . import models as m
+
+
+def export_game(chess: m.Chess, moves: Sequence[m.Move]) -> Game:
+    # only the position after every move is stored, games are taken to
+    # start from the starting position like every game created here
+    headers = {
+        'Event': 'Casual game',
+        'Date': ulid.ULID.from_str(chess.chess_id).datetime.strftime(
+            '%Y.%m.%d'
+        ),
+        'White': chess.white_player.username if chess.white_player else '?',
+        'Black': chess.black_player.username if chess.black_player else '?',
+    }
+    return game_from_fens(
+        [STARTING_FEN, *(move.fen for move in moves)], headers
+    )
+
+
+def export_games(db: Session, f: TextIO) -> int:
+    # moves are streamed game by game, so only one game is ever in memory
+    games = 0
+    for _, group in itertools.groupby(
+        crud.iter_moves_by_chess(db), key=lambda move: move.chess_id
+    ):
+        moves = list(group)
+        write_game(f, export_game(moves[0].chess, moves))
+        games += 1
+    return games
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog='python -m web.pgn',
+        description='export every game as pgn',
+    )
+    parser.add_argument('path')
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    with m.DBSession() as db, open(args.path, 'w') as f:
+        games = export_games(db, f)
+    elapsed = time.perf_counter() - start
+    print(
+        f'{games} games written to {args.path} in {elapsed:.1f}s, '
+        f'{games / elapsed:.0f} games/s'
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+import random
+from typing import Iterator
+
+from chess.bitboard import BitBoard
+from chess.board import Board
+from chess.util import Move
+
+# https://www.chessprogramming.org/Perft_Results
+PERFT_FENS = [
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+    'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+    '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1',
+    'r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1',
+    'rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8',
+    'r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10',
+]
+
+
+def random_game(
+    board: Board | BitBoard, rng: random.Random, plies: int
+) -> Iterator[Move]:
+    # pushes up to plies random legal moves, yielding each one after it
+    # is pushed, the same rng state gives the same game every run
+    for _ in range(plies):
+        moves = sorted(board.legal_moves)
+        if not moves:
+            return
+        move = rng.choice(moves)
+        board.push(move)
+        yield move
@@ -0,0 +1,75 @@
+import random
+
+import pytest
+from chess.bitboard import BitBoard
+from chess.board import Board
+from chess.color import BLACK, WHITE
+from chess.util import square_to_index
+from conftest import PERFT_FENS, random_game
+
+np = pytest.importorskip('numpy')
+batch = pytest.importorskip('chess.batch')
+
+test_data = [
+    *PERFT_FENS,
+    'rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3',
+    'rnbqkbnr/ppp1pppp/8/8/3pP3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 3',
+    '4k3/8/8/8/8/8/4q3/4K3 w - - 0 1',
+    '4k3/1P6/8/8/8/8/8/4K3 w - - 0 1',
+]
+
+
+def random_fens(count: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    fens = []
+    while len(fens) < count:
+        board = BitBoard()
+        for _ in random_game(board, rng, rng.randrange(80)):
+            pass
+        fens.append(board.fen())
+    return fens
+
+
+def test_encoding():
+    positions = batch.Batch.from_fens(test_data[6:8])
+    assert positions.pieces.shape == (2, 64)
+    assert positions.pieces[0, 0] == batch.ROOK
+    assert positions.pieces[0, 60] == -batch.KING
+    assert positions.side.tolist() == [0, 1]
+    assert positions.castling.tolist() == [15, 15]
+    assert positions.en_passant.tolist() == [45, 20]
+    assert positions.fullmoves.tolist() == [3, 3]
+
+
+@pytest.mark.parametrize('fens', [test_data, random_fens(100, 0)])
+def test_attacks(fens: list[str]):
+    positions = batch.Batch.from_fens(fens)
+    attacks = [positions.attacks(0), positions.attacks(1)]
+    for i, fen in enumerate(fens):
+        board = Board(fen)
+        for color, opponent in ((WHITE, BLACK), (BLACK, WHITE)):
+            expected = [
+                # the square is attacked by the opponents of the colour
+                board._is_square_under_attack(
+                    square_to_index('abcdefgh'[sq % 8] + str(sq // 8 + 1)),
+                    opponent,
+                )
+                for sq in range(64)
+            ]
+            assert attacks[color.index][i].tolist() == expected, fen
+
+
+@pytest.mark.parametrize('fens', [test_data, random_fens(300, 1)])
+def test_analysis_matches_board(fens: list[str]):
+    analysis = batch.Batch.from_fens(fens).analyse()
+    assert analysis.in_check.shape == (len(fens),)
+    assert batch.mismatches(fens, analysis) == []
+
+
+def test_analysis():
+    analysis = batch.Batch.from_fens(test_data).analyse()
+    assert analysis.in_check.tolist()[8] is True
+    assert analysis.mobility[0] == 20
+    # four promotions and the king moves
+    assert analysis.mobility[9] == 4 + 5
+    assert analysis.material[0].tolist() == [39, 39]
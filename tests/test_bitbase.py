@@ -0,0 +1,86 @@
+from pathlib import Path
+
+import pytest
+from chess.bitbase import (
+    DRAW,
+    LOSS,
+    SIZE,
+    WIN,
+    Bitbases,
+    generate_all,
+    validate,
+)
+from chess.board import Board
+from chess.status import Checkmate
+
+
+@pytest.fixture(scope='module')
+def bitbases(tmp_path_factory: pytest.TempPathFactory):
+    directory = tmp_path_factory.mktemp('bitbases')
+    generate_all(directory)
+    with Bitbases(directory) as bitbases:
+        yield bitbases
+
+
+@pytest.mark.parametrize('char', ['q', 'r', 'p'])
+def test_validate(bitbases: Bitbases, char: str):
+    assert validate(bitbases, char, 300) == []
+
+
+@pytest.mark.parametrize(
+    'fen, result',
+    [
+        # the king in front of the pawn on the sixth row wins either way
+        ('4k3/8/4K3/4P3/8/8/8/8 w - - 0 1', WIN),
+        ('4k3/8/4K3/4P3/8/8/8/8 b - - 0 1', LOSS),
+        # opposition
+        ('8/8/8/4k3/8/4K3/4P3/8 w - - 0 1', DRAW),
+        ('8/8/8/4k3/8/4K3/4P3/8 b - - 0 1', LOSS),
+        ('8/8/8/8/8/4k3/4P3/4K3 w - - 0 1', DRAW),
+        # a rook pawn with the king in the corner
+        ('k7/8/8/8/8/8/P7/K7 w - - 0 1', DRAW),
+        # the same with black as the strong side
+        ('8/4p3/4k3/8/4K3/8/8/8 b - - 0 1', DRAW),
+        ('8/4p3/4k3/8/4K3/8/8/8 w - - 0 1', LOSS),
+        # the rook can be taken
+        ('8/8/8/8/8/4R3/3k4/K7 b - - 0 1', DRAW),
+        ('8/8/8/8/8/4R3/3k4/K7 w - - 0 1', WIN),
+        ('3k4/8/8/8/8/8/8/3K3R b - - 0 1', LOSS),
+        ('3k4/8/8/8/8/8/8/3K3Q b - - 0 1', LOSS),
+        # stalemate
+        ('k7/2Q5/1K6/8/8/8/8/8 b - - 0 1', DRAW),
+        # no mating material
+        ('k7/8/8/8/8/8/8/K7 w - - 0 1', DRAW),
+        ('k7/8/8/8/8/8/8/KN6 b - - 0 1', DRAW),
+    ],
+)
+def test_probe(bitbases: Bitbases, fen: str, result: int):
+    assert bitbases.probe(Board(fen)) == result
+
+
+def test_mate(bitbases: Bitbases):
+    board = Board('k7/2K5/8/8/8/8/8/R7 b - - 0 1')
+    assert isinstance(board.status, Checkmate)
+    assert bitbases.probe(board) == LOSS
+
+
+@pytest.mark.parametrize(
+    'fen',
+    [
+        # more pieces than the bitbases cover
+        'k7/8/8/8/8/8/8/KRR5 w - - 0 1',
+        'k7/p7/8/8/8/8/8/KR6 w - - 0 1',
+        # no king
+        '8/8/8/8/8/8/8/KR6 w - - 0 1',
+        # the side not to move is in check
+        'k7/8/8/8/8/8/8/RK6 w - - 0 1',
+    ],
+)
+def test_not_covered(bitbases: Bitbases, fen: str):
+    assert bitbases.probe(Board(fen)) is None
+
+
+def test_wrong_size(tmp_path: Path):
+    (tmp_path / 'kpk.bin').write_bytes(bytes(SIZE // 8))
+    with pytest.raises(ValueError):
+        Bitbases(tmp_path)
@@ -0,0 +1,148 @@
+import concurrent.futures
+import pickle
+import random
+from pathlib import Path
+
+import pytest
+from chess.board import Board
+from chess.book import (
+    ENTRY,
+    BookBuilder,
+    OpeningBook,
+    decode_move,
+    encode_move,
+)
+from chess.util import Move
+
+# fool's mate, black wins
+fools_mate = ['f2f3', 'e7e5', 'g2g4', 'd8h4']
+# scholar's mate, white wins
+scholars_mate = ['e2e4', 'e7e5', 'f1c4', 'b8c6', 'd1h5', 'g8f6', 'h5f7']
+
+
+def play(ucis: list[str], fen: str | None = None) -> list[str]:
+    board = Board(fen)
+    fens = [board.fen()]
+    for uci in ucis:
+        board.push(Move.from_uci(uci))
+        fens.append(board.fen())
+    return fens
+
+
+@pytest.fixture
+def book_path(tmp_path: Path) -> Path:
+    builder = BookBuilder()
+    assert builder.add_game(play(fools_mate))
+    assert builder.add_game(play(scholars_mate))
+    assert builder.add_game(play(scholars_mate))
+    # unfinished games are left out
+    assert not builder.add_game(play(['e2e4', 'c7c5']))
+    path = tmp_path / 'book.bin'
+    assert builder.write(path) == 6
+    return path
+
+
+@pytest.mark.parametrize(
+    'fen, uci, raw',
+    [
+        (
+            'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+            'e2e4',
+            0x31C,
+        ),
+        ('r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1', 'e1g1', 0x107),
+        ('r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1', 'e1c1', 0x100),
+        ('r3k2r/8/8/8/8/8/8/R3K2R b KQkq - 0 1', 'e8g8', 0xF3F),
+        ('4k3/1P6/8/8/8/8/8/4K3 w - - 0 1', 'b7b8q', 0x4C79),
+        ('4k3/1P6/8/8/8/8/8/4K3 w - - 0 1', 'b7b8n', 0x1C79),
+    ],
+)
+def test_move_encoding(fen: str, uci: str, raw: int):
+    board = Board(fen)
+    move = Move.from_uci(uci)
+    assert encode_move(board, move) == raw
+    assert decode_move(board, raw) == move
+
+
+def test_layout(book_path: Path):
+    data = book_path.read_bytes()
+    assert len(data) == 6 * ENTRY.size
+    keys = [ENTRY.unpack_from(data, i)[0] for i in range(0, len(data), 16)]
+    assert keys == sorted(keys)
+
+
+def test_find(book_path: Path):
+    with OpeningBook(book_path) as book:
+        assert len(book) == 6
+        board = Board()
+        # f2f3 lost, so only the winning moves are in the book
+        assert book.find(board) == [(Move.from_uci('e2e4'), 4, 0)]
+        board.push(Move.from_uci('f2f3'))
+        assert book.find(board) == [(Move.from_uci('e7e5'), 2, 0)]
+        board.push(Move.from_uci('e7e5'))
+        board.push(Move.from_uci('g2g4'))
+        assert book.choose(board) == Move.from_uci('d8h4')
+        board.push(Move.from_uci('d8h4'))
+        assert book.find(board) == []
+        assert book.choose(board) is None
+
+
+def test_max_plies(tmp_path: Path):
+    builder = BookBuilder(max_plies=2)
+    builder.add_game(play(scholars_mate))
+    assert builder.write(tmp_path / 'book.bin') == 1
+
+
+def test_other_start(tmp_path: Path):
+    # the first fen is where the game starts
+    fen = 'r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/8/PPPP1PPP/RNBQK1NR w KQkq - 2 3'
+    builder = BookBuilder()
+    builder.add_game(play(['d1h5', 'g8f6', 'h5f7'], fen))
+    builder.write(tmp_path / 'book.bin')
+    with OpeningBook(tmp_path / 'book.bin') as book:
+        assert book.find(Board(fen)) == [(Move.from_uci('d1h5'), 2, 0)]
+
+
+def test_empty_book(tmp_path: Path):
+    BookBuilder().write(tmp_path / 'book.bin')
+    with OpeningBook(tmp_path / 'book.bin') as book:
+        assert len(book) == 0
+        assert book.find(Board()) == []
+
+
+def test_broken_book(tmp_path: Path):
+    (tmp_path / 'book.bin').write_bytes(bytes(17))
+    with pytest.raises(ValueError):
+        OpeningBook(tmp_path / 'book.bin')
+
+
+def test_binary_search(tmp_path: Path):
+    rng = random.Random(0)
+    keys = sorted(rng.getrandbits(64) for _ in range(1000))
+    with open(tmp_path / 'book.bin', 'wb') as f:
+        for i, key in enumerate(keys):
+            for move in range(i % 3 + 1):
+                f.write(ENTRY.pack(key, move, i % 7, 0))
+    with OpeningBook(tmp_path / 'book.bin') as book:
+        for i, key in enumerate(keys):
+            assert book.probe(key) == [
+                (move, i % 7, 0) for move in range(i % 3 + 1)
+            ]
+        assert book.probe(keys[0] - 1) == []
+        assert book.probe(keys[-1] + 1) == []
+
+
+def _probe(book: OpeningBook) -> list[tuple[int, int, int]]:
+    return book.probe(Board().zobrist)
+
+
+def test_shared_between_workers(book_path: Path):
+    with OpeningBook(book_path) as book:
+        # only the path is pickled, every worker maps the file itself
+        assert len(pickle.dumps(book)) < 200
+        with concurrent.futures.ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(_probe, [book] * 100))
+        assert results == [book.probe(Board().zobrist)] * 100
+        with concurrent.futures.ProcessPoolExecutor(2) as executor:
+            results = list(executor.map(_probe, [book] * 4))
+        assert results == [book.probe(Board().zobrist)] * 4
@@ -0,0 +1,34 @@
+import pickle
+
+import chess.pieces as p
+from chess.board import Board
+from chess.color import BLACK, WHITE
+from chess.util import CastleRights, Move
+
+
+def test_shared_empty_and_border():
+    board = Board()
+    board.push(Move.from_uci('e2e4'))
+    for entity in board:
+        if isinstance(entity, p.Empty):
+            assert entity is p.EMPTY
+        elif isinstance(entity, p.Border):
+            assert entity is p.BORDER
+
+
+def test_no_instance_dict():
+    for entity in [
+        p.Pawn(WHITE),
+        p.King(BLACK),
+        p.EMPTY,
+        p.BORDER,
+        WHITE,
+        CastleRights(True, False),
+    ]:
+        assert not hasattr(entity, '__dict__')
+
+
+def test_colors_survive_pickling():
+    assert pickle.loads(pickle.dumps(WHITE)) is WHITE
+    assert pickle.loads(pickle.dumps(p.Rook(BLACK))).color is BLACK
+    assert [WHITE.index, BLACK.index] == [0, 1]
@@ -0,0 +1,156 @@
+import pytest
+from chess.board import Board
+from chess.engine import MATE, MATE_BOUND, Engine, main
+from chess.status import Checkmate
+from chess.transposition import EXACT, LOWER, SearchTable
+from chess.util import Move, square_to_index
+
+mate_in_one_data = [
+    (
+        'r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4',
+        'h5f7',
+    ),
+    ('6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1', 'a1a8'),
+    ('r5k1/8/8/8/8/8/5PPP/6K1 b - - 0 1', 'a8a1'),
+]
+
+
+@pytest.mark.parametrize('fen, uci', mate_in_one_data)
+def test_mate_in_one(fen: str, uci: str):
+    result = Engine().search(Board(fen), depth=3)
+    assert result.move == Move.from_uci(uci)
+    assert result.score == MATE - 1
+    assert result.mate == 1
+
+
+def test_mate_in_two():
+    # the rooks ladder the king to the edge
+    fen = '7k/8/8/8/8/8/R7/1R4K1 w - - 0 1'
+    result = Engine().search(Board(fen), depth=4)
+    assert result.score >= MATE_BOUND
+    assert result.mate == 2
+    board = Board(fen)
+    for move in result.pv:
+        assert move in board.legal_moves
+        board.push(move)
+    assert isinstance(board.status, Checkmate)
+
+
+def test_wins_material():
+    board = Board('4k3/8/8/3q4/8/8/3R4/4K3 w - - 0 1')
+    result = Engine().search(board, depth=2)
+    assert result.move == Move.from_uci('d2d5')
+    assert result.score >= 400
+
+
+def test_avoids_losing_material():
+    # the queen is attacked by a defended pawn and has to move
+    board = Board('4k3/8/3p4/4p3/3Q4/8/8/4K3 w - - 0 1')
+    result = Engine().search(board, depth=3)
+    assert result.move is not None
+    assert result.move.origin == square_to_index('d4')
+    assert result.move.dest != square_to_index('e5')
+    assert result.score >= 600
+
+
+@pytest.mark.parametrize(
+    'fen, score',
+    [
+        ('7k/5Q2/6K1/8/8/8/8/8 b - - 0 1', 0),
+        ('7k/6Q1/6K1/8/8/8/8/8 b - - 0 1', -MATE),
+    ],
+)
+def test_no_legal_moves(fen: str, score: int):
+    result = Engine().search(Board(fen), depth=3)
+    assert result.move is None
+    assert result.score == score
+    assert result.pv == []
+
+
+def test_pv_is_legal():
+    board = Board(
+        'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1'
+    )
+    result = Engine().search(board, depth=3)
+    assert result.depth == 3
+    assert result.pv[0] == result.move
+    for move in result.pv:
+        assert move in board.legal_moves
+        board.push(move)
+
+
+def test_node_limit():
+    board = Board()
+    fen = board.fen()
+    result = Engine().search(board, nodes=3000)
+    assert result.nodes <= 3000
+    assert result.move in board.legal_moves
+    # the board is back where it started
+    assert board.fen() == fen
+    assert board._undo_stack == []
+
+
+def test_time_limit():
+    board = Board(
+        'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1'
+    )
+    fen = board.fen()
+    result = Engine().search(board, time_limit=0.2)
+    assert result.elapsed < 0.3
+    assert result.move in board.legal_moves
+    assert board.fen() == fen
+
+
+def test_search_keeps_history():
+    board = Board()
+    board.push(Move.from_uci('e2e4'))
+    Engine().search(board, depth=2)
+    assert board.pop() == Move.from_uci('e2e4')
+
+
+def test_iterations():
+    results = []
+    Engine().search(Board(), depth=3, on_iteration=results.append)
+    assert [result.depth for result in results] == [1, 2, 3]
+    assert [result.nodes for result in results] == sorted(
+        result.nodes for result in results
+    )
+
+
+def test_needs_a_limit():
+    with pytest.raises(ValueError):
+        Engine().search(Board())
+
+
+@pytest.mark.parametrize(
+    'limit', [{'depth': 0}, {'time_limit': 0}, {'nodes': 0}]
+)
+def test_zero_limit(limit: dict[str, int]):
+    board = Board()
+    results = []
+    result = Engine().search(board, on_iteration=results.append, **limit)
+    assert result.move == Move.unpack(board._get_legal_moves()[0])
+    assert result.depth == 0
+    assert results == []
+
+
+def test_search_table():
+    table = SearchTable(0.001)
+    assert table.probe(12345) is None
+    table.store(12345, 678, -50, 4, LOWER)
+    assert table.probe(12345) == (678, -50, 4, LOWER)
+    # a shallower result does not replace a deeper one
+    table.store(12345, 999, 10, 2, EXACT)
+    assert table.probe(12345) == (678, -50, 4, LOWER)
+    table.store(12345, 999, 10, 5, EXACT)
+    assert table.probe(12345) == (999, 10, 5, EXACT)
+    assert (table.hits, table.misses, table.stores) == (3, 1, 2)
+    table.clear()
+    assert table.probe(12345) is None
+
+
+def test_main(capsys: pytest.CaptureFixture[str]):
+    main(['6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1', '--depth', '3'])
+    out = capsys.readouterr().out
+    assert 'score mate 1' in out
+    assert out.splitlines()[-1] == 'bestmove a1a8'
@@ -0,0 +1,92 @@
+import random
+
+import pytest
+from chess.board import Board
+from chess.evaluation import PIECE_SQUARES
+from chess.util import Move, square_to_index
+from conftest import PERFT_FENS, random_game
+
+
+@pytest.fixture(autouse=True)
+def debug_evaluation(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(Board, 'debug_evaluation', True)
+
+
+def test_starting_position():
+    board = Board()
+    assert board.evaluate() == 0
+    assert board._material == [4000, 4000]
+
+
+def test_side_to_move():
+    white = Board('4k3/8/8/8/8/8/8/3QK3 w - - 0 1')
+    black = Board('4k3/8/8/8/8/8/8/3QK3 b - - 0 1')
+    assert white.evaluate() == -black.evaluate()
+    assert white.evaluate() == 900 - 5
+
+
+def test_mirrored_positions():
+    board = Board('4k3/8/8/3n4/8/2B5/PP6/4K3 w - - 0 1')
+    mirrored = Board('4k3/pp6/2b5/8/3N4/8/8/4K3 b - - 0 1')
+    assert board.evaluate() == mirrored.evaluate()
+
+
+def test_piece_squares():
+    # a knight is better in the centre and a pawn near promotion
+    assert (
+        PIECE_SQUARES['N'][square_to_index('e4')]
+        > PIECE_SQUARES['N'][square_to_index('a1')]
+    )
+    assert PIECE_SQUARES['p'][square_to_index('e2')] == 50
+    assert PIECE_SQUARES['P'][square_to_index('e7')] == 50
+
+
+@pytest.mark.parametrize(
+    'fen, uci',
+    [
+        # promotion with a capture
+        (
+            'r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 b kq - 0 1',
+            'b2a1q',
+        ),
+        # en passant
+        (
+            'rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3',
+            'e5f6',
+        ),
+        # castling
+        ('r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1', 'e1c1'),
+        ('r3k2r/8/8/8/8/8/8/R3K2R b KQkq - 0 1', 'e8g8'),
+    ],
+)
+def test_special_moves(fen: str, uci: str):
+    board = Board(fen)
+    before = board.evaluate()
+    board.push(Move.from_uci(uci))
+    board.evaluate()
+    assert (board._material, board._piece_squares) == board._get_scores()
+    board.pop()
+    assert board.evaluate() == before
+
+
+@pytest.mark.parametrize('fen', PERFT_FENS)
+def test_random_games(fen: str):
+    board = Board(fen)
+    start = board.evaluate()
+    plies = 0
+    for _ in random_game(board, random.Random(fen), 60):
+        plies += 1
+        board.evaluate()
+        copy = board.copy()
+        assert copy.evaluate() == board.evaluate()
+    for _ in range(plies):
+        board._pop()
+        board.evaluate()
+    assert board.evaluate() == start
+
+
+def test_debug_evaluation():
+    board = Board()
+    board._material[0] += 1
+    with pytest.raises(AssertionError):
+        board.evaluate()
@@ -0,0 +1,56 @@
+import pytest
+from chess.bitboard import BitBoard
+from chess.board import Board
+from chess.exceptions import FENError
+from chess.fen import CASTLE_RIGHTS, decode_placement, encode_placement
+from chess.util import Move
+
+incorrect_fen_data = [
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBN w KQkq - 0 1',
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNRR w KQkq - 0 1',
+    'rnbqkbnr/pppppppp/9/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+    'rnbqkbnr/pppppppp/44/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP w KQkq - 0 1',
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNX w KQkq - 0 1',
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0',
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR x KQkq - 0 1',
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KKkq - 0 1',
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQxq - 0 1',
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq e4 0 1',
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq e3 0 1',
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq e9 0 1',
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - x 1',
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 0',
+]
+
+
+@pytest.mark.parametrize('Backend', [Board, BitBoard])
+@pytest.mark.parametrize('fen', incorrect_fen_data)
+def test_incorrect_fen(fen: str, Backend: type[Board | BitBoard]):
+    with pytest.raises(FENError):
+        Backend(fen)
+
+
+def test_placement_codec():
+    placement = 'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R'
+    squares = decode_placement(placement)
+    assert len(squares) == 64
+    assert squares[:8] == 'r...k..r'
+    assert encode_placement(squares) == placement
+    assert encode_placement('.' * 64) == '8/8/8/8/8/8/8/8'
+    assert CASTLE_RIGHTS[0] == '-'
+    assert CASTLE_RIGHTS[15] == 'KQkq'
+    assert CASTLE_RIGHTS[1 | 8] == 'Kq'
+
+
+@pytest.mark.parametrize('Backend', [Board, BitBoard])
+def test_fen_cache(Backend: type[Board | BitBoard]):
+    board = Backend()
+    fen = board.fen()
+    assert board.fen() is fen
+    board.push(Move.from_uci('e2e4'))
+    assert board.fen() == (
+        'rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1'
+    )
+    board.pop()
+    assert board.fen() == fen
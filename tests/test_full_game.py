@@ -1,62 +1,131 @@
+import pytest
+from chess.bitboard import BitBoard
 from chess.board import Board
-from chess.color import BLACK, WHITE
+from chess.color import WHITE
+from chess.exceptions import IllegalMoveError, NotAPieceError
 from chess.status import Checkmate
-from chess.util import CastleRights
+from chess.util import CastleRights, Move
 
+moves = [
+    'e2e4',
+    'd7d5',
+    'e4d5',
+    'd8d5',
+    'b1c3',
+    'd5d8',
+    'f1c4',
+    'g8f6',
+    'g1f3',
+    'c8g4',
+    'h2h3',
+    'g4f3',
+    'd1f3',
+    'e7e6',
+    'f3b7',
+    'b8d7',
+    'c3b5',
+    'a8c8',
+    'b5a7',
+    'd7b6',
+    'a7c8',
+    'b6c8',
+    'd2d4',
+    'c8d6',
+    'c4b5',
+    'd6b5',
+    'b7b5',
+    'f6d7',
+    'd4d5',
+    'e6d5',
+    'c1e3',
+    'f8d6',
+    'a1d1',
+    'd8f6',
+    'd1d5',
+    'f6g6',
+    'e3f4',
+    'd6f4',
+    'b5d7',
+    'e8f8',
+    'd7d8',
+]
 
-def test_full_game():
-    board = Board()
-    moves = [
-        'e2e4',
-        'd7d5',
-        'e4d5',
-        'd8d5',
-        'b1c3',
-        'd5d8',
-        'f1c4',
-        'g8f6',
-        'g1f3',
-        'c8g4',
-        'h2h3',
-        'g4f3',
-        'd1f3',
-        'e7e6',
-        'f3b7',
-        'b8d7',
-        'c3b5',
-        'a8c8',
-        'b5a7',
-        'd7b6',
-        'a7c8',
-        'b6c8',
-        'd2d4',
-        'c8d6',
-        'c4b5',
-        'd6b5',
-        'b7b5',
-        'f6d7',
-        'd4d5',
-        'e6d5',
-        'c1e3',
-        'f8d6',
-        'a1d1',
-        'd8f6',
-        'd1d5',
-        'f6g6',
-        'e3f4',
-        'd6f4',
-        'b5d7',
-        'e8f8',
-        'd7d8',
-    ]
-    for move in moves:
-        board.move_uci(move)
+
+def check_final_position(board: Board | BitBoard) -> None:
     # 3Q1k1r/2p2ppp/6q1/3R4/5b2/7P/PPP2PP1/4K2R b K - 2 21
     assert board.status == Checkmate(WHITE)
     assert board.halfmoves == 2
     assert board.fullmoves == 21
     assert board.en_passant == 0
-    assert board.castle_rights == {
-        WHITE: CastleRights(True, False),
-        BLACK: CastleRights(False, False),
-    }
+    assert board.castle_rights == [
+        CastleRights(True, False),
+        CastleRights(False, False),
+    ]
+
+
+@pytest.mark.parametrize('Backend', [Board, BitBoard])
+def test_full_game(Backend: type[Board | BitBoard]):
+    board = Backend()
+    for move in moves:
+        board.move_uci(move)
+    check_final_position(board)
+
+
+@pytest.mark.parametrize('trusted', [True, False])
+@pytest.mark.parametrize('Backend', [Board, BitBoard])
+def test_replay(Backend: type[Board | BitBoard], trusted: bool):
+    board = Backend()
+    board.replay([Move.from_uci(move) for move in moves], trusted)
+    assert board._legal_moves is None
+    check_final_position(board)
+    assert board.fen() == (
+        '3Q1k1r/2p2ppp/6q1/3R4/5b2/7P/PPP2PP1/4K2R b K - 2 21'
+    )
+
+
+def test_replay_matches_move_uci():
+    board = Board()
+    for move in moves:
+        board.move_uci(move)
+    replayed = Board()
+    replayed.replay(moves)
+    assert replayed.zobrist == board.zobrist
+    assert replayed._get_scores() == board._get_scores()
+    assert replayed._total_halfmoves == board._total_halfmoves
+
+
+@pytest.mark.parametrize('Backend', [Board, BitBoard])
+def test_replay_untrusted(Backend: type[Board | BitBoard]):
+    board = Backend()
+    with pytest.raises(IllegalMoveError):
+        board.replay(['e2e4', 'e7e5', 'e1e3'], trusted=False)
+
+
+@pytest.mark.parametrize('Backend', [Board, BitBoard])
+def test_replay_not_a_piece(Backend: type[Board | BitBoard]):
+    board = Backend()
+    with pytest.raises(NotAPieceError):
+        board.replay(['e3e4'])
+    assert board.fen() == Backend().fen()
+
+
+@pytest.mark.parametrize('Backend', [Board, BitBoard])
+def test_replay_fails_part_way(Backend: type[Board | BitBoard]):
+    board = Backend()
+    # fill the caches of the starting position
+    board.legal_moves
+    with pytest.raises(NotAPieceError):
+        board.replay(['e2e4', 'e3e5'])
+    assert board.active_color != WHITE
+    board.move_uci('e7e5')
+
+
+@pytest.mark.parametrize('Backend', [Board, BitBoard])
+def test_replay_missing_promotion(Backend: type[Board | BitBoard]):
+    board = Backend('4k3/P7/8/8/8/8/8/4K3 w - - 0 1')
+    fen = board.fen()
+    with pytest.raises(IllegalMoveError):
+        board.replay(['a7a8'])
+    assert board.fen() == fen
+    board.replay(['a7a8q'])
+    assert board.fen() == 'Q3k3/8/8/8/8/8/8/4K3 b - - 0 1'
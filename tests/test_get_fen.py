@@ -1,4 +1,5 @@
 import pytest
+from chess.bitboard import BitBoard
 from chess.board import Board
 
 test_data = {
@@ -117,7 +118,8 @@ test_data = {
 }
 
 
+@pytest.mark.parametrize('Backend', [Board, BitBoard])
 @pytest.mark.parametrize('fen', test_data)
-def test_get_fen(fen: str):
-    board = Board(fen)
+def test_get_fen(fen: str, Backend: type[Board | BitBoard]):
+    board = Backend(fen)
     assert board.fen() == fen
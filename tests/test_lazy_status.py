@@ -0,0 +1,47 @@
+import pytest
+from chess.bitboard import BitBoard
+from chess.board import Board
+from chess.color import WHITE
+from chess.status import Checkmate, Ongoing, Stalemate
+
+test_data = [
+    ('rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1', Ongoing()),
+    ('3Q1k1r/2p2ppp/6q1/3R4/5b2/7P/PPP2PP1/4K2R b K - 2 21', Checkmate(WHITE)),
+    ('7k/5Q2/6K1/8/8/8/8/8 b - - 0 1', Stalemate()),
+]
+
+
+@pytest.mark.parametrize('Backend', [Board, BitBoard])
+@pytest.mark.parametrize('fen, expected', test_data)
+def test_lazy_status(fen: str, expected, Backend: type[Board | BitBoard]):
+    board = Backend(fen)
+    assert board._legal_moves is None
+    assert board.status == expected
+    assert board.has_legal_move() == bool(board.legal_moves)
+
+
+@pytest.mark.parametrize('Backend', [Board, BitBoard])
+def test_moves_invalidate_cache(Backend: type[Board | BitBoard]):
+    board = Backend()
+    moves = board.legal_moves
+    board.move_uci('e2e4')
+    assert board._legal_moves is None
+    assert board._status is None
+    assert board.legal_moves != moves
+    assert board.status == Ongoing()
+
+
+def test_bitboard_status_fills_cache(monkeypatch: pytest.MonkeyPatch):
+    board = BitBoard()
+    calls = []
+    generate = board._generate
+
+    def counting_generate() -> list[int]:
+        calls.append(board.fen())
+        return generate()
+
+    # the status and the move it is checked for share one generation
+    monkeypatch.setattr(board, '_generate', counting_generate)
+    assert board.status == Ongoing()
+    board.move_uci('e2e4')
+    assert len(calls) == 1
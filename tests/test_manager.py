@@ -0,0 +1,111 @@
+import asyncio
+import importlib
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+fastapi = pytest.importorskip('fastapi')
+sqlalchemy = pytest.importorskip('sqlalchemy')
+orm = pytest.importorskip('sqlalchemy.orm')
+
+
+class FakeWebSocket:
+    def __init__(self, messages: list[Any] | None = None) -> None:
+        self.messages = messages or []
+        self.sent: list[Any] = []
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_json(self, data: Any) -> None:
+        self.sent.append(data)
+
+    async def send_text(self, text: str) -> None:
+        self.sent.append(text)
+
+    async def receive_json(self) -> Any:
+        if not self.messages:
+            raise fastapi.WebSocketDisconnect()
+        return self.messages.pop(0)
+
+
+@pytest.fixture
+def web(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    # the app finds its files and creates its database in the working
+    # directory, the database of the tests is kept out of the repository
+    root = Path(__file__).parent.parent
+    for name in ('static', 'templates'):
+        (tmp_path / name).symlink_to(root / name)
+    monkeypatch.chdir(tmp_path)
+    m = importlib.import_module('web.models')
+    engine = sqlalchemy.create_engine(f'sqlite:///{tmp_path / "test.db"}')
+    m._Base.metadata.create_all(engine)
+    monkeypatch.setattr(m, 'DBSession', orm.sessionmaker(engine))
+    return m
+
+
+def make_game(web) -> tuple[str, Any, Any]:
+    crud = importlib.import_module('web.crud')
+    with web.DBSession(expire_on_commit=False) as db:
+        white = crud.create_user(db, 'white', 'password')
+        black = crud.create_user(db, 'black', 'password')
+        chess = crud.create_chess(db)
+    return chess.chess_id, white, black
+
+
+def test_patch_after_move(web):
+    manager_module = importlib.import_module('web.manager')
+    chess_id, white, black = make_game(web)
+    manager = manager_module.ChessManager(chess_id)
+    player = FakeWebSocket()
+    spectator = FakeWebSocket()
+
+    async def play() -> None:
+        await manager.connect(player, white, 'json')
+        await manager.connect(spectator, None, 'htmx')
+        await manager.move(player, white, {'move': 'e2e4'})
+
+    asyncio.run(play())
+    board, patch = player.sent
+    assert board['type'] == 'board'
+    assert len(board['data']) == 64
+    assert patch == {
+        'type': 'patch',
+        'data': {
+            'e4': {'piece': 'Pawn', 'color': 'WHITE'},
+            'e2': {'piece': 'Empty', 'color': ''},
+        },
+    }
+    # the whole board is only rendered for the next client that needs it
+    assert manager._json_board is None
+    assert manager._htmx_board is None
+    # the patch brings the board up to date
+    assert {**board['data'], **patch['data']} == manager.json_board
+
+    html_board, html_patch = spectator.sent
+    assert html_board.count('<div id=') == 64 + 2
+    assert html_patch.count('hx-swap-oob="true"') == 2
+    assert '<div id="65" hx-swap-oob="true"' in html_patch
+    assert '<div id="85" hx-swap-oob="true"' in html_patch
+    assert '<div id="notification"></div>' in html_patch
+    assert 'id="board"' not in html_patch
+
+
+def test_resync(web):
+    api = importlib.import_module('web.api')
+    chess_id, white, _ = make_game(web)
+    ws = FakeWebSocket([{'move': 'e2e4'}, {'resync': True}, ['e7e5'], 'e5'])
+    asyncio.run(api.game_ws(chess_id, ws, 'json', white))
+
+    board, patch, resync, *notifications = ws.sent
+    assert board['type'] == resync['type'] == 'board'
+    assert patch['type'] == 'patch'
+    assert resync['data'] == {**board['data'], **patch['data']}
+    assert resync['data']['e4'] == {'piece': 'Pawn', 'color': 'WHITE'}
+    assert (
+        notifications
+        == [{'type': 'notification', 'data': 'invalid message'}] * 2
+    )
+    # the last connection closed the game
+    assert chess_id not in api.MANAGERS
@@ -1,73 +1,197 @@
-import copy
+import collections
+import functools
+from typing import Callable
 
 import pytest
+from chess.bitboard import BitBoard
 from chess.board import Board
-from chess.pieces import Piece
-
-
-def get_number_of_moves(board: Board, depth: int):
-    legal = set()
-    for i, piece in enumerate(board._board):
-        if isinstance(piece, Piece) and piece.color == board.active_color:
-            legal.update(board._get_legal_moves_by_index(i))
-    if depth == 1:
-        return len(legal)
-
-    sum = 0
-    for move in legal:
-        new_board = copy.deepcopy(board)
-        new_board._COLORS = board._COLORS
-        new_board._total_halfmoves += 1
-        new_board.active_color = new_board._COLORS[
-            new_board._total_halfmoves % len(new_board._COLORS)
-        ]
-        new_board._move_raw(move)
-        res = get_number_of_moves(new_board, depth - 1)
-        sum += res
-    return sum
+from chess.perft import divide_parallel, main
+from chess.transposition import PerftTable
+from chess.util import Move
+
+Backend = Callable[..., Board | BitBoard]
+
+
+@pytest.fixture(
+    params=[
+        functools.partial(Board, movegen='pins'),
+        functools.partial(Board, movegen='probe'),
+        BitBoard,
+    ],
+    ids=['Board-pins', 'Board-probe', 'BitBoard'],
+)
+def backend(request: pytest.FixtureRequest) -> Backend:
+    return request.param
 
 
 # https://www.chessprogramming.org/Perft_Results
 
 
 @pytest.mark.perft
-def test_perft():
-    board = Board()
-    assert get_number_of_moves(board, 4) == 197281
+def test_perft(backend: Backend):
+    board = backend()
+    assert board.perft(4) == 197281
 
 
 @pytest.mark.perft
-def test_another_perft2():
-    board = Board(
+def test_another_perft2(backend: Backend):
+    board = backend(
         'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1'
     )
-    assert get_number_of_moves(board, 3) == 97862
+    assert board.perft(3) == 97862
 
 
 @pytest.mark.perft
-def test_another_perft3():
-    board = Board('8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1')
-    assert get_number_of_moves(board, 4) == 43238
+def test_another_perft3(backend: Backend):
+    board = backend('8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1')
+    assert board.perft(4) == 43238
 
 
 @pytest.mark.perft
-def test_another_perft4():
-    board = Board(
+def test_another_perft4(backend: Backend):
+    board = backend(
         'r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1'
     )
-    assert get_number_of_moves(board, 3) == 9467
+    assert board.perft(3) == 9467
 
 
 @pytest.mark.perft
-def test_another_perft5():
-    board = Board('rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8')
-    assert get_number_of_moves(board, 3) == 62379
+def test_another_perft5(backend: Backend):
+    board = backend(
+        'rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8'
+    )
+    assert board.perft(3) == 62379
 
 
 @pytest.mark.perft
-def test_another_perft6():
-    board = Board(
+def test_another_perft6(backend: Backend):
+    board = backend(
         'r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1'
         ' w - - 0 10'
     )
-    assert get_number_of_moves(board, 3) == 89890
+    assert board.perft(3) == 89890
+
+
+def test_divide(backend: Backend):
+    board = backend()
+    nodes = board.divide(3)
+    assert len(nodes) == 20
+    assert nodes[Move.from_uci('e2e4')] == 600
+    assert sum(nodes.values()) == board.perft(3) == 8902
+
+
+def test_divide_zero(backend: Backend):
+    board = backend()
+    assert board.perft(0) == 1
+    assert board.divide(0) == dict.fromkeys(board.legal_moves, 1)
+
+
+@pytest.mark.perft
+@pytest.mark.parametrize('replace', ['depth', 'always'])
+@pytest.mark.parametrize(
+    'fen, depth, nodes',
+    [
+        (
+            'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+            4,
+            197281,
+        ),
+        (
+            'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R'
+            ' w KQkq - 0 1',
+            3,
+            97862,
+        ),
+        ('8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1', 4, 43238),
+        (
+            'r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1',
+            3,
+            9467,
+        ),
+        (
+            'rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8',
+            3,
+            62379,
+        ),
+        (
+            'r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1'
+            ' w - - 0 10',
+            3,
+            89890,
+        ),
+    ],
+)
+def test_perft_with_table(fen: str, depth: int, nodes: int, replace: str):
+    # a tiny table forces plenty of collisions and replacements
+    table = PerftTable(0.001, replace)
+    board = Board(fen)
+    assert board.perft(depth, table) == nodes
+    assert table.stores
+    # the second run is answered from the table
+    assert board.perft(depth, table) == nodes
+
+
+def test_perft_table():
+    table = PerftTable(0.001)
+    assert len(table) == 32
+    assert table.probe(5, 2) is None
+    table.store(5, 2, 400)
+    assert table.probe(5, 2) == 400
+    assert table.probe(5, 3) is None
+    assert table.probe(5 + 16, 2) is None
+    # a shallower entry does not push out the deeper one
+    table.store(5 + 16, 1, 20)
+    table.store(5 + 32, 1, 20)
+    assert table.probe(5, 2) == 400
+    assert table.probe(5 + 32, 1) == 20
+    assert (table.hits, table.misses, table.stores) == (3, 3, 3)
+    # the same position again does not take both slots of its bucket
+    table.store(5, 3, 8902)
+    assert table.probe(5, 3) == 8902
+    assert table.probe(5 + 32, 1) == 20
+    table.clear()
+    assert table.probe(5, 2) is None
+
+
+@pytest.mark.parametrize('depth', [1, 3, 4])
+def test_divide_parallel(depth: int):
+    board = BitBoard(
+        'r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1'
+    )
+    assert divide_parallel(board, depth, 2) == board.divide(depth)
+
+
+def test_divide_parallel_counts():
+    counts: collections.Counter[str] = collections.Counter()
+    # the subtrees are deep enough to reach the same positions
+    board = Board('8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1')
+    nodes = divide_parallel(board, 5, 2, 1, counts=counts)
+    assert sum(nodes.values()) == 674624
+    assert counts['hits'] > 0
+    assert counts['misses'] > 0
+    assert counts['stores'] == counts['misses']
+
+
+def test_perft_cli(capsys: pytest.CaptureFixture[str]):
+    main(['2', '--backend', 'bitboard'])
+    out = capsys.readouterr().out
+    assert 'e2e4: 20' in out
+    assert 'nodes: 400' in out
+    assert 'nps: ' in out
+
+    main(['3', '--jobs', '2'])
+    assert 'nodes: 8902' in capsys.readouterr().out
+
+    main(['3', '--hash', '1'])
+    out = capsys.readouterr().out
+    assert 'nodes: 8902' in out
+    assert 'hash: ' in out
+
+    main(['3', '--jobs', '2', '--hash', '1', '--replace', 'always'])
+    out = capsys.readouterr().out
+    assert 'nodes: 8902' in out
+    assert 'hash: ' in out
+    assert '2 tables of 1.0MB' in out
+
+    with pytest.raises(SystemExit):
+        main(['3', '--backend', 'bitboard', '--hash', '1'])
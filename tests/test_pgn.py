@@ -0,0 +1,217 @@
+import io
+import random
+
+import pytest
+from chess.board import Board
+from chess.exceptions import IllegalMoveError, SANError
+from chess.fen import STARTING_FEN
+from chess.pgn import (
+    Game,
+    game_from_fens,
+    parse_san,
+    read_games,
+    to_san,
+    write_game,
+)
+from chess.util import Move
+from conftest import PERFT_FENS, random_game
+
+scholars_mate = """[Event "Casual game"]
+[Site "?"]
+[Date "2024.01.01"]
+[Round "1"]
+[White "Alice \\"A\\""]
+[Black "Bob"]
+[Result "1-0"]
+
+1. e4 e5 2. Bc4 {a comment
+that goes on} 2... Nc6 (2... Nf6 3. d4) 3. Qh5!? Nf6?? $4 4. Qxf7# 1-0
+"""
+
+
+@pytest.mark.parametrize(
+    'fen, san, uci',
+    [
+        (STARTING_FEN, 'e4', 'e2e4'),
+        (STARTING_FEN, 'Nf3', 'g1f3'),
+        ('r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1', 'O-O', 'e1g1'),
+        ('r3k2r/8/8/8/8/8/8/R3K2R b KQkq - 0 1', 'O-O-O', 'e8c8'),
+        # rooks on the same row and on the same column
+        ('4k3/8/8/8/8/8/4K3/R6R w - - 0 1', 'Rad1', 'a1d1'),
+        ('4k3/R7/8/8/8/8/8/R3K3 w - - 0 1', 'R1a4', 'a1a4'),
+        # three queens that need the whole square
+        ('4k3/8/8/8/8/Q1Q5/8/Q3K3 w - - 0 1', 'Qa3b2', 'a3b2'),
+        ('4k3/1P6/8/8/8/8/8/4K3 w - - 0 1', 'b8=Q+', 'b7b8q'),
+        ('4k3/1P6/8/8/8/8/8/4K3 w - - 0 1', 'b8=N', 'b7b8n'),
+        ('4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1', 'exd6', 'e5d6'),
+        (
+            'rnbqkbnr/pppp1ppp/8/4p3/2B1P3/5Q2/PPPP1PPP/RNB1K1NR w KQkq - 0 1',
+            'Qxf7#',
+            'f3f7',
+        ),
+    ],
+)
+def test_san(fen: str, san: str, uci: str):
+    board = Board(fen)
+    move = Move.from_uci(uci)
+    assert parse_san(board, san) == move
+    assert to_san(board, move) == san
+
+
+@pytest.mark.parametrize(
+    'san, error',
+    [
+        ('e5', IllegalMoveError),
+        ('Ke2', IllegalMoveError),
+        ('O-O', IllegalMoveError),
+        ('Nd2', SANError),
+        ('Xe4', SANError),
+        ('e9', SANError),
+    ],
+)
+def test_bad_san(san: str, error: type):
+    # the knights on b1 and f3 can both go to d2
+    board = Board('rnbqkbnr/pppppppp/8/8/8/5N2/PPP1PPPP/RNBQKB1R w KQkq - 0 1')
+    with pytest.raises(error):
+        parse_san(board, san)
+
+
+def test_read_game():
+    [game] = read_games(io.StringIO(scholars_mate))
+    assert game.error is None
+    assert game.headers['White'] == 'Alice "A"'
+    assert game.headers['Result'] == '1-0'
+    assert [move.uci() for move in game.moves] == [
+        'e2e4',
+        'e7e5',
+        'f1c4',
+        'b8c6',
+        'd1h5',
+        'g8f6',
+        'h5f7',
+    ]
+
+
+def test_read_many_games():
+    pgn = """% an escaped line
+[Event "one"]
+1.d4 d5 ; the rest of the line is a comment 1-0
+2.c4 *
+
+[Event "two"]
+[SetUp "1"]
+[FEN "4k3/8/8/8/8/8/8/R3K3 w Q - 0 1"]
+
+1. O-O-O Kf7 1/2-1/2
+[Event "three"]
+1. e4
+[Event "four"]
+1. e4 e5 2. Ke3 Nc6 0-1
+1. f3 e5 2. g4 Qh4#"""
+    games = list(read_games(io.StringIO(pgn)))
+    assert [game.headers.get('Event') for game in games] == [
+        'one',
+        'two',
+        'three',
+        'four',
+        None,
+    ]
+    assert [len(game.moves) for game in games] == [3, 2, 1, 2, 4]
+    assert games[0].headers['Result'] == '*'
+    assert games[1].moves[0] == Move.from_uci('e1c1')
+    # the game has no result, the next one starts with its tags
+    assert 'Result' not in games[2].headers
+    assert games[3].error == 'move is not legal: Ke3'
+    assert games[4].error is None
+
+
+def test_read_bad_fen():
+    # the game without a result ends where the tags of the next one start
+    pgn = """[Event "a"]
+[FEN "bad fen"]
+
+1. e4
+
+[Event "b"]
+
+1. d4 *"""
+    first, second = read_games(io.StringIO(pgn))
+    assert first.headers == {'Event': 'a', 'FEN': 'bad fen'}
+    assert first.moves == []
+    assert first.error is not None
+    assert second.headers == {'Event': 'b', 'Result': '*'}
+    assert second.moves == [Move.from_uci('d2d4')]
+    assert second.error is None
+
+
+def test_read_zero_castling():
+    pgn = """1. e4 e5 2. Nf3 Nc6 3. Bc4 Bc5 4. 0-0 Nf6 5. d3 d6 6. Bg5 h6
+7. Bh4 Bg4 8. c3 Qd7 9. b4 0-0-0 *"""
+    [game] = read_games(io.StringIO(pgn))
+    assert game.error is None
+    assert len(game.moves) == 18
+    assert game.moves[6] == Move.from_uci('e1g1')
+    assert game.moves[17] == Move.from_uci('e8c8')
+
+
+def test_streaming():
+    # only as much of the input as the next game needs is read
+    def lines():
+        yield from scholars_mate.splitlines(keepends=True)
+        raise AssertionError('read too far')
+
+    games = read_games(lines())
+    assert len(next(games).moves) == 7
+
+
+def test_write_game():
+    [game] = read_games(io.StringIO(scholars_mate))
+    f = io.StringIO()
+    write_game(f, game)
+    assert f.getvalue() == (
+        scholars_mate.split('\n\n')[0]
+        + '\n\n1. e4 e5 2. Bc4 Nc6 3. Qh5 Nf6 4. Qxf7# 1-0\n\n'
+    )
+
+
+def test_write_tags():
+    f = io.StringIO()
+    write_game(f, Game({'Annotator': 'me', 'Black': 'Bob'}, []))
+    assert f.getvalue() == (
+        '[Event "?"]\n[Site "?"]\n[Date "?"]\n[Round "?"]\n'
+        '[White "?"]\n[Black "Bob"]\n[Result "*"]\n[Annotator "me"]\n\n*\n\n'
+    )
+
+
+@pytest.mark.parametrize('fen', PERFT_FENS)
+def test_round_trip(fen: str):
+    board = Board(fen)
+    fens = [fen]
+    for _ in random_game(board, random.Random(fen), 150):
+        fens.append(board.fen())
+    game = game_from_fens(fens, {'Event': 'random'})
+    assert game.error is None
+    assert len(game.moves) == len(fens) - 1
+
+    f = io.StringIO()
+    write_game(f, game)
+    # tag pairs cannot be split, so only the movetext is wrapped
+    assert all(
+        len(line) <= 79
+        for line in f.getvalue().splitlines()
+        if not line.startswith('[')
+    )
+    f.seek(0)
+    [read] = read_games(f)
+    assert read.moves == game.moves
+    assert read.headers.get('FEN') == game.headers.get('FEN')
+    assert read.headers['Result'] == game.headers['Result']
+
+
+def test_game_from_fens():
+    game = game_from_fens(
+        [STARTING_FEN, 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w - - 0 1']
+    )
+    assert game.moves == []
+    assert game.error is not None
+    assert game.headers == {'Result': '*'}
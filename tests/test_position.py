@@ -0,0 +1,62 @@
+import pickle
+
+import pytest
+from chess.bitboard import BitBoard
+from chess.board import Board
+from chess.position import Position
+from chess.util import Move
+
+test_data = [
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+    'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+    'rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3',
+    '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 b - - 12 40',
+]
+
+
+@pytest.mark.parametrize('Backend', [Board, BitBoard])
+@pytest.mark.parametrize('fen', test_data)
+def test_position_round_trip(fen: str, Backend: type[Board | BitBoard]):
+    position = Backend(fen).position()
+    assert position == Position.from_fen(fen)
+    assert position.fen() == fen
+    assert pickle.loads(pickle.dumps(position)) == position
+    assert hash(position) == hash(Position.from_fen(fen))
+    board = Backend.from_position(position)
+    assert board.fen() == fen
+    assert board.legal_moves == Backend(fen).legal_moves
+
+
+@pytest.mark.parametrize('Backend', [Board, BitBoard])
+@pytest.mark.parametrize('fen', test_data)
+def test_copy(fen: str, Backend: type[Board | BitBoard]):
+    board = Backend(fen)
+    board.legal_moves
+    copy = board.copy()
+    assert copy.position() == board.position()
+    assert copy.legal_moves == board.legal_moves
+    # play a few plies on the copy only
+    for _ in range(4):
+        moves = sorted(copy.legal_moves)
+        if not moves:
+            break
+        copy.push(moves[-1])
+    assert copy.fen() != fen
+    assert board.fen() == fen
+    assert board.position() == Position.from_fen(fen)
+    assert board.legal_moves == Backend(fen).legal_moves
+
+
+def test_copy_keeps_zobrist_and_index():
+    board = Board(test_data[1])
+    board.push(Move.from_uci('e5f7'))
+    copy = board.copy()
+    assert copy.zobrist == board.zobrist
+    copy.push(Move.from_uci('e8f7'))
+    assert copy._pieces != board._pieces
+    assert copy.zobrist == copy._get_zobrist()
+    assert board.zobrist == board._get_zobrist()
+    with pytest.raises(IndexError):
+        board.copy().pop()
+    assert board.pop() == Move.from_uci('e5f7')
+    assert board.fen() == test_data[1]
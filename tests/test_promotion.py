@@ -1,6 +1,5 @@
 import pytest
 from chess.board import Board
-from chess.color import BLACK, WHITE
 from chess.pieces import Bishop, Knight, Piece, Queen, Rook
 from chess.util import CastleRights, Move, square_to_index
 
@@ -16,12 +15,12 @@ test_data = [
 def test_promotion(move: str, expected: Piece):
     board = Board('8/PPPPPPPP/8/8/8/8/8/8 w - - 0 1')
     move_ = Move.from_uci(move)
-    board._move_raw(move_)
+    board._move_raw(move_.pack())
     assert board[move_.dest].__class__ == expected
 
 
 def make_castle_rights(K: bool, Q: bool, k: bool, q: bool):
-    return {WHITE: CastleRights(K, Q), BLACK: CastleRights(k, q)}
+    return [CastleRights(K, Q), CastleRights(k, q)]
 
 
 test_data = [
@@ -35,20 +34,20 @@ test_data = [
 
 
 @pytest.mark.parametrize('moves, expected', test_data)
-def test_castle_rights(moves: list[str], expected: dict[str, CastleRights]):
+def test_castle_rights(moves: list[str], expected: list[CastleRights]):
     board = Board('r3k2r/pppppppp/8/8/8/8/PPPPPPPP/R3K2R w KQkq - 0 1')
     for move in moves:
-        board._move_raw(Move.from_uci(move))
+        board._move_raw(Move.from_uci(move).pack())
     assert board.castle_rights == expected
 
 
 def test_en_passant_index():
     board = Board()
-    board._move_raw(Move.from_uci('a2a4'))
+    board._move_raw(Move.from_uci('a2a4').pack())
     assert board.en_passant == square_to_index('a3')
-    board._move_raw(Move.from_uci('a4a5'))
+    board._move_raw(Move.from_uci('a4a5').pack())
     assert board.en_passant == 0
-    board._move_raw(Move.from_uci('h7h5'))
+    board._move_raw(Move.from_uci('h7h5').pack())
     assert board.en_passant == square_to_index('h6')
-    board._move_raw(Move.from_uci('h5h4'))
+    board._move_raw(Move.from_uci('h5h4').pack())
     assert board.en_passant == 0
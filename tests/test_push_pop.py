@@ -0,0 +1,36 @@
+import pytest
+from chess.board import Board
+from chess.util import Move
+
+test_data = [
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+    'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+    'r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1',
+    'rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3',
+]
+
+
+@pytest.mark.parametrize('fen', test_data)
+def test_push_pop_restores_position(fen: str):
+    board = Board(fen)
+    pieces = [dict(pieces) for pieces in board._pieces]
+    kings = list(board._kings)
+    for move in board.legal_moves:
+        board.push(move)
+        assert board.fen() != fen
+        assert board.pop() == move
+        assert board.fen() == fen
+        assert board._pieces == pieces
+        assert board._kings == kings
+
+
+def test_push_pop_records_capture():
+    board = Board(test_data[3])
+    pawn = board['f5']
+    board.push(Move.from_uci('e5f6'))
+    assert board._undo_stack[-1].captured is pawn
+    board.push(Move.from_uci('g8f6'))
+    board.pop()
+    board.pop()
+    assert board['f5'] is pawn
+    assert not board._undo_stack
@@ -0,0 +1,76 @@
+import random
+
+import pytest
+from chess.board import Board
+from chess.util import Move
+from conftest import PERFT_FENS, random_game
+
+
+def check_stages(board: Board) -> None:
+    legal = board._get_legal_moves()
+    captures = list(board._iter_captures())
+    quiets = list(board._iter_quiet_moves())
+    assert sorted(captures + quiets) == sorted(legal)
+    assert all(board._is_capture(move) for move in captures)
+    assert not any(board._is_capture(move) for move in quiets)
+    orders = [board._get_capture_order(move) for move in captures]
+    assert orders == sorted(orders, reverse=True)
+    assert board.has_capture() == bool(captures)
+
+    staged = list(board._iter_staged_moves())
+    assert sorted(staged) == sorted(legal)
+    evasions = list(board._iter_evasions())
+    if board._is_king_in_check(board.active_color):
+        assert sorted(staged) == sorted(evasions)
+    else:
+        assert evasions == []
+        # the probe generator reorders the pieces as it pushes moves
+        assert sorted(staged[: len(captures)]) == sorted(captures)
+        assert sorted(staged[len(captures) :]) == sorted(quiets)
+
+
+@pytest.mark.parametrize('movegen', ['pins', 'probe'])
+@pytest.mark.parametrize('fen', PERFT_FENS)
+def test_random_games(fen: str, movegen: str):
+    board = Board(fen, movegen=movegen)
+    check_stages(board)
+    for _ in random_game(board, random.Random(fen), 40):
+        check_stages(board)
+
+
+def test_capture_order():
+    # the queen before the rook, the pawn before the knight and the rook
+    board = Board('4k3/8/2q1r3/1P2R3/3N4/8/8/K7 w - - 0 1')
+    assert list(board.captures()) == [
+        Move.from_uci('b5c6'),
+        Move.from_uci('d4c6'),
+        Move.from_uci('d4e6'),
+        Move.from_uci('e5e6'),
+    ]
+
+
+def test_en_passant_and_promotions():
+    board = Board('4k3/1P6/8/3pP3/8/8/8/4K3 w - d6 0 1')
+    captures = set(board.captures())
+    assert Move.from_uci('e5d6') in captures
+    assert {move for move in captures if move.promotion} == {
+        Move.from_uci(f'b7b8{char}') for char in 'nbrq'
+    }
+    assert Move.from_uci('e5e6') in set(board.quiet_moves())
+
+
+def test_evasions():
+    # the rook gives check and can be taken by the queen or the king
+    board = Board('4k3/8/8/7Q/8/8/8/3rK3 w - - 0 1')
+    evasions = list(board.evasions())
+    assert evasions[:2] == [Move.from_uci('h5d1'), Move.from_uci('e1d1')]
+    assert set(evasions) == board.legal_moves
+    assert list(Board().evasions()) == []
+
+
+def test_lazy():
+    # quiet moves come one piece at a time
+    board = Board()
+    quiets = board._iter_quiet_moves()
+    next(quiets)
+    assert board._legal_moves is None
@@ -0,0 +1,147 @@
+import threading
+
+import pytest
+from chess import pieces as p
+from chess import stats as s
+from chess.board import Board
+from chess.stats import PHASES, collect
+
+methods = [
+    (Board, '_move'),
+    (Board, '_advance'),
+    (Board, '_get_legal_moves'),
+    (Board, '_is_king_in_check'),
+    (Board, '_is_square_under_attack'),
+    (Board, '_with_move'),
+    (Board, 'copy'),
+    (p.Pawn, 'add_pseudolegal_moves'),
+    (p.Pawn, 'add_masked_legal_moves'),
+    (p.JumpingPiece, 'add_pseudolegal_moves'),
+    (p.SlidingPiece, 'add_pseudolegal_moves'),
+    (p.King, 'add_pseudolegal_moves'),
+]
+
+
+def test_starting_position():
+    board = Board()
+    with collect() as stats:
+        board.move_uci('e2e4')
+    # every pawn has two moves and every knight two, the king and the
+    # other pieces are blocked in
+    assert stats.moves == {'p': 16, 'n': 4, 'b': 0, 'r': 0, 'q': 0, 'k': 0}
+    assert stats.moves_played == 1
+    assert stats.phases.keys() == set(PHASES)
+    assert all(seconds > 0 for seconds in stats.phases.values())
+
+
+@pytest.mark.parametrize('movegen', ['pins', 'probe'])
+def test_probes(movegen: str):
+    board = Board(movegen=movegen)
+    with collect() as stats:
+        board._get_legal_moves()
+        with board._with_move(board._get_legal_moves()[0]):
+            pass
+        board.copy()
+    # the probe generator plays every move, pins only the king moves
+    assert stats.legality_probes == (20 if movegen == 'probe' else 0)
+    assert stats.attack_queries == stats.legality_probes
+    assert stats.with_move == 1
+    assert stats.copies == 1
+    assert stats.moves_played == 0
+    assert stats.phases == dict.fromkeys(PHASES, 0.0)
+
+
+def test_king_moves_count_once():
+    board = Board('4k3/8/8/8/8/8/8/R3K3 w Q - 0 1')
+    with collect() as stats:
+        board._get_legal_moves()
+    # five king moves and castling
+    assert stats.moves['k'] == 6
+
+
+def test_restored():
+    originals = [cls.__dict__[name] for cls, name in methods]
+    with collect():
+        patched = [cls.__dict__[name] for cls, name in methods]
+    assert all(
+        before is not during for before, during in zip(originals, patched)
+    )
+    assert [cls.__dict__[name] for cls, name in methods] == originals
+
+    with pytest.raises(ValueError):
+        with collect():
+            raise ValueError
+    assert [cls.__dict__[name] for cls, name in methods] == originals
+
+
+def test_patch_fails(monkeypatch: pytest.MonkeyPatch):
+    originals = [cls.__dict__[name] for cls, name in methods]
+    get_patches = s._get_patches
+
+    def failing_patches():
+        # the last patch names a method Board does not have
+        return [*get_patches(), (Board, 'missing', len)]
+
+    monkeypatch.setattr(s, '_get_patches', failing_patches)
+    with pytest.raises(KeyError):
+        with collect():
+            pass
+    assert [cls.__dict__[name] for cls, name in methods] == originals
+    monkeypatch.undo()
+    with collect() as stats:
+        Board().move_uci('e2e4')
+    assert stats.moves_played == 1
+
+
+def test_threads():
+    game = ['e2e4', 'e7e5', 'g1f3', 'b8c6', 'f1b5', 'a7a6']
+    with collect() as single:
+        Board().replay(game, trusted=False)
+
+    barrier = threading.Barrier(4)
+
+    def play():
+        board = Board()
+        barrier.wait()
+        for _ in range(10):
+            board.replay(game, trusted=False)
+            board = Board()
+
+    threads = [threading.Thread(target=play) for _ in range(4)]
+    with collect() as stats:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    # every thread counts as if it had been alone
+    assert stats.moves_played == 40 * single.moves_played
+    assert stats.moves == {
+        char: 40 * moves for char, moves in single.moves.items()
+    }
+    assert stats.legality_probes == 40 * single.legality_probes
+    assert all(seconds > 0 for seconds in stats.phases.values())
+
+
+def test_overlapping():
+    originals = [cls.__dict__[name] for cls, name in methods]
+    with collect() as outer:
+        Board().move_uci('e2e4')
+        with collect() as inner:
+            Board().move_uci('d2d4')
+        # the methods stay patched for the collection still open
+        Board().move_uci('c2c4')
+    assert outer.as_dict()['moves_played'] == 3
+    assert inner.moves_played == 1
+    assert [cls.__dict__[name] for cls, name in methods] == originals
+
+
+def test_boards():
+    board = Board()
+    other = Board()
+    with collect() as everything, collect(board) as stats:
+        board.move_uci('e2e4')
+        other.move_uci('d2d4')
+        other.move_uci('d7d5')
+    assert stats.moves_played == 1
+    assert stats.moves == {'p': 16, 'n': 4, 'b': 0, 'r': 0, 'q': 0, 'k': 0}
+    assert everything.moves_played == 3
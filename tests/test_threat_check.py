@@ -34,3 +34,24 @@ def test_threat_check(data: tuple[str, Type[p.Piece], set[str]]):
         if Type.is_square_attacked_by_piece_type(board, index)
     }
     assert threats == expected
+
+
+@pytest.mark.parametrize(
+    'fen',
+    [
+        *test_data,
+        'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+        'rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8',
+    ],
+)
+def test_square_under_attack(fen: str):
+    board = Board(fen)
+    for color in board._COLORS:
+        for index, entity in enumerate(board._board):
+            if isinstance(entity, p.Border):
+                continue
+            expected = any(
+                Type.is_square_attacked_by_piece_type(board, index, color)
+                for Type in board._PIECE_TYPES
+            )
+            assert board._is_square_under_attack(index, color) == expected
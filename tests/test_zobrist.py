@@ -0,0 +1,50 @@
+import pytest
+from chess.board import Board
+from chess.util import Move
+
+test_data = [
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+    'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+    'r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1',
+    '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1',
+]
+
+
+def walk(board: Board, depth: int):
+    assert board.zobrist == board._get_zobrist()
+    if depth == 0:
+        return
+    for move in board.legal_moves:
+        key = board.zobrist
+        board.push(move)
+        walk(board, depth - 1)
+        board.pop()
+        assert board.zobrist == key
+
+
+@pytest.mark.parametrize('fen', test_data)
+def test_incremental_zobrist(fen: str):
+    walk(Board(fen), 2)
+
+
+def test_zobrist_transposition():
+    first = Board()
+    second = Board()
+    for move in ['g1f3', 'g8f6', 'b1c3', 'b8c6']:
+        first.move_uci(move)
+    for move in ['b1c3', 'b8c6', 'g1f3', 'g8f6']:
+        second.move_uci(move)
+    assert first.zobrist == second.zobrist
+    assert first.zobrist != Board().zobrist
+
+
+def test_zobrist_state():
+    board = Board()
+    board._move(Move.from_uci('e2e4'))
+    # same placement, no en passant square
+    assert board.zobrist != Board(board.fen().replace('e3', '-')).zobrist
+    assert board.zobrist == Board(board.fen()).zobrist
+    # same placement, different castle rights
+    assert (
+        Board().zobrist != Board(Board().fen().replace('KQkq', 'Kkq')).zobrist
+    )